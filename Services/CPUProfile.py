@@ -0,0 +1,76 @@
+import logging
+from typing import Optional
+
+
+class CPUProfile:
+    """Describes how model weights are loaded and run on a CPU-only host.
+
+    Three profiles are supported:
+
+    * ``fp32``: full precision weights, the safe default on any CPU.
+    * ``bf16``: bfloat16 weights, only fast on CPUs with native bf16 matmul
+      support (AVX512-BF16 or AMX).
+    * ``int8``: fp32 weights with every ``nn.Linear`` layer dynamically
+      quantized to int8, fastest on CPUs with VNNI dot-product instructions.
+    """
+
+    PROFILES = ("fp32", "bf16", "int8")
+    BF16_FLAGS = {"avx512_bf16", "amx_bf16"}
+    INT8_FLAGS = {"avx512_vnni", "avx_vnni", "amx_int8"}
+
+    def __init__(self, name: str) -> None:
+        if name not in self.PROFILES:
+            raise ValueError(f"Unknown CPU profile '{name}', expected one of {', '.join(self.PROFILES)}")
+        self.name = name
+
+    @property
+    def dtype_name(self) -> str:
+        """Name of the ``torch`` dtype the weights are loaded in."""
+        return "bfloat16" if self.name == "bf16" else "float32"
+
+    @property
+    def quantize(self) -> bool:
+        """``True`` if linear layers should be dynamically quantized to int8."""
+        return self.name == "int8"
+
+    def __repr__(self) -> str:
+        return f"CPUProfile({self.name!r})"
+
+    @classmethod
+    def select(cls, requested: str = "auto", cpu_flags: Optional[set[str]] = None) -> "CPUProfile":
+        """Return the requested profile, or pick one from the CPU's features.
+
+        With ``requested="auto"`` bf16 is chosen when the CPU has native bf16
+        matmul support, int8 when it has VNNI instructions and fp32 otherwise.
+        An unknown profile name is logged and treated as ``"auto"``.
+        """
+        requested = (requested or "auto").lower()
+        if requested in cls.PROFILES:
+            return cls(requested)
+        if requested != "auto":
+            logging.getLogger("MurderMysteryGame").warning(
+                f"Unknown CPU profile '{requested}', expected one of {', '.join(cls.PROFILES)}; using auto"
+            )
+
+        flags = cls.detect_cpu_flags() if cpu_flags is None else cpu_flags
+        if flags & cls.BF16_FLAGS:
+            return cls("bf16")
+        if flags & cls.INT8_FLAGS:
+            return cls("int8")
+        return cls("fp32")
+
+    @staticmethod
+    def detect_cpu_flags(cpuinfo_path: str = "/proc/cpuinfo") -> set[str]:
+        """Return the instruction set flags reported by the CPU.
+
+        Reads ``/proc/cpuinfo`` on Linux; returns an empty set elsewhere, which
+        makes automatic selection fall back to fp32.
+        """
+        try:
+            with open(cpuinfo_path, encoding="utf-8") as cpuinfo:
+                for line in cpuinfo:
+                    if line.startswith("flags"):
+                        return set(line.split(":", 1)[1].split())
+        except OSError:
+            pass
+        return set()
@@ -0,0 +1,278 @@
+import hashlib
+import os
+import socket
+import threading
+import time
+import unicodedata
+import uuid
+from collections import OrderedDict
+from typing import BinaryIO, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that never encodes the same text twice.
+
+    Vectors are keyed by a SHA-256 hash of the normalized text (Unicode NFC,
+    whitespace collapsed) and kept in an in-memory LRU of ``max_entries``
+    vectors. With a ``path``, every new vector is also appended to an on-disk
+    store, so repeated texts stay cheap across games. ``hits``,
+    ``disk_hits`` and ``misses`` count lookups.
+
+    The on-disk store is shared by every process on the host without locks:
+    each cache appends only to its own segment, a raw float32 file
+    (``<segment>.f32``) plus a file of text hashes, one line per row
+    (``<segment>.keys``). The vector is written before its hash, and a
+    reader only counts rows whose hash line and vector are both complete, so
+    a hash can only ever point at the vector written with it. Once there are
+    more than ``MAX_SEGMENTS`` segments, those untouched for
+    ``STALE_SEGMENT_SECONDS`` are folded into the new cache's own segment.
+    """
+
+    KEYS_SUFFIX = ".keys"
+    VECTORS_SUFFIX = ".f32"
+    MAX_SEGMENTS = 16
+    STALE_SEGMENT_SECONDS = 3600.0
+    _ITEM_SIZE = np.dtype(np.float32).itemsize
+
+    def __init__(self, embeddings: Embeddings, max_entries: int = 4096, path: Optional[str] = None,
+                 save_every: int = 32) -> None:
+        """Wrap ``embeddings`` with a cache.
+
+        Args:
+            embeddings: The embeddings actually computing vectors.
+            max_entries: Number of vectors kept in memory.
+            path: Directory of the on-disk store; ``None`` keeps the cache
+                in memory only.
+            save_every: Number of new vectors after which this cache's
+                segment is flushed to disk.
+        """
+        self.embeddings = embeddings
+        self.max_entries = max_entries
+        self.path = path
+        self.save_every = save_every
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, list[float]]" = OrderedDict()
+        self._rows: dict[str, tuple[str, int]] = {}
+        self._readers: dict[str, BinaryIO] = {}
+        self._dimension: Optional[int] = None
+        self._segment: Optional[str] = None
+        self._segment_rows = 0
+        self._keys_file = None
+        self._vectors_file: Optional[BinaryIO] = None
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def text_key(text: str) -> str:
+        """Return the cache key of ``text``."""
+        normalized = " ".join(unicodedata.normalize("NFC", text).split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed ``texts``, encoding only those not cached yet, in one batch."""
+        keys = [self.text_key(text) for text in texts]
+        vectors: dict[str, list[float]] = {}
+        with self._lock:
+            for key in keys:
+                if key not in vectors:
+                    cached = self._lookup_locked(key)
+                    if cached is not None:
+                        vectors[key] = cached
+
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        if missing:
+            encoded = self.embeddings.embed_documents(list(missing.values()))
+            with self._lock:
+                self.misses += len(missing)
+                for key, vector in zip(missing, encoded):
+                    vectors[key] = [float(value) for value in vector]
+                    self._store_locked(key, vectors[key])
+            self._save_if_due()
+
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embed a single query, from the cache when possible."""
+        key = self.text_key(text)
+        with self._lock:
+            cached = self._lookup_locked(key)
+        if cached is not None:
+            return cached
+
+        vector = [float(value) for value in self.embeddings.embed_query(text)]
+        with self._lock:
+            self.misses += 1
+            self._store_locked(key, vector)
+        self._save_if_due()
+        return vector
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def save(self) -> None:
+        """Flush this cache's segment to disk."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        """Flush vectors before their hashes; the lock must be held."""
+        if self._vectors_file is not None:
+            self._vectors_file.flush()
+            self._keys_file.flush()
+        self._unsaved = 0
+
+    def _lookup_locked(self, key: str) -> Optional[list[float]]:
+        """Find a cached vector in memory, then on disk; the lock must be held."""
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return vector
+
+        location = self._rows.get(key)
+        if location is None:
+            return None
+        vector = self._read_row_locked(*location)
+        if vector is None:
+            return None
+        self._remember_locked(key, vector)
+        self.disk_hits += 1
+        return vector
+
+    def _store_locked(self, key: str, vector: list[float]) -> None:
+        """Cache a newly computed vector; the lock must be held."""
+        self._remember_locked(key, vector)
+        if not self.path or key in self._rows:
+            return
+        if self._dimension is None:
+            self._dimension = len(vector)
+        if len(vector) != self._dimension:
+            return
+        self._append_locked([key], np.asarray([vector], dtype=np.float32))
+
+    def _append_locked(self, keys: list[str], vectors: np.ndarray) -> None:
+        """Append rows to this cache's own segment, creating it on first use; the lock must be held."""
+        if self._segment is None:
+            os.makedirs(self.path, exist_ok=True)
+            self._segment = f"{self._dimension}-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            base = os.path.join(self.path, self._segment)
+            self._vectors_file = open(base + self.VECTORS_SUFFIX, "ab")
+            self._keys_file = open(base + self.KEYS_SUFFIX, "a", encoding="ascii")
+        self._vectors_file.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        for key in keys:
+            self._keys_file.write(key + "\n")
+            self._rows[key] = (self._segment, self._segment_rows)
+            self._segment_rows += 1
+        self._unsaved += len(keys)
+
+    def _read_row_locked(self, segment: str, row: int) -> Optional[list[float]]:
+        """Read one vector of a segment from disk; the lock must be held."""
+        if segment == self._segment and self._unsaved:
+            self._flush_locked()
+        reader = self._readers.get(segment)
+        try:
+            if reader is None:
+                reader = self._readers[segment] = open(os.path.join(self.path, segment + self.VECTORS_SUFFIX), "rb")
+            reader.seek(row * self._dimension * self._ITEM_SIZE)
+            data = reader.read(self._dimension * self._ITEM_SIZE)
+        except OSError:
+            return None
+        if len(data) != self._dimension * self._ITEM_SIZE:
+            return None
+        return np.frombuffer(data, dtype=np.float32).tolist()
+
+    def _remember_locked(self, key: str, vector: list[float]) -> None:
+        """Put a vector in the in-memory LRU; the lock must be held."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _save_if_due(self) -> None:
+        if self._unsaved >= self.save_every:
+            self.save()
+
+    def _load(self) -> None:
+        """Index every complete row of the segments in :attr:`path`, folding stale ones into our own."""
+        if not self.path or not os.path.isdir(self.path):
+            return
+
+        segments = {}
+        for name in os.listdir(self.path):
+            if not name.endswith(self.KEYS_SUFFIX):
+                continue
+            segment = name[:-len(self.KEYS_SUFFIX)]
+            try:
+                dimension = int(segment.split("-", 1)[0])
+                keys = self._complete_keys(segment, dimension)
+            except (OSError, ValueError) as error:
+                print(f"Could not read embedding cache segment {segment}: {error}")
+                continue
+            if self._dimension is None:
+                self._dimension = dimension
+            if dimension == self._dimension:
+                segments[segment] = keys
+
+        for segment, keys in segments.items():
+            for row, key in enumerate(keys):
+                self._rows.setdefault(key, (segment, row))
+
+        if len(segments) > self.MAX_SEGMENTS:
+            self._fold_stale_segments(segments)
+
+    def _complete_keys(self, segment: str, dimension: int) -> list[str]:
+        """Return the hashes of a segment's rows whose hash line and vector are both complete."""
+        base = os.path.join(self.path, segment)
+        with open(base + self.KEYS_SUFFIX, encoding="ascii") as keys_file:
+            content = keys_file.read()
+        keys = content.split("\n")[:-1]  # A last line without newline is still being written
+        rows = os.path.getsize(base + self.VECTORS_SUFFIX) // (dimension * self._ITEM_SIZE)
+        return keys[:rows]
+
+    def _fold_stale_segments(self, segments: dict[str, list[str]]) -> None:
+        """Copy the rows of segments nobody wrote to lately into our own segment and delete them."""
+        now = time.time()
+        stale = []
+        for segment in segments:
+            base = os.path.join(self.path, segment)
+            try:
+                modified = max(os.path.getmtime(base + self.KEYS_SUFFIX), os.path.getmtime(base + self.VECTORS_SUFFIX))
+            except OSError:
+                continue
+            if now - modified > self.STALE_SEGMENT_SECONDS:
+                stale.append(segment)
+        if len(stale) < 2:
+            return
+
+        folded = []
+        with self._lock:
+            for segment in stale:
+                keys = [key for key in segments[segment] if self._rows.get(key, (None,))[0] == segment]
+                rows = [self._rows.pop(key)[1] for key in keys]
+                try:
+                    vectors = np.fromfile(os.path.join(self.path, segment + self.VECTORS_SUFFIX), dtype=np.float32,
+                                          count=len(segments[segment]) * self._dimension)
+                    vectors = vectors.reshape(-1, self._dimension)[rows]
+                except (OSError, ValueError, IndexError) as error:
+                    # Another process starting at the same time folded it first; its rows are misses here
+                    print(f"Could not fold embedding cache segment {segment}: {error}")
+                    continue
+                if keys:
+                    self._append_locked(keys, vectors)
+                folded.append(segment)
+            self._flush_locked()
+            for segment in folded:
+                for suffix in (self.KEYS_SUFFIX, self.VECTORS_SUFFIX):
+                    try:
+                        os.remove(os.path.join(self.path, segment + suffix))
+                    except OSError:
+                        pass
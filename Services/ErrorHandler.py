@@ -46,6 +46,10 @@ class ErrorHandler:
         """Log a warning message"""
         self.logger.warning(message)
     
+    def log_debug(self, message: str):
+        """Log a debug message (written to the log file only)"""
+        self.logger.debug(message)
+    
     def handle_error(self, error: Exception, context: str = "", 
                     fallback: Optional[Callable] = None) -> Optional[Any]:
         """Handle an error with optional fallback"""
@@ -0,0 +1,95 @@
+import time
+import zlib
+from typing import Hashable, Iterator, Optional
+
+from Services.StopPolicy import StopPolicy
+
+
+class FakeBackend:
+    """Deterministic in-process generation backend for tests and load tests.
+
+    The reply to a prompt is picked from ``responses`` by a stable hash of the
+    prompt's last message, so the same question always gets the same answer.
+    ``latency`` is paid once per call (or once per batch) and
+    ``token_latency`` once per generated word, which lets the layers above
+    the model be benchmarked with realistic timings and no model weights.
+    """
+
+    name = "fake"
+
+    DEFAULT_RESPONSES = [
+        "I was in the library most of the evening, reading by the fire.",
+        "I only have my pocket watch and a handkerchief with me.",
+        "I heard raised voices near the study, but I didn't see who it was.",
+        "I'd rather not talk about that right now, if you don't mind.",
+    ]
+
+    def __init__(self, responses: Optional[list[str]] = None, latency: float = 0.0,
+                 token_latency: float = 0.0) -> None:
+        """Create a fake backend.
+
+        Args:
+            responses: Replies to choose from. Defaults to a small set of
+                in-character lines.
+            latency: Seconds slept before every reply (or batch).
+            token_latency: Seconds slept per word of every reply.
+        """
+        self.responses = list(responses) if responses else list(self.DEFAULT_RESPONSES)
+        self.latency = latency
+        self.token_latency = token_latency
+        self.calls = 0
+        self.closed = False
+
+    def generate(self, messages: list, cache_key: Optional[Hashable] = None,
+                 cache_signature: Optional[Hashable] = None, **generate_kwargs) -> str:
+        """Return the canned reply for ``messages`` after the configured delay."""
+        self.calls += 1
+        reply = self._reply_for(messages, **generate_kwargs)
+        time.sleep(self.latency + self.token_latency * len(reply.split()))
+        return reply
+
+    def batch_generate(self, prompts: list[list], **generate_kwargs) -> list[str]:
+        """Return canned replies for all prompts, paying the fixed latency once."""
+        self.calls += 1
+        replies = [self._reply_for(messages, **generate_kwargs) for messages in prompts]
+        longest = max((len(reply.split()) for reply in replies), default=0)
+        time.sleep(self.latency + self.token_latency * longest)
+        return replies
+
+    def stream(self, messages: list, cache_key: Optional[Hashable] = None,
+               cache_signature: Optional[Hashable] = None, **generate_kwargs) -> Iterator[str]:
+        """Yield the canned reply for ``messages`` one word at a time."""
+        self.calls += 1
+        reply = self._reply_for(messages, **generate_kwargs)
+        time.sleep(self.latency)
+        for index, word in enumerate(reply.split()):
+            time.sleep(self.token_latency)
+            yield word if index == 0 else f" {word}"
+
+    def count_tokens(self, text: str) -> int:
+        """Approximate tokens as whitespace-separated words."""
+        return len(text.split())
+
+    def close(self) -> None:
+        """Record that the backend was closed; there is nothing cached to drop."""
+        self.closed = True
+
+    def _reply_for(self, messages: list, max_new_tokens: Optional[int] = None,
+                   stop_policy: Optional[StopPolicy] = None, **generate_kwargs) -> str:
+        """Pick the reply for a prompt, truncated to ``max_new_tokens`` words.
+
+        Like a real backend, word-by-word "decoding" ends at the first word
+        where ``stop_policy`` reports a stopping point.
+        """
+        last = messages[-1] if messages else ""
+        text = getattr(last, "content", last)
+        reply = self.responses[zlib.crc32(str(text).encode("utf-8")) % len(self.responses)]
+        words = reply.split()
+        if max_new_tokens is not None:
+            words = words[:max_new_tokens]
+        if stop_policy is not None:
+            for index in range(1, len(words) + 1):
+                if stop_policy.should_stop(" ".join(words[:index])):
+                    words = words[:index]
+                    break
+        return " ".join(words)
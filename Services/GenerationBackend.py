@@ -0,0 +1,41 @@
+from typing import Hashable, Iterator, Optional, Protocol, runtime_checkable
+
+
+@runtime_checkable
+class GenerationBackend(Protocol):
+    """Interface every text generation backend used by :class:`LLMService` provides.
+
+    Prompts are lists of LangChain chat messages as produced by
+    :class:`PromptService`. Replies are returned raw; cleaning them up is the
+    job of :class:`ResponseService`. Besides ``max_new_tokens``, every
+    generation method accepts a ``stop_policy`` keyword argument
+    (:class:`StopPolicy`) and should stop decoding once it is satisfied.
+    """
+
+    name: str
+
+    def generate(self, messages: list, cache_key: Optional[Hashable] = None,
+                 cache_signature: Optional[Hashable] = None, **generate_kwargs) -> str:
+        """Generate a complete reply to ``messages``.
+
+        ``cache_key`` and ``cache_signature`` identify a reusable prompt prefix;
+        backends without prefix caching ignore them.
+        """
+        ...
+
+    def batch_generate(self, prompts: list[list], **generate_kwargs) -> list[str]:
+        """Generate one reply per prompt, in order."""
+        ...
+
+    def stream(self, messages: list, cache_key: Optional[Hashable] = None,
+               cache_signature: Optional[Hashable] = None, **generate_kwargs) -> Iterator[str]:
+        """Generate a reply to ``messages``, yielding text chunks as they are produced."""
+        ...
+
+    def count_tokens(self, text: str) -> int:
+        """Return the number of tokens ``text`` occupies for this backend."""
+        ...
+
+    def close(self) -> None:
+        """Drop cached generation state, such as reusable prompt prefixes."""
+        ...
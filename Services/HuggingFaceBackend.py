@@ -0,0 +1,251 @@
+import copy
+import threading
+from typing import Hashable, Iterator, Optional
+
+import torch
+from transformers import (
+    AutoTokenizer, AutoModelForCausalLM, StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer, pipeline
+)
+from config.ModelConfig import ModelConfig
+from Services.CPUProfile import CPUProfile
+from Services.PrefixCache import PrefixCache
+from Services.StopPolicy import StopPolicy
+
+
+class StopPolicyCriteria(StoppingCriteria):
+    """Ends each sequence of a ``generate`` call once its :class:`StopPolicy` says so."""
+
+    def __init__(self, stop_policy: StopPolicy, tokenizer, prompt_length: int) -> None:
+        self.stop_policy = stop_policy
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        texts = self.tokenizer.batch_decode(input_ids[:, self.prompt_length:], skip_special_tokens=True)
+        return torch.tensor(
+            [self.stop_policy.should_stop(text) for text in texts], dtype=torch.bool, device=input_ids.device
+        )
+
+
+class HuggingFaceBackend:
+    """Generation backend running a local Hugging Face causal language model.
+
+    The model and tokenizer are loaded in the constructor according to the
+    device: on CUDA hosts the weights are loaded in bfloat16 with automatic
+    device placement, otherwise according to a :class:`CPUProfile`. Prompt
+    prefixes are cached per character in :attr:`prefix_cache`.
+    """
+
+    name = "huggingface"
+
+    def __init__(self, model_name: str, cpu_profile: Optional[str] = None, **generation_kwargs) -> None:
+        """Load ``model_name`` and prepare it for generation.
+
+        Args:
+            model_name: Hugging Face model id or local path.
+            cpu_profile: ``"fp32"``, ``"bf16"``, ``"int8"`` or ``"auto"``.
+                Defaults to ``ModelConfig.CPU_PROFILE``. Ignored on CUDA.
+            **generation_kwargs: Default keyword arguments for ``generate``.
+        """
+        self.model_name = model_name
+        self.cpu_profile: Optional[CPUProfile] = None
+        if not torch.cuda.is_available():
+            self.cpu_profile = CPUProfile.select(cpu_profile or ModelConfig.CPU_PROFILE)
+            if ModelConfig.CPU_THREADS > 0:
+                torch.set_num_threads(ModelConfig.CPU_THREADS)
+
+        print(f"Loading model: {model_name} (CPU profile: {self.cpu_profile.name if self.cpu_profile else 'cuda'})")
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = self._load_causal_lm(model_name)
+
+        generation_kwargs.setdefault("pad_token_id", tokenizer.eos_token_id)
+        generation_kwargs.setdefault("eos_token_id", tokenizer.eos_token_id)
+        self.pipeline = pipeline(
+            "text-generation",
+            model=model,
+            tokenizer=tokenizer,
+            **generation_kwargs
+        )
+        self.generation_kwargs = generation_kwargs
+        # Token counts may be requested from another thread while a generation runs;
+        # fast tokenizers must not be used from two threads at once.
+        self.counting_tokenizer = copy.deepcopy(tokenizer)
+        self.prefix_cache = PrefixCache(max_entries=ModelConfig.PREFIX_CACHE_SIZE)
+
+        if ModelConfig.MODEL_WARMUP:
+            self.warmup()
+
+    def warmup(self) -> None:
+        """Run one tiny generation so the first real request is not the slowest."""
+        try:
+            tokenizer = self.pipeline.tokenizer
+            inputs = tokenizer("Hello", return_tensors="pt").to(self.pipeline.model.device)
+            with torch.inference_mode():
+                self.pipeline.model.generate(**inputs, max_new_tokens=2, pad_token_id=tokenizer.eos_token_id)
+        except Exception as error:
+            print(f"Model warmup failed: {error}")
+
+    def _load_causal_lm(self, model_name: str):
+        """Load model weights according to the device and CPU profile."""
+        if self.cpu_profile is None:
+            return AutoModelForCausalLM.from_pretrained(
+                model_name,
+                dtype=torch.bfloat16,
+                device_map="auto",
+                low_cpu_mem_usage=True
+            )
+
+        model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            dtype=getattr(torch, self.cpu_profile.dtype_name),
+            low_cpu_mem_usage=True
+        )
+        model.eval()
+        if self.cpu_profile.quantize:
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
+    def count_tokens(self, text: str) -> int:
+        """Return the number of tokens ``text`` encodes to, without special tokens."""
+        return len(self.counting_tokenizer.encode(text, add_special_tokens=False))
+
+    def close(self) -> None:
+        """Free the cached prompt prefixes and their key/value tensors."""
+        self.prefix_cache.invalidate()
+
+    def generate(self, messages: list, cache_key: Optional[Hashable] = None,
+                 cache_signature: Optional[Hashable] = None, **generate_kwargs) -> str:
+        """Generate a reply to ``messages`` and return the decoded text.
+
+        When ``cache_key`` is given, the key/value state of the prompt is kept
+        in :attr:`prefix_cache` and reused by later calls with the same key
+        and ``cache_signature`` for as many leading tokens as they share.
+        A ``stop_policy`` keyword argument ends decoding at its stopping point.
+        """
+        return self._generate(messages, None, cache_key, cache_signature, **generate_kwargs)
+
+    def stream(self, messages: list, cache_key: Optional[Hashable] = None,
+               cache_signature: Optional[Hashable] = None, **generate_kwargs) -> Iterator[str]:
+        """Generate a reply to ``messages`` and yield text chunks as they decode.
+
+        Generation runs on a worker thread feeding a ``TextIteratorStreamer``
+        so the first words are available long before the reply is complete.
+        Any error raised by ``generate`` is re-raised once the stream ends.
+        """
+        streamer = TextIteratorStreamer(self.pipeline.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        errors: list[Exception] = []
+
+        def run_generation() -> None:
+            try:
+                self._generate(messages, streamer, cache_key, cache_signature, **generate_kwargs)
+            except Exception as error:
+                errors.append(error)
+                streamer.end()
+
+        thread = threading.Thread(target=run_generation, name="HuggingFaceBackendStream")
+        thread.daemon = True
+        thread.start()
+
+        for chunk in streamer:
+            if chunk:
+                yield chunk
+
+        thread.join()
+        if errors:
+            raise errors[0]
+
+    def _generate(self, messages: list, streamer: Optional[TextIteratorStreamer],
+                  cache_key: Optional[Hashable], cache_signature: Optional[Hashable],
+                  **generate_kwargs) -> str:
+        """Run ``generate`` for one prompt, reusing and refreshing the prefix cache."""
+        pipe = self.pipeline
+
+        tokenizer = pipe.tokenizer
+        prompt_text = self._render_messages(messages, tokenizer)
+        inputs = tokenizer(prompt_text, return_tensors="pt").to(pipe.model.device)
+        prompt_length = inputs["input_ids"].shape[1]
+        kwargs = self._generation_kwargs(generate_kwargs, tokenizer, prompt_length)
+        kwargs.update(inputs, return_dict_in_generate=True)
+        if streamer is not None:
+            kwargs["streamer"] = streamer
+
+        if cache_key is not None:
+            cached = self.prefix_cache.lookup(cache_key, cache_signature, inputs["input_ids"][0].tolist())
+            if cached is not None:
+                state, reuse_length = cached
+                past_key_values = copy.deepcopy(state)
+                past_key_values.crop(reuse_length)
+                kwargs["past_key_values"] = past_key_values
+
+        with torch.inference_mode():
+            output = pipe.model.generate(**kwargs)
+
+        sequence = output.sequences[0]
+        past_key_values = getattr(output, "past_key_values", None)
+        if cache_key is not None and past_key_values is not None:
+            cached_length = past_key_values.get_seq_length()
+            self.prefix_cache.store(cache_key, cache_signature, sequence[:cached_length].tolist(), past_key_values)
+
+        return tokenizer.decode(sequence[prompt_length:], skip_special_tokens=True)
+
+    def batch_generate(self, prompts: list[list], **generate_kwargs) -> list[str]:
+        """Generate replies for several chat prompts in one padded batch.
+
+        Prompts are left-padded so every sequence ends at the same position
+        and a single ``generate`` call decodes all replies together.
+
+        Returns:
+            list[str]: The raw decoded reply for each prompt, in order.
+        """
+        pipe = self.pipeline
+        if not prompts:
+            return []
+
+        tokenizer = pipe.tokenizer
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        texts = [self._render_messages(messages, tokenizer) for messages in prompts]
+
+        padding_side = tokenizer.padding_side
+        tokenizer.padding_side = "left"
+        try:
+            inputs = tokenizer(texts, return_tensors="pt", padding=True).to(pipe.model.device)
+        finally:
+            tokenizer.padding_side = padding_side
+
+        prompt_length = inputs["input_ids"].shape[1]
+        kwargs = self._generation_kwargs(generate_kwargs, tokenizer, prompt_length)
+        kwargs.setdefault("pad_token_id", tokenizer.pad_token_id)
+        with torch.inference_mode():
+            output_ids = pipe.model.generate(**inputs, **kwargs)
+
+        return tokenizer.batch_decode(output_ids[:, prompt_length:], skip_special_tokens=True)
+
+    def _generation_kwargs(self, generate_kwargs: dict, tokenizer, prompt_length: int) -> dict:
+        """Merge per-call arguments into the defaults, turning ``stop_policy`` into stopping criteria."""
+        kwargs = {**self.generation_kwargs, **generate_kwargs}
+        stop_policy = kwargs.pop("stop_policy", None)
+        if stop_policy is not None:
+            kwargs["stopping_criteria"] = StoppingCriteriaList(
+                [StopPolicyCriteria(stop_policy, tokenizer, prompt_length)]
+            )
+        return kwargs
+
+    @staticmethod
+    def _render_messages(messages: list, tokenizer) -> str:
+        """Render LangChain chat messages with the tokenizer's chat template."""
+        roles = {"system": "system", "human": "user", "ai": "assistant"}
+        chat = [
+            {"role": roles.get(message.type, "user"), "content": message.content}
+            for message in messages
+        ]
+        try:
+            return tokenizer.apply_chat_template(chat, tokenize=False, add_generation_prompt=True)
+        except Exception:
+            # Some chat templates (e.g. Mistral) reject system turns; fold them
+            # into the first user message instead.
+            system_text = "\n\n".join(turn["content"] for turn in chat if turn["role"] == "system")
+            merged = [turn for turn in chat if turn["role"] != "system"]
+            if system_text and merged:
+                merged[0] = {"role": merged[0]["role"], "content": f"{system_text}\n\n{merged[0]['content']}"}
+            return tokenizer.apply_chat_template(merged, tokenize=False, add_generation_prompt=True)
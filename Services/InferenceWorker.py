@@ -0,0 +1,461 @@
+import itertools
+import multiprocessing
+import pickle
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from Services.ErrorHandler import ErrorHandler
+from Services.LLMService import LLMService
+
+
+_SHARED_MEMORY = "__shared_memory__"
+_STATES = (LLMService.STATE_LOADING, LLMService.STATE_READY, LLMService.STATE_FALLBACK, LLMService.STATE_FAILED)
+_GENERATION = "generation"
+_EMBEDDING = "embedding"
+_METHODS = {
+    _GENERATION: {"generate", "stream", "batch_generate"},
+    _EMBEDDING: {"embed_query", "embed_documents", "count_tokens"},
+}
+
+
+def send_message(connection, message: Any, shared_memory_threshold: int = 64 * 1024) -> None:
+    """Send ``message`` over a pipe connection.
+
+    Payloads of at least ``shared_memory_threshold`` bytes (long prompts,
+    embedding batches) are written to a shared memory block and only its
+    name goes through the pipe; :func:`receive_message` frees the block.
+    """
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(payload) < shared_memory_threshold:
+        connection.send_bytes(payload)
+        return
+
+    block = shared_memory.SharedMemory(create=True, size=len(payload))
+    try:
+        block.buf[:len(payload)] = payload
+        # The receiving side owns the block from here on and unlinks it.
+        resource_tracker.unregister(block._name, "shared_memory")
+    finally:
+        block.close()
+    connection.send_bytes(pickle.dumps((_SHARED_MEMORY, block.name, len(payload))))
+
+
+def receive_message(connection) -> Any:
+    """Receive a message sent with :func:`send_message`."""
+    message = pickle.loads(connection.recv_bytes())
+    if isinstance(message, tuple) and len(message) == 3 and message[0] == _SHARED_MEMORY:
+        _, name, size = message
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            message = pickle.loads(bytes(block.buf[:size]))
+        finally:
+            block.close()
+            block.unlink()
+    return message
+
+
+def _serve(connection, embedding_connection, state, backend: Optional[str], cpu_profile: Optional[str],
+           host_embeddings: bool, shared_memory_threshold: int) -> None:
+    """Entry point of the worker process: load the models and answer requests.
+
+    Generation requests arrive on ``connection`` and are served by the main
+    thread; embedding requests arrive on ``embedding_connection`` and are
+    served by a thread of their own, so a short embedding never waits behind
+    a long generation. Token counts for prompt budgeting are short requests
+    too and share the embedding channel. The embedding model is loaded before the handshake
+    so retrieval works as soon as the worker reports it has started; the
+    language model keeps loading in the background and its state is
+    published through ``state``.
+    """
+    embeddings = None
+    if host_embeddings:
+        from Services.MemoryService import MemoryService
+        embeddings = MemoryService.load_embeddings()
+
+    llm_service = LLMService(background=True, cpu_profile=cpu_profile, backend=backend)
+
+    def publish_state() -> None:
+        llm_service.wait_until_ready()
+        state.value = _STATES.index(llm_service.state)
+
+    def embed(request_id: int, method: str, args: tuple, kwargs: dict) -> Any:
+        if method == "count_tokens":
+            return llm_service.count_tokens(*args, **kwargs)
+        if embeddings is None:
+            raise ValueError("Embeddings are not hosted by this worker")
+        return getattr(embeddings, method)(*args, **kwargs)
+
+    threading.Thread(target=publish_state, name="InferenceWorkerState", daemon=True).start()
+    threading.Thread(
+        target=_serve_channel, args=(embedding_connection, _EMBEDDING, embed, shared_memory_threshold),
+        name="InferenceWorkerEmbeddings", daemon=True,
+    ).start()
+    send_message(connection, ("started", None, None))
+
+    def generate(request_id: int, method: str, args: tuple, kwargs: dict) -> Any:
+        if method == "stream":
+            for chunk in llm_service.stream(*args, **kwargs):
+                send_message(connection, ("partial", request_id, chunk), shared_memory_threshold)
+            return None
+        return getattr(llm_service, method)(*args, **kwargs)
+
+    _serve_channel(connection, _GENERATION, generate, shared_memory_threshold)
+
+
+def _serve_channel(connection, channel: str, handle: Callable[[int, str, tuple, dict], Any],
+                   shared_memory_threshold: int) -> None:
+    """Answer the requests of one channel until it closes or a shutdown arrives."""
+    while True:
+        try:
+            request_id, method, args, kwargs = receive_message(connection)
+        except (EOFError, OSError):
+            return
+        if method == "shutdown":
+            return
+
+        try:
+            if method not in _METHODS[channel]:
+                raise ValueError(f"Unknown inference worker {channel} method '{method}'")
+            result = handle(request_id, method, args, kwargs)
+            send_message(connection, ("ok", request_id, result), shared_memory_threshold)
+        except Exception as error:
+            send_message(connection, ("error", request_id, f"{type(error).__name__}: {error}"))
+
+
+class WorkerUnavailableError(RuntimeError):
+    """Raised when the inference worker is starting, restarting or has crashed."""
+
+
+class InferenceWorker:
+    """Runs the language and embedding models in a separate process.
+
+    Keeping tokenization, sampling and the model forward passes out of the UI
+    process means they never hold its GIL. Requests and replies travel over
+    pipes (see :func:`send_message`): one for generation and one for
+    embeddings, each serving one request at a time, so the short embedding
+    calls of retrieval and cache lookups, and the token counts of prompt
+    budgeting, never queue behind a generation.
+
+    If the worker process dies it is restarted automatically after
+    ``restart_delay`` seconds. Until it is back, calls raise
+    :class:`WorkerUnavailableError` and :meth:`llm_state` reports
+    ``"loading"``, so callers serve their rule-based fallbacks.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        cpu_profile: Optional[str] = None,
+        host_embeddings: bool = True,
+        error_handler: Optional[ErrorHandler] = None,
+        restart_delay: float = 1.0,
+        shared_memory_threshold: int = 64 * 1024,
+    ) -> None:
+        """Start the worker process.
+
+        Args:
+            backend: Generation backend the worker loads, as for :class:`LLMService`.
+            cpu_profile: CPU profile the worker loads the model with.
+            host_embeddings: Load the embedding model in the worker as well.
+            error_handler: Optional error handler used to log crashes.
+            restart_delay: Seconds to wait before restarting a crashed worker.
+            shared_memory_threshold: Message size from which payloads go
+                through shared memory instead of the pipe.
+        """
+        self.backend = backend
+        self.cpu_profile = cpu_profile
+        self.host_embeddings = host_embeddings
+        self.restart_delay = restart_delay
+        self.shared_memory_threshold = shared_memory_threshold
+        self.crashes = 0
+        self.restarts = 0
+        self._error_handler = error_handler
+        self._context = multiprocessing.get_context("spawn")
+        self._state = self._context.Value("i", 0)
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+        self._channel_locks = {_GENERATION: threading.Lock(), _EMBEDDING: threading.Lock()}
+        self._closed = False
+        self._process = None
+        self._connections: dict[str, Any] = {}
+        self._request_ids = itertools.count(1)
+        self._failed_starts = 0
+        self._launch_in_background(delay=0.0)
+
+    def is_started(self) -> bool:
+        """Return ``True`` while a worker process is up and accepting requests."""
+        return self._started.is_set()
+
+    def wait_until_started(self, timeout: Optional[float] = None) -> bool:
+        """Block until the worker process is up, or ``timeout`` seconds pass."""
+        return self._started.wait(timeout)
+
+    def llm_state(self) -> str:
+        """Return the language model state inside the worker.
+
+        Reported as ``"loading"`` while the worker itself is (re)starting.
+        """
+        if not self.is_started():
+            return LLMService.STATE_LOADING
+        return _STATES[self._state.value]
+
+    def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Run ``method`` in the worker and return its result."""
+        channel = _EMBEDDING if method in _METHODS[_EMBEDDING] else _GENERATION
+        with self._channel_locks[channel]:
+            connection, process, request_id = self._send_request_locked(channel, method, args, kwargs)
+            kind, _, payload = self._receive_locked(connection, process, request_id)
+        if kind == "error":
+            raise RuntimeError(f"Inference worker {method} failed: {payload}")
+        return payload
+
+    def stream(self, *args: Any, **kwargs: Any) -> Iterator[str]:
+        """Run ``LLMService.stream`` in the worker, yielding chunks as they arrive."""
+        with self._channel_locks[_GENERATION]:
+            connection, process, request_id = self._send_request_locked(_GENERATION, "stream", args, kwargs)
+            finished = False
+            try:
+                while True:
+                    kind, _, payload = self._receive_locked(connection, process, request_id)
+                    if kind != "partial":
+                        finished = True
+                        break
+                    yield payload
+            finally:
+                # Drain an abandoned stream so the next reply is not mistaken for this one.
+                while not finished and self.is_started():
+                    try:
+                        finished = self._receive_locked(connection, process, request_id)[0] != "partial"
+                    except WorkerUnavailableError:
+                        break
+        if kind == "error":
+            raise RuntimeError(f"Inference worker stream failed: {payload}")
+
+    def close(self) -> None:
+        """Stop the worker process and do not restart it."""
+        self._closed = True
+        with self._lock:
+            self._started.clear()
+            if _GENERATION in self._connections:
+                try:
+                    send_message(self._connections[_GENERATION], (None, "shutdown", (), {}))
+                except OSError:
+                    pass
+            if self._process is not None:
+                self._process.join(timeout=5)
+                if self._process.is_alive():
+                    self._process.terminate()
+            self._connections = {}
+            self._process = None
+
+    def _send_request_locked(self, channel: str, method: str, args: tuple, kwargs: dict) -> tuple:
+        """Send one request on ``channel``; its lock must be held.
+
+        Returns:
+            The connection and process the request went to, and its id.
+        """
+        with self._lock:
+            connection, process = self._connections.get(channel), self._process
+        if not self.is_started() or connection is None:
+            raise WorkerUnavailableError("Inference worker is not running")
+        request_id = next(self._request_ids)
+        try:
+            send_message(connection, (request_id, method, args, kwargs), self.shared_memory_threshold)
+        except OSError as error:
+            self._handle_crash(error, process)
+        return connection, process, request_id
+
+    def _receive_locked(self, connection, process, request_id: int) -> tuple:
+        """Wait for the next message on a channel, watching for a crash; its lock must be held."""
+        try:
+            while not connection.poll(0.1):
+                if not process.is_alive():
+                    raise EOFError(f"worker exited with code {process.exitcode}")
+            message = receive_message(connection)
+        except (EOFError, OSError) as error:
+            self._handle_crash(error, process)
+        if message[1] != request_id:
+            self._handle_crash(RuntimeError(f"reply to request {message[1]}, expected {request_id}"), process)
+        return message
+
+    def _handle_crash(self, error: Exception, process) -> None:
+        """Record a crash of ``process`` once, schedule a restart and raise."""
+        with self._lock:
+            # Both channels may notice the same crash; only the first report counts.
+            if process is self._process and self._connections:
+                self._started.clear()
+                self.crashes += 1
+                if self._error_handler is not None:
+                    self._error_handler.log_error(error, context="InferenceWorker crashed")
+                if self._process.is_alive():
+                    self._process.terminate()
+                self._connections = {}
+                if not self._closed:
+                    self._launch_in_background(delay=self.restart_delay)
+        raise WorkerUnavailableError("Inference worker crashed; restarting") from error
+
+    def _launch_in_background(self, delay: float) -> None:
+        """Start (or restart) the worker process on a daemon thread."""
+        threading.Thread(target=self._launch, args=(delay,), name="InferenceWorkerLauncher", daemon=True).start()
+
+    def _launch(self, delay: float) -> None:
+        """Start the worker process and wait for its handshake.
+
+        A worker that dies while starting is retried with an exponentially
+        growing delay, capped at a minute, so a broken setup does not spin.
+        """
+        time.sleep(delay)
+        with self._lock:
+            if self._closed:
+                return
+            if self._process is not None:
+                self._process.join(timeout=5)
+                self.restarts += 1
+            self._state.value = 0
+            parent_connection, child_connection = self._context.Pipe()
+            parent_embedding_connection, child_embedding_connection = self._context.Pipe()
+            process = self._context.Process(
+                target=_serve,
+                args=(child_connection, child_embedding_connection, self._state, self.backend, self.cpu_profile,
+                      self.host_embeddings, self.shared_memory_threshold),
+                name="InferenceWorker",
+                daemon=True,
+            )
+            process.start()
+            child_connection.close()
+            child_embedding_connection.close()
+            self._process = process
+
+        try:
+            while not parent_connection.poll(0.1):
+                if not process.is_alive():
+                    raise EOFError(f"worker exited with code {process.exitcode} while starting")
+            receive_message(parent_connection)
+        except (EOFError, OSError) as error:
+            self.crashes += 1
+            self._failed_starts += 1
+            if self._error_handler is not None:
+                self._error_handler.log_error(error, context="InferenceWorker failed to start")
+            if not self._closed:
+                self._launch_in_background(delay=min(60.0, self.restart_delay * 2 ** self._failed_starts))
+            return
+
+        with self._lock:
+            if self._closed:
+                send_message(parent_connection, (None, "shutdown", (), {}))
+                return
+            self._failed_starts = 0
+            self._connections = {_GENERATION: parent_connection, _EMBEDDING: parent_embedding_connection}
+            self._started.set()
+
+
+class WorkerBackend:
+    """:class:`GenerationBackend` whose model runs inside an :class:`InferenceWorker`."""
+
+    name = "worker"
+
+    def __init__(self, worker: InferenceWorker) -> None:
+        self.worker = worker
+
+    def generate(self, messages: list, cache_key: Optional[Hashable] = None,
+                 cache_signature: Optional[Hashable] = None, **generate_kwargs) -> str:
+        """Generate a complete reply to ``messages`` in the worker."""
+        return self.worker.call(
+            "generate", messages, cache_key=cache_key, cache_signature=cache_signature, **generate_kwargs
+        )
+
+    def batch_generate(self, prompts: list[list], **generate_kwargs) -> list[str]:
+        """Generate one reply per prompt in the worker, in order."""
+        return self.worker.call("batch_generate", prompts, **generate_kwargs)
+
+    def stream(self, messages: list, cache_key: Optional[Hashable] = None,
+               cache_signature: Optional[Hashable] = None, **generate_kwargs) -> Iterator[str]:
+        """Stream a reply to ``messages`` from the worker."""
+        return self.worker.stream(
+            messages, cache_key=cache_key, cache_signature=cache_signature, **generate_kwargs
+        )
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens with the worker's tokenizer, without waiting for a running generation."""
+        return self.worker.call("count_tokens", text)
+
+    def close(self) -> None:
+        """Nothing to drop here; the worker's caches go with its process."""
+
+
+class WorkerLLMService(LLMService):
+    """:class:`LLMService` whose model is hosted by an :class:`InferenceWorker`.
+
+    Readiness and state follow the worker: while it is restarting after a
+    crash, :attr:`model` is ``None`` and callers use the fallback replies.
+    """
+
+    def __init__(self, worker: InferenceWorker) -> None:
+        self.worker = worker
+        self._backend = WorkerBackend(worker)
+        self._detached = False
+        self._closed = False
+        super().__init__(background=False, cpu_profile=worker.cpu_profile, backend=WorkerBackend.name,
+                         generation_backend=self._backend)
+
+    @property
+    def model(self) -> Optional[WorkerBackend]:
+        """The worker backend while the worker's model can serve requests."""
+        if self._detached or self.state not in (self.STATE_READY, self.STATE_FALLBACK):
+            return None
+        return self._backend
+
+    @model.setter
+    def model(self, value: Optional[WorkerBackend]) -> None:
+        self._detached = value is None
+
+    @property
+    def state(self) -> str:
+        """The worker's language model state, ``"loading"`` while it restarts."""
+        if self._closed:
+            return self.STATE_CLOSED
+        return self.worker.llm_state()
+
+    @state.setter
+    def state(self, value: str) -> None:
+        # LLMService publishes its loading progress here; the worker's own state wins until closed.
+        self._closed = value == self.STATE_CLOSED
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the worker's model is ready or ``timeout`` seconds pass."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_ready() and self.state not in (self.STATE_FAILED, self.STATE_CLOSED):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(0.1)
+        return self.is_ready()
+
+
+class WorkerEmbeddings(Embeddings):
+    """LangChain embeddings computed by an :class:`InferenceWorker`.
+
+    Calls made while the worker is (re)starting wait up to
+    ``start_timeout`` seconds for it before failing.
+    """
+
+    def __init__(self, worker: InferenceWorker, start_timeout: float = 120.0) -> None:
+        self.worker = worker
+        self.start_timeout = start_timeout
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed several texts in the worker."""
+        self._wait_for_worker()
+        return self.worker.call("embed_documents", list(texts))
+
+    def embed_query(self, text: str) -> list[float]:
+        """Embed one query in the worker."""
+        self._wait_for_worker()
+        return self.worker.call("embed_query", text)
+
+    def _wait_for_worker(self) -> None:
+        if not self.worker.wait_until_started(self.start_timeout):
+            raise WorkerUnavailableError("Inference worker did not start in time")
@@ -1,73 +1,177 @@
-import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+import logging
+import threading
+from typing import Hashable, Iterator, Optional
+
 from config.ModelConfig import ModelConfig
-from langchain_huggingface import ChatHuggingFace, HuggingFacePipeline
+from Services.FakeBackend import FakeBackend
+from Services.GenerationBackend import GenerationBackend
+
+logger = logging.getLogger("MurderMysteryGame")
 
 class LLMService:
-    
-    def __init__(self):
+    """Loads the generation backend on a background thread and tracks its readiness.
+
+    The backend selected by ``ModelConfig.GENERATION_BACKEND`` is exposed
+    through ``self.model`` once loading has finished. Until then
+    ``self.model`` is ``None`` and callers are expected to use the rule-based
+    fallback responses.
+    """
+
+    STATE_LOADING = "loading"
+    STATE_READY = "ready"
+    STATE_FALLBACK = "fallback"
+    STATE_FAILED = "failed"
+    STATE_CLOSED = "closed"
+
+    def __init__(self, background: bool = True, cpu_profile: Optional[str] = None,
+                 backend: Optional[str] = None, generation_backend: Optional[GenerationBackend] = None):
+        """Create the service and start loading the model.
+
+        Args:
+            background: When ``True`` (the default) the weights are loaded on a
+                daemon thread so construction returns immediately. When
+                ``False`` the model is loaded before the constructor returns.
+            cpu_profile: ``"fp32"``, ``"bf16"``, ``"int8"`` or ``"auto"``.
+                Defaults to ``ModelConfig.CPU_PROFILE``. Ignored when CUDA is
+                available.
+            backend: ``"huggingface"`` or ``"fake"``. Defaults to
+                ``ModelConfig.GENERATION_BACKEND``.
+            generation_backend: An already constructed backend to serve
+                requests with instead of loading one named by ``backend``.
+        """
         self.model_name = ModelConfig.DEFAULT_MODEL
         self.fallback_model = ModelConfig.FALLBACK_MODEL
-        self.model = self._initialize_llm()
-        
-    
-    def _initialize_llm(self):
+        self.cpu_profile = cpu_profile
+        self.backend_name = backend or ModelConfig.GENERATION_BACKEND
+        self._generation_backend = generation_backend
+        self.model: Optional[GenerationBackend] = None
+        self.state = self.STATE_LOADING
+        self._ready_event = threading.Event()
+        self._loader_thread: Optional[threading.Thread] = None
+
+        if background:
+            self._loader_thread = threading.Thread(target=self._load, name="LLMServiceLoader")
+            self._loader_thread.daemon = True
+            self._loader_thread.start()
+        else:
+            self._load()
+
+    def _load(self) -> None:
+        """Load the model and publish the resulting state."""
+        try:
+            self.model = self._initialize_llm()
+        finally:
+            self._ready_event.set()
+
+    def is_ready(self) -> bool:
+        """Return ``True`` once a model (primary or fallback) can serve requests."""
+        return self.model is not None
+
+    def is_loading(self) -> bool:
+        """Return ``True`` while the model is still being loaded."""
+        return self.state == self.STATE_LOADING
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until loading has finished or ``timeout`` seconds have passed.
+
+        Returns:
+            bool: ``True`` if a model is available, ``False`` if loading timed
+            out or every model failed to load.
+        """
+        self._ready_event.wait(timeout)
+        return self.is_ready()
+
+    def generate(self, messages: list, cache_key: Optional[Hashable] = None,
+                 cache_signature: Optional[Hashable] = None, **generate_kwargs) -> str:
+        """Generate a complete reply to ``messages`` with the loaded backend."""
+        return self._require_backend().generate(
+            messages, cache_key=cache_key, cache_signature=cache_signature, **generate_kwargs
+        )
+
+    def stream(self, messages: list, cache_key: Optional[Hashable] = None,
+               cache_signature: Optional[Hashable] = None, **generate_kwargs) -> Iterator[str]:
+        """Generate a reply to ``messages`` and yield text chunks as they decode."""
+        return self._require_backend().stream(
+            messages, cache_key=cache_key, cache_signature=cache_signature, **generate_kwargs
+        )
+
+    def batch_generate(self, prompts: list[list], **generate_kwargs) -> list[str]:
+        """Generate replies for several chat prompts in one batch."""
+        return self._require_backend().batch_generate(prompts, **generate_kwargs)
+
+    def count_tokens(self, text: str) -> int:
+        """Return the number of tokens ``text`` occupies for the loaded backend."""
+        return self._require_backend().count_tokens(text)
+
+    def close(self) -> None:
+        """Close the loaded backend, dropping its caches, and release it."""
+        backend = self.model
+        if backend is not None:
+            backend.close()
+        self.model = None
+        self.state = self.STATE_CLOSED
+
+    def _require_backend(self) -> GenerationBackend:
+        """Return the loaded backend or raise if none is available."""
+        backend = self.model
+        if backend is None:
+            raise ValueError("LLM not available")
+        return backend
+
+    def _initialize_llm(self) -> Optional[GenerationBackend]:
         """Initialize the LLM"""
+        if self._generation_backend is not None:
+            self.state = self.STATE_READY
+            return self._generation_backend
+
+        if self.backend_name == FakeBackend.name:
+            self.state = self.STATE_READY
+            return FakeBackend(
+                latency=ModelConfig.FAKE_BACKEND_LATENCY,
+                token_latency=ModelConfig.FAKE_BACKEND_TOKEN_LATENCY
+            )
+
+        try:
+            from Services.HuggingFaceBackend import HuggingFaceBackend
+        except ImportError as e:
+            logger.warning("Hugging Face backend unavailable: %s. Using rule-based fallback system.", e)
+            self.state = self.STATE_FAILED
+            return None
+
         try:
             if self.model_name == None:
                 raise ValueError
-            print(f"Loading model: {self.model_name}")
             
-            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            model = AutoModelForCausalLM.from_pretrained(
+            backend = HuggingFaceBackend(
                 self.model_name,
-                dtype=torch.bfloat16,
-                device_map="auto" if torch.cuda.is_available() else None,
-                low_cpu_mem_usage=True
-            )
-            
-            pipe = pipeline(
-                "text-generation",
-                model=model,
-                tokenizer=tokenizer,
+                cpu_profile=self.cpu_profile,
                 max_new_tokens=100,
                 temperature=0.8,
                 top_p=0.9,
                 repetition_penalty=1.1,
-                do_sample=True,
-                pad_token_id=tokenizer.eos_token_id,
-                eos_token_id=tokenizer.eos_token_id
+                do_sample=True
             )
-            
-            llm = HuggingFacePipeline(pipeline=pipe)
-            chat_model = ChatHuggingFace(llm=llm)
-            print(f"Model {self.model_name} loaded successfully!")
-            return chat_model
+            logger.info("Model %s loaded successfully", self.model_name)
+            self.state = self.STATE_READY
+            return backend
             
         except Exception as e:
-            print(f"Error loading model {self.model_name}: {e}")
-            print("Falling back to simpler model...")
+            logger.warning("Error loading model %s: %s", self.model_name, e)
             
             try:
-                print(f"Trying fallback model: {self.fallback_model}")
-                
-                tokenizer = AutoTokenizer.from_pretrained(self.fallback_model)
-                model = AutoModelForCausalLM.from_pretrained(str(self.fallback_model))
+                logger.info("Trying fallback model: %s", self.fallback_model)
                 
-                pipe = pipeline(
-                    "text-generation",
-                    model=model,
-                    tokenizer=tokenizer,
+                backend = HuggingFaceBackend(
+                    str(self.fallback_model),
+                    cpu_profile=self.cpu_profile,
                     max_new_tokens=50,
                     temperature=0.7
                 )
-                
-                llm = HuggingFacePipeline(pipeline=pipe)
-                chat_model = ChatHuggingFace(llm=llm)
-                print("Fallback model loaded successfully!")
-                return chat_model
+                logger.info("Fallback model loaded successfully")
+                self.state = self.STATE_FALLBACK
+                return backend
                 
             except Exception as e2:
-                print(f"Error loading fallback model: {e2}")
-                print("Using rule-based fallback system.")
+                logger.error("Error loading fallback model: %s. Using rule-based fallback system.", e2)
+                self.state = self.STATE_FAILED
                 return None
\ No newline at end of file
@@ -0,0 +1,183 @@
+import re
+import threading
+from collections import Counter, deque
+from typing import Callable, Hashable, Optional
+
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from Services.ErrorHandler import ErrorHandler
+from Services.SpeculationService import SpeculationService, lower_thread_priority
+from Services.StopPolicy import PreemptibleStopPolicy
+
+
+class MemoryCompactor:
+    """Summarizes old conversations and runs compaction jobs in the background.
+
+    Jobs run one at a time on a single low-priority daemon thread, and each
+    waits until the ``speculation_service`` reports no foreground generation,
+    so compaction never competes with an answer the player is waiting for.
+    :meth:`summarize` uses the language model when ``llm_service`` has one
+    ready and otherwise falls back to an extractive summary built from the
+    most salient response sentences.
+
+    A language model summary is queued on the speculation worker, so it never
+    runs alongside a speculative draft, and it is pre-empted: decoding stops
+    as soon as a foreground generation starts, and the extractive summary is
+    used instead. No summary is generated while a foreground request waits.
+    """
+
+    SUMMARY_INSTRUCTIONS = (
+        "Summarize what was said in these conversations from a murder mystery game. "
+        "Keep every claim about places, times, items and other people. "
+        "Answer in at most {sentences} sentences, with no preamble."
+    )
+    STOPWORDS = {
+        "a", "an", "and", "are", "as", "at", "be", "but", "by", "did", "do", "for", "from", "had",
+        "have", "he", "her", "his", "i", "in", "is", "it", "me", "my", "no", "not", "of", "on",
+        "or", "she", "so", "that", "the", "there", "they", "this", "to", "was", "we", "were",
+        "what", "where", "who", "with", "you", "your",
+    }
+
+    _SENTENCE = re.compile(r"[^.!?]+[.!?]*")
+    _WORD = re.compile(r"[a-z']+")
+
+    def __init__(
+        self,
+        llm_service=None,
+        speculation_service: Optional[SpeculationService] = None,
+        error_handler: Optional[ErrorHandler] = None,
+        summary_sentences: int = 3,
+        max_new_tokens: int = 96,
+        idle_niceness: int = 19,
+    ) -> None:
+        """Create a compactor.
+
+        Args:
+            llm_service: Optional :class:`LLMService` used for abstractive
+                summaries once its model is ready.
+            speculation_service: Tracks foreground generation and runs the
+                language model summaries on its worker thread.
+            error_handler: Optional error handler used to log failed jobs.
+            summary_sentences: Length of a summary, in sentences.
+            max_new_tokens: Token budget of an LLM summary.
+            idle_niceness: Scheduling niceness applied to the worker thread
+                where the platform supports per-thread priorities.
+        """
+        self.llm_service = llm_service
+        self._speculation_service = speculation_service
+        self._error_handler = error_handler
+        self.summary_sentences = summary_sentences
+        self.max_new_tokens = max_new_tokens
+        self._idle_niceness = idle_niceness
+        self._jobs: "deque[Hashable]" = deque()
+        self._pending: dict[Hashable, Callable[[], None]] = {}
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._running = False
+        self.compactions = 0
+
+    def submit(self, key: Hashable, job: Callable[[], None]) -> None:
+        """Queue ``job``; a job already queued under ``key`` is not queued twice."""
+        with self._condition:
+            if key in self._pending:
+                return
+            self._pending[key] = job
+            self._jobs.append(key)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="MemoryCompactor")
+                self._worker.daemon = True
+                self._worker.start()
+            self._condition.notify_all()
+
+    def wait_until_done(self, timeout: Optional[float] = None) -> bool:
+        """Wait for every queued job to finish; ``False`` on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._jobs and not self._running, timeout)
+
+    def summarize(self, documents: list[Document]) -> str:
+        """Summarize conversations, with the language model when it is ready."""
+        if self.llm_service is not None and self.llm_service.is_ready() and not self._foreground_active():
+            try:
+                summary = self._abstractive_summary(documents)
+                if summary:
+                    return summary
+            except Exception as error:
+                if self._error_handler is not None:
+                    self._error_handler.log_error(error, context="MemoryCompactor.summarize")
+        return self.extractive_summary(documents)
+
+    def extractive_summary(self, documents: list[Document]) -> str:
+        """Keep the response sentences whose words recur most across the conversations."""
+        sentences = []
+        for document in documents:
+            response = document.page_content.split("Response:", 1)[-1]
+            sentences += [sentence.strip() for sentence in self._SENTENCE.findall(response) if sentence.strip()]
+
+        frequencies = Counter(
+            word for sentence in sentences for word in self._content_words(sentence)
+        )
+
+        def salience(sentence: str) -> float:
+            words = self._content_words(sentence)
+            return sum(frequencies[word] for word in set(words)) / (len(words) + 1)
+
+        selected = sorted(range(len(sentences)), key=lambda index: salience(sentences[index]), reverse=True)
+        selected = sorted(set(selected[:self.summary_sentences]))
+        return " ".join(sentences[index] for index in selected)
+
+    def _abstractive_summary(self, documents: list[Document]) -> str:
+        """Ask the language model for a summary; ``""`` if a foreground request pre-empted it."""
+        transcripts = "\n\n".join(document.page_content for document in documents)
+        messages = [
+            SystemMessage(content=self.SUMMARY_INSTRUCTIONS.format(sentences=self.summary_sentences)),
+            HumanMessage(content=transcripts),
+        ]
+        stop_policy = PreemptibleStopPolicy(self._foreground_active, max_sentences=self.summary_sentences)
+
+        def generate() -> str:
+            if self._foreground_active():
+                stop_policy.preempted = True
+                return ""
+            return self.llm_service.generate(
+                messages, max_new_tokens=self.max_new_tokens, stop_policy=stop_policy
+            )
+
+        if self._speculation_service is not None:
+            summary = self._speculation_service.run_when_idle(generate)
+        else:
+            summary = generate()
+        return "" if stop_policy.preempted else summary.strip()
+
+    def _foreground_active(self) -> bool:
+        return self._speculation_service is not None and self._speculation_service.foreground_active()
+
+    def _content_words(self, sentence: str) -> list[str]:
+        return [word for word in self._WORD.findall(sentence.lower()) if word not in self.STOPWORDS]
+
+    def _run(self) -> None:
+        """Worker loop: run queued jobs once the foreground is idle."""
+        lower_thread_priority(self._idle_niceness)
+        while True:
+            with self._condition:
+                while not self._jobs:
+                    self._condition.wait()
+                key = self._jobs[0]
+
+            if self._speculation_service is not None:
+                self._speculation_service.wait_until_idle()
+
+            with self._condition:
+                self._jobs.popleft()
+                job = self._pending.pop(key)
+                self._running = True
+            try:
+                job()
+                self.compactions += 1
+            except Exception as error:
+                if self._error_handler is not None:
+                    self._error_handler.log_error(error, context="MemoryCompactor job")
+            finally:
+                with self._condition:
+                    self._running = False
+                    self._condition.notify_all()
@@ -1,15 +1,107 @@
-from langchain_huggingface import HuggingFaceEmbeddings
+import os
+import uuid
+from typing import Optional
+
 from config.ModelConfig import ModelConfig
-from langchain_chroma import Chroma
+from Services.CachedEmbeddings import CachedEmbeddings
+from Services.NumpyVectorStore import NumpyVectorStore
+from Services.SessionJanitor import SessionJanitor
 class MemoryService:
     
-    def __init__(self):
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=ModelConfig.EMBEDDING_MODEL
+    NAMESPACE_PREFIX = "conversation_memory_"
+    
+    def __init__(self, embeddings=None, session_id: Optional[str] = None):
+        """Create the vector store, loading the embedding model unless ``embeddings`` is given
+
+        Embeddings are wrapped in a :class:`CachedEmbeddings` so repeated
+        texts are only encoded once. ``ModelConfig.VECTOR_STORE`` selects the
+        in-process :class:`NumpyVectorStore` or a persistent Chroma collection.
+
+        Each game session gets its own namespace, so games sharing a host never
+        see each other's memories. With Chroma the namespace is a collection
+        named after ``session_id``, leased through a :class:`SessionJanitor`;
+        collections left behind by crashed sessions are dropped here. With
+        ``ModelConfig.CHROMA_EPHEMERAL`` the collection lives in memory only;
+        a game is then kept by saving a snapshot (see
+        ``ConversationRepository.save_snapshot``).
+        """
+        self.session_id = session_id or uuid.uuid4().hex
+        self.namespace = f"{self.NAMESPACE_PREFIX}{self.session_id}"
+        self.janitor: Optional[SessionJanitor] = None
+
+        cache_path = None
+        if ModelConfig.EMBEDDING_CACHE_PATH:
+            model_slug = ModelConfig.EMBEDDING_MODEL.replace("/", "__")
+            cache_path = os.path.join(ModelConfig.EMBEDDING_CACHE_PATH, model_slug)
+        self.embeddings = CachedEmbeddings(
+            embeddings or self.load_embeddings(),
+            max_entries=ModelConfig.EMBEDDING_CACHE_SIZE,
+            path=cache_path,
         )
 
-        self.vector_store = Chroma(
-            collection_name="conversation_memory",
-            embedding_function=self.embeddings,
-            persist_directory="./database/conversation.db"
-        )
\ No newline at end of file
+        if ModelConfig.VECTOR_STORE == "chroma":
+            from langchain_chroma import Chroma
+
+            if ModelConfig.CHROMA_EPHEMERAL:
+                # In-memory only: no per-write disk I/O, and nothing left behind to collect
+                self.vector_store = Chroma(
+                    collection_name=self.namespace,
+                    embedding_function=self.embeddings,
+                )
+            else:
+                self.janitor = SessionJanitor(ModelConfig.SESSION_LEASE_PATH, ModelConfig.SESSION_LEASE_TTL_SECONDS)
+                self.janitor.register(self.session_id)
+                self.vector_store = Chroma(
+                    collection_name=self.namespace,
+                    embedding_function=self.embeddings,
+                    persist_directory=ModelConfig.CHROMA_PERSIST_DIRECTORY
+                )
+                self.collect_orphaned_sessions()
+        else:
+            self.vector_store = NumpyVectorStore(
+                self.embeddings,
+                codec=ModelConfig.VECTOR_CODEC,
+                rerank_factor=ModelConfig.VECTOR_RERANK_FACTOR,
+                pq_subspaces=ModelConfig.VECTOR_PQ_SUBSPACES,
+                exact_rerank=ModelConfig.VECTOR_EXACT_RERANK,
+            )
+    
+    @staticmethod
+    def load_embeddings():
+        """Load the embedding model with the backend chosen by ``ModelConfig.EMBEDDING_BACKEND``
+
+        ``"onnx"`` and ``"onnx-int8"`` run an ONNX export of the model (see
+        :class:`OnnxEmbeddings`); anything else loads it through PyTorch.
+        """
+        model_slug = ModelConfig.EMBEDDING_MODEL.replace("/", "__")
+        if ModelConfig.EMBEDDING_BACKEND in ("onnx", "onnx-int8"):
+            from Services.OnnxEmbeddings import OnnxEmbeddings
+
+            return OnnxEmbeddings(
+                ModelConfig.EMBEDDING_MODEL,
+                os.path.join(ModelConfig.EMBEDDING_ONNX_PATH, model_slug),
+                quantize=ModelConfig.EMBEDDING_BACKEND == "onnx-int8",
+            )
+        
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        return HuggingFaceEmbeddings(model_name=ModelConfig.EMBEDDING_MODEL)
+    
+    def collect_orphaned_sessions(self) -> list[str]:
+        """Drop the collections of sessions whose game is no longer running"""
+        if self.janitor is None:
+            return []
+        client = self.vector_store._client
+        names = [getattr(collection, "name", collection) for collection in client.list_collections()]
+        stored = {name[len(self.NAMESPACE_PREFIX):]: name for name in names if name.startswith(self.NAMESPACE_PREFIX)}
+        
+        def drop(session_id: str) -> None:
+            if session_id in stored:
+                client.delete_collection(stored[session_id])
+        
+        return self.janitor.collect_orphans(stored, drop)
+    
+    def close(self) -> None:
+        """Release this session's namespace lease"""
+        if self.janitor is not None:
+            self.janitor.release(self.session_id)
@@ -0,0 +1,87 @@
+import json
+import os
+import shutil
+from typing import Any, Optional
+
+import numpy as np
+
+
+class MemorySnapshot:
+    """One session's conversation memories, saved so they load without re-embedding.
+
+    A snapshot is a directory holding two files:
+
+    * ``metadata.json``: the document ids, texts and metadata stored column
+      by column (one list per field, ``None`` where a document lacks it), so
+      field names are written once rather than once per document.
+    * ``vectors.f16`` or ``vectors.f32``: the embeddings as one raw row-major
+      array, memory-mapped on load.
+
+    Snapshots are written to a temporary directory and swapped in, so an
+    interrupted save never leaves a half-written snapshot behind.
+    """
+
+    METADATA_FILE = "metadata.json"
+    VECTOR_FILES = {"float16": "vectors.f16", "float32": "vectors.f32"}
+    VERSION = 1
+
+    def __init__(self, ids: list[str], texts: list[str], metadatas: list[dict[str, Any]], vectors: np.ndarray) -> None:
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self.vectors = vectors
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def save(self, path: str, dtype: str = "float16") -> None:
+        """Write the snapshot to the directory ``path``, replacing any previous one."""
+        if dtype not in self.VECTOR_FILES:
+            raise ValueError(f"Unsupported snapshot dtype '{dtype}', expected one of {', '.join(self.VECTOR_FILES)}")
+        vectors = np.ascontiguousarray(self.vectors, dtype=dtype)
+        fields = sorted({field for metadata in self.metadatas for field in metadata})
+        header = {
+            "version": self.VERSION,
+            "dtype": dtype,
+            "count": len(self.ids),
+            "dimension": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+            "ids": self.ids,
+            "texts": self.texts,
+            "metadata": {field: [metadata.get(field) for metadata in self.metadatas] for field in fields},
+        }
+
+        temporary_path = f"{path.rstrip(os.sep)}.tmp"
+        previous_path = f"{path.rstrip(os.sep)}.old"
+        # Leftovers of an interrupted save would block the swap or leak into this snapshot
+        for stale_path in (temporary_path, previous_path):
+            shutil.rmtree(stale_path, ignore_errors=True)
+        os.makedirs(temporary_path)
+        vectors.tofile(os.path.join(temporary_path, self.VECTOR_FILES[dtype]))
+        with open(os.path.join(temporary_path, self.METADATA_FILE), "w", encoding="utf-8") as metadata_file:
+            json.dump(header, metadata_file, separators=(",", ":"))
+
+        if os.path.exists(path):
+            os.replace(path, previous_path)
+        os.replace(temporary_path, path)
+        shutil.rmtree(previous_path, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: str) -> "MemorySnapshot":
+        """Read the snapshot in ``path``; its vectors are memory-mapped, not copied."""
+        with open(os.path.join(path, cls.METADATA_FILE), encoding="utf-8") as metadata_file:
+            header = json.load(metadata_file)
+        if header.get("version") != cls.VERSION:
+            raise ValueError(f"Unsupported memory snapshot version {header.get('version')}")
+
+        count, dimension, dtype = header["count"], header["dimension"], header["dtype"]
+        vectors: Optional[np.ndarray] = None
+        if count and dimension:
+            vectors = np.memmap(
+                os.path.join(path, cls.VECTOR_FILES[dtype]), dtype=dtype, mode="r", shape=(count, dimension)
+            )
+        columns = header["metadata"]
+        metadatas = [
+            {field: values[row] for field, values in columns.items() if values[row] is not None}
+            for row in range(count)
+        ]
+        return cls(header["ids"], header["texts"], metadatas, vectors if vectors is not None else np.empty((0, 0)))
@@ -0,0 +1,503 @@
+import tempfile
+import threading
+import uuid
+from typing import Any, Iterable, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from Services.VectorCodec import VectorCodec
+
+
+class _ExactVectors:
+    """Full-precision unit vectors in a memory-mapped temporary file.
+
+    Rows are only paged in when read, so the exact vectors behind lossy codes
+    cost disk rather than memory. Freed rows are reused; the file is deleted
+    when it is closed or the process exits.
+    """
+
+    def __init__(self, dimension: int, capacity: int) -> None:
+        self.dimension = dimension
+        self._file = tempfile.TemporaryFile(prefix="vectors-")
+        self._rows: Optional[np.memmap] = None
+        self._size = 0
+        self._free: list[int] = []
+        self._map(max(capacity, 1))
+
+    def append(self, vectors: np.ndarray) -> np.ndarray:
+        """Write ``vectors`` and return the rows they were written to."""
+        reused = [self._free.pop() for _ in range(min(len(self._free), len(vectors)))]
+        fresh = list(range(self._size, self._size + len(vectors) - len(reused)))
+        self._size += len(fresh)
+        if self._size > self._rows.shape[0]:
+            self._map(max(self._size, self._rows.shape[0] * 2))
+        rows = np.asarray(reused + fresh, dtype=np.int64)
+        self._rows[rows] = vectors
+        return rows
+
+    def read(self, rows) -> np.ndarray:
+        return np.asarray(self._rows[rows], dtype=np.float32)
+
+    def release(self, rows) -> None:
+        self._free.extend(int(row) for row in rows)
+
+    def close(self) -> None:
+        self._rows = None
+        self._file.close()
+
+    def _map(self, capacity: int) -> None:
+        if self._rows is not None:
+            self._rows.flush()
+        self._file.truncate(capacity * self.dimension * 4)
+        self._rows = np.memmap(self._file, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+
+
+class _Partition:
+    """Documents of one player pair and their encoded unit vectors, stored row by row.
+
+    With a lossy codec each row also points at its exact vector in the
+    store's :class:`_ExactVectors`.
+    """
+
+    def __init__(self, codec: VectorCodec, capacity: int, exact: Optional[_ExactVectors] = None) -> None:
+        self.codec = codec
+        self.exact = exact
+        self.codes = np.empty((capacity, codec.code_size), dtype=codec.code_dtype)
+        self.scales = np.empty(capacity, dtype=np.float32)
+        self.turns = np.empty(capacity, dtype=np.int64)
+        self.exact_rows = np.empty(capacity, dtype=np.int64)
+        self.documents: list[Document] = []
+        self.ids: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, ids: list[str], vectors: np.ndarray, documents: list[Document]) -> None:
+        """Encode and append rows, doubling the arrays when they are full."""
+        size = len(self.ids)
+        needed = size + len(ids)
+        if needed > self.codes.shape[0]:
+            capacity = max(needed, self.codes.shape[0] * 2)
+            self.codes = self._grown(self.codes, size, capacity)
+            self.scales = self._grown(self.scales, size, capacity)
+            self.turns = self._grown(self.turns, size, capacity)
+            self.exact_rows = self._grown(self.exact_rows, size, capacity)
+        if self.exact is not None:
+            self.exact_rows[size:needed] = self.exact.append(vectors)
+        self.codes[size:needed], self.scales[size:needed] = self.codec.encode(vectors)
+        self.turns[size:needed] = [NumpyVectorStore.turn_of(document) for document in documents]
+        self.ids.extend(ids)
+        self.documents.extend(documents)
+
+    def reencode(self, vectors: np.ndarray) -> None:
+        """Replace every row's code, e.g. after the codec was retrained."""
+        size = len(self.ids)
+        self.codes[:size], self.scales[:size] = self.codec.encode(vectors)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        size = len(self.ids)
+        return self.codec.scores(self.codes[:size], self.scales[:size], query)
+
+    def vectors(self, rows) -> np.ndarray:
+        """Return the vectors of ``rows``: exact if kept, otherwise decoded from their codes."""
+        if self.exact is not None:
+            return self.exact.read(self.exact_rows[rows])
+        return self.codec.decode(self.codes[rows], self.scales[rows])
+
+    def remove(self, rows: list[int]) -> None:
+        """Remove rows, keeping the remaining ones contiguous and in order."""
+        if self.exact is not None:
+            self.exact.release(self.exact_rows[rows])
+        keep = np.setdiff1d(np.arange(len(self.ids)), rows)
+        size = len(keep)
+        self.codes[:size] = self.codes[keep]
+        self.scales[:size] = self.scales[keep]
+        self.turns[:size] = self.turns[keep]
+        self.exact_rows[:size] = self.exact_rows[keep]
+        self.ids = [self.ids[row] for row in keep]
+        self.documents = [self.documents[row] for row in keep]
+
+    @staticmethod
+    def _grown(array: np.ndarray, size: int, capacity: int) -> np.ndarray:
+        grown = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[:size] = array[:size]
+        return grown
+
+
+class NumpyVectorStore(VectorStore):
+    """In-process vector store doing exact cosine search with NumPy.
+
+    Documents are partitioned by their ``player_ids`` metadata; each
+    partition keeps its unit-normalized embeddings in one contiguous matrix,
+    so a search filtered on a player pair is a single matrix-vector product
+    over that pair's rows. Filters follow Chroma's syntax for the fields the
+    game uses: ``player_ids`` by equality and ``turn`` by equality or
+    ``$eq``/``$ne``/``$gt``/``$gte``/``$lt``/``$lte``, optionally combined
+    with ``$and``. Nothing is persisted.
+
+    Vectors are stored by a :class:`VectorCodec`: float32, or the smaller
+    float16, int8 and product-quantized (``pq``) codes. With exact
+    re-ranking, the exact vectors behind lossy codes are written to a
+    memory-mapped temporary file, and only the ``rerank_factor * k`` best
+    candidates of a search are read back to re-score them exactly. Memory
+    then holds just the codes, but the side file costs the full float32
+    size on disk, so re-ranking is only on by default for ``pq``, whose
+    codes alone rank poorly; float16 and int8 search their codes directly.
+    Nothing is embedded again either way. The ``pq`` codebooks are learned from the stored
+    vectors, and relearned each time the store doubles in size up to
+    ``pq_max_training`` vectors.
+    """
+
+    PARTITION_KEY = "player_ids"
+    _COMPARISONS = {
+        "$eq": np.equal, "$ne": np.not_equal,
+        "$gt": np.greater, "$gte": np.greater_equal,
+        "$lt": np.less, "$lte": np.less_equal,
+    }
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        initial_capacity: int = 64,
+        codec: str = "float32",
+        rerank_factor: int = 4,
+        pq_subspaces: int = 48,
+        pq_max_training: int = 4096,
+        exact_rerank: Optional[bool] = None,
+    ) -> None:
+        """Create an empty store.
+
+        Args:
+            embedding: Embeddings used for documents and queries.
+            initial_capacity: Rows allocated for a new partition.
+            codec: Vector storage: ``"float32"``, ``"float16"``, ``"int8"``
+                or ``"pq"``.
+            rerank_factor: Candidates re-ranked exactly per requested result
+                with a lossy codec.
+            pq_subspaces: Bytes per vector with the ``pq`` codec.
+            pq_max_training: Store size after which ``pq`` codebooks are no
+                longer relearned.
+            exact_rerank: Keep exact vectors on disk to re-rank lossy codes.
+                Defaults to on for ``pq`` only.
+        """
+        self._embedding = embedding
+        self.initial_capacity = initial_capacity
+        self.codec_name = codec
+        self.rerank_factor = rerank_factor
+        self.pq_subspaces = pq_subspaces
+        self.pq_max_training = pq_max_training
+        self.exact_rerank = codec == "pq" if exact_rerank is None else exact_rerank
+        self._codec: Optional[VectorCodec] = None
+        self._exact: Optional[_ExactVectors] = None
+        self._partitions: dict[str, _Partition] = {}
+        self._locations: dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    @staticmethod
+    def turn_of(document: Document) -> int:
+        """Return the turn a document was recorded on, ``-1`` if unknown."""
+        try:
+            return int(document.metadata.get("turn", -1))
+        except (TypeError, ValueError):
+            return -1
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: Optional[list[dict]] = None,
+        *,
+        ids: Optional[list[str]] = None,
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[list[dict]] = None,
+        *,
+        ids: Optional[list[str]] = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        """Embed ``texts`` in one batch and store them."""
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        documents = [Document(page_content=text, metadata=dict(metadata)) for text, metadata in zip(texts, metadatas)]
+        return self.add_documents(documents, ids=ids)
+
+    def add_documents(self, documents: list[Document], **kwargs: Any) -> list[str]:
+        """Embed ``documents`` in one batch and store them."""
+        if not documents:
+            return []
+        vectors = self._normalize(self._embedding.embed_documents([document.page_content for document in documents]))
+        return self._add_vectors(documents, vectors, kwargs.get("ids"))
+
+    def _add_vectors(self, documents: list[Document], vectors: np.ndarray, ids: Optional[list[str]]) -> list[str]:
+        """Store documents with their unit vectors, replacing documents with the same id."""
+        if not documents:
+            return []
+        ids = ids or [document.id or str(uuid.uuid4()) for document in documents]
+        with self._lock:
+            self.delete([document_id for document_id in ids if document_id in self._locations])
+            if self._codec is None:
+                self._codec = VectorCodec.create(self.codec_name, vectors.shape[1], self.pq_subspaces)
+                if not self._codec.exact and self.exact_rerank:
+                    self._exact = _ExactVectors(vectors.shape[1], self.initial_capacity)
+            if self._codec.needs_training:
+                self._train_locked(vectors)
+            groups: dict[str, list[int]] = {}
+            for index, document in enumerate(documents):
+                groups.setdefault(str(document.metadata.get(self.PARTITION_KEY, "")), []).append(index)
+            for key, indexes in groups.items():
+                partition = self._partitions.get(key)
+                if partition is None:
+                    partition = self._partitions[key] = _Partition(self._codec, self.initial_capacity, self._exact)
+                partition.append(
+                    [ids[index] for index in indexes],
+                    vectors[indexes],
+                    [Document(id=ids[index], page_content=documents[index].page_content,
+                              metadata=dict(documents[index].metadata)) for index in indexes],
+                )
+                for index in indexes:
+                    self._locations[ids[index]] = key
+        return ids
+
+    def similarity_search(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> list[Document]:
+        return [document for document, _ in self.similarity_search_with_score(query, k, filter=filter)]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        """Return the ``k`` documents most cosine-similar to ``query`` with their similarity."""
+        vector = self._normalize([self._embedding.embed_query(query)])[0]
+        return self.similarity_search_by_vector_with_score(vector, k, filter=filter)
+
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, filter: Optional[dict] = None, **kwargs: Any
+    ) -> list[Document]:
+        vector = self._normalize([embedding])[0]
+        return [document for document, _ in self.similarity_search_by_vector_with_score(vector, k, filter=filter)]
+
+    def similarity_search_by_vector_with_score(
+        self, vector: np.ndarray, k: int = 4, filter: Optional[dict] = None
+    ) -> list[tuple[Document, float]]:
+        """Top-``k`` search for a unit vector, exact after re-ranking if enabled."""
+        conditions = self._conditions(filter)
+        pair = conditions.pop(self.PARTITION_KEY, None)
+        with self._lock:
+            if pair is not None:
+                partitions = [self._partitions[pair]] if pair in self._partitions else []
+            else:
+                partitions = list(self._partitions.values())
+            rerank = self._exact is not None
+            limit = k * self.rerank_factor if rerank else k
+
+            candidates: list[tuple[float, Document]] = []
+            for partition in partitions:
+                size = len(partition)
+                if not size:
+                    continue
+                scores = partition.scores(vector)
+                mask = self._turn_mask(partition.turns[:size], conditions.get("turn", []))
+                if mask is not None:
+                    scores = np.where(mask, scores, -np.inf)
+                top = min(limit, size)
+                rows = np.argpartition(-scores, top - 1)[:top]
+                rows = rows[np.isfinite(scores[rows])]
+                if rerank:
+                    # Re-score the candidates against their exact vectors
+                    scores = np.full(size, -np.inf, dtype=np.float32)
+                    scores[rows] = partition.vectors(rows) @ vector
+                candidates.extend((float(scores[row]), partition.documents[row]) for row in rows)
+
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+        return [(document, score) for score, document in candidates[:k]]
+
+    def _train_locked(self, vectors: np.ndarray) -> None:
+        """(Re)learn the codebooks when the store has doubled; the lock must be held."""
+        codec = self._codec
+        stored = len(self._locations)
+        if codec.is_trained and (stored + len(vectors) < 2 * codec.trained_on or codec.trained_on >= self.pq_max_training):
+            return
+        partitions = [partition for partition in self._partitions.values() if len(partition)]
+        existing = [partition.vectors(np.arange(len(partition))) for partition in partitions]
+        codec.fit(np.concatenate(existing + [vectors])[-self.pq_max_training:])
+        for partition, partition_vectors in zip(partitions, existing):
+            partition.reencode(partition_vectors)
+
+    @property
+    def bytes_per_vector(self) -> int:
+        """Memory used by one vector's code."""
+        return self._codec.bytes_per_vector if self._codec is not None else 0
+
+    @property
+    def disk_bytes_per_vector(self) -> int:
+        """Disk used by one vector's exact copy, ``0`` without exact re-ranking."""
+        return self._exact.dimension * 4 if self._exact is not None else 0
+
+    def _similarity_search_with_relevance_scores(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        return [
+            (document, (score + 1.0) / 2.0)
+            for document, score in self.similarity_search_with_score(query, k, filter=kwargs.get("filter"))
+        ]
+
+    def get_by_ids(self, ids, /) -> list[Document]:
+        with self._lock:
+            documents = []
+            for document_id in ids:
+                key = self._locations.get(document_id)
+                if key is not None:
+                    partition = self._partitions[key]
+                    documents.append(partition.documents[partition.ids.index(document_id)])
+            return documents
+
+    def get(self, where: Optional[dict] = None, include: Optional[list[str]] = None) -> dict[str, Any]:
+        """Return ids, texts and metadata of the stored documents, Chroma style.
+
+        With ``"embeddings"`` in ``include`` the stored unit vectors are
+        returned too, as one float32 matrix: their exact values when kept
+        for re-ranking, otherwise decoded from their codes.
+        """
+        conditions = self._conditions(where)
+        pair = conditions.pop(self.PARTITION_KEY, None)
+        result: dict[str, Any] = {"ids": [], "documents": [], "metadatas": []}
+        vectors = []
+        with self._lock:
+            for key, partition in self._partitions.items():
+                if pair is not None and key != pair:
+                    continue
+                size = len(partition)
+                mask = self._turn_mask(partition.turns[:size], conditions.get("turn", []))
+                rows = [row for row in range(size) if mask is None or mask[row]]
+                for row in rows:
+                    result["ids"].append(partition.ids[row])
+                    result["documents"].append(partition.documents[row].page_content)
+                    result["metadatas"].append(partition.documents[row].metadata)
+                if include and "embeddings" in include:
+                    vectors.append(partition.vectors(rows))
+        if include and "embeddings" in include:
+            dimension = self._codec.dimension if self._codec is not None else 0
+            result["embeddings"] = np.concatenate(vectors) if vectors else np.empty((0, dimension), dtype=np.float32)
+        return result
+
+    def add_embeddings(
+        self,
+        texts: list[str],
+        embeddings,
+        metadatas: Optional[list[dict]] = None,
+        ids: Optional[list[str]] = None,
+    ) -> list[str]:
+        """Store documents whose embeddings are already known, without embedding them again."""
+        metadatas = metadatas or [{} for _ in texts]
+        documents = [Document(page_content=text, metadata=dict(metadata)) for text, metadata in zip(texts, metadatas)]
+        return self._add_vectors(documents, self._normalize(embeddings), ids)
+
+    def update_metadata(self, ids: list[str], metadatas: list[dict]) -> None:
+        """Replace the metadata of stored documents, keeping their vectors; unknown ids are ignored."""
+        with self._lock:
+            for document_id, metadata in zip(ids, metadatas):
+                key = self._locations.get(document_id)
+                if key is None:
+                    continue
+                partition = self._partitions[key]
+                row = partition.ids.index(document_id)
+                document = partition.documents[row]
+                partition.documents[row] = Document(id=document_id, page_content=document.page_content,
+                                                    metadata=dict(metadata))
+                partition.turns[row] = self.turn_of(partition.documents[row])
+
+    def delete(self, ids: Optional[list[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """Delete documents by id; ``None`` deletes everything."""
+        with self._lock:
+            if ids is None:
+                self._partitions.clear()
+                self._locations.clear()
+                self._codec = None
+                if self._exact is not None:
+                    self._exact.close()
+                    self._exact = None
+                return True
+            rows: dict[str, list[int]] = {}
+            for document_id in ids:
+                key = self._locations.pop(document_id, None)
+                if key is not None:
+                    rows.setdefault(key, []).append(self._partitions[key].ids.index(document_id))
+            for key, partition_rows in rows.items():
+                partition = self._partitions[key]
+                partition.remove(partition_rows)
+                if not len(partition):
+                    del self._partitions[key]
+            return True
+
+    def delete_collection(self) -> None:
+        """Delete every document."""
+        self.delete()
+
+    def count(self) -> int:
+        """Number of stored documents."""
+        with self._lock:
+            return len(self._locations)
+
+    def count_pair(self, player_ids: str) -> int:
+        """Number of stored documents of one player pair."""
+        with self._lock:
+            partition = self._partitions.get(player_ids)
+            return len(partition) if partition is not None else 0
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        """Return ``vectors`` as a float32 matrix of unit rows."""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    @classmethod
+    def _conditions(cls, filter: Optional[dict]) -> dict[str, Any]:
+        """Flatten a filter into ``{"player_ids": pair, "turn": [(op, value), ...]}``."""
+        conditions: dict[str, Any] = {}
+        clauses = list((filter or {}).items())
+        while clauses:
+            field, value = clauses.pop()
+            if field == "$and":
+                for clause in value:
+                    clauses.extend(clause.items())
+            elif field == cls.PARTITION_KEY:
+                if isinstance(value, dict):
+                    if set(value) != {"$eq"}:
+                        raise ValueError(f"Unsupported {cls.PARTITION_KEY} filter: {value}")
+                    value = value["$eq"]
+                conditions[field] = str(value)
+            elif field == "turn":
+                operators = value if isinstance(value, dict) else {"$eq": value}
+                for operator, operand in operators.items():
+                    if operator not in cls._COMPARISONS:
+                        raise ValueError(f"Unsupported turn filter operator: {operator}")
+                    conditions.setdefault("turn", []).append((operator, int(operand)))
+            else:
+                raise ValueError(f"Unsupported filter field: {field}")
+        return conditions
+
+    @classmethod
+    def _turn_mask(cls, turns: np.ndarray, comparisons: list[tuple[str, int]]) -> Optional[np.ndarray]:
+        """Return the rows matching every turn comparison, or ``None`` without any."""
+        mask = None
+        for operator, operand in comparisons:
+            matched = cls._COMPARISONS[operator](turns, operand)
+            mask = matched if mask is None else mask & matched
+        return mask
@@ -0,0 +1,113 @@
+import os
+from typing import Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class OnnxEmbeddings(Embeddings):
+    """Sentence embeddings computed by ONNX Runtime instead of PyTorch.
+
+    Runs an ONNX export of a sentence-transformers model, optionally with its
+    weights dynamically quantized to int8, and reproduces the
+    sentence-transformers pipeline: mean pooling of the token embeddings over
+    the attention mask followed by L2 normalization. The vectors therefore
+    match those of ``HuggingFaceEmbeddings`` for the same model (up to
+    quantization error with int8), so memories stored by either backend stay
+    searchable. Only ``onnxruntime`` and ``tokenizers`` are needed at run
+    time; :meth:`export` needs ``optimum`` (and PyTorch) once.
+    """
+
+    MODEL_FILE = "model.onnx"
+    QUANTIZED_MODEL_FILE = "model_int8.onnx"
+    TOKENIZER_FILE = "tokenizer.json"
+
+    def __init__(
+        self,
+        model_name: str,
+        directory: str,
+        quantize: bool = True,
+        batch_size: int = 32,
+        max_length: int = 256,
+        threads: int = 0,
+    ) -> None:
+        """Load the exported model, exporting it first if ``directory`` has none.
+
+        Args:
+            model_name: Hugging Face name of the sentence-transformers model.
+            directory: Directory holding the exported graph and tokenizer.
+            quantize: Run the int8 quantized graph instead of the fp32 one.
+            batch_size: Number of texts encoded per inference call.
+            max_length: Token limit per text; all-MiniLM-L6-v2 was trained
+                with 256.
+            threads: Intra-op threads for ONNX Runtime; 0 keeps its default.
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        self.directory = directory
+        self.quantize = quantize
+        self.batch_size = batch_size
+        model_file = self.QUANTIZED_MODEL_FILE if quantize else self.MODEL_FILE
+        if not os.path.exists(os.path.join(directory, model_file)):
+            self.export(model_name, directory, quantize=quantize)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(directory, self.TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(directory, model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    @classmethod
+    def export(cls, model_name: str, directory: str, quantize: bool = True) -> None:
+        """Export ``model_name`` to ONNX in ``directory``, plus an int8 copy if ``quantize``."""
+        model_path = os.path.join(directory, cls.MODEL_FILE)
+        if not os.path.exists(model_path):
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            from transformers import AutoTokenizer
+
+            ORTModelForFeatureExtraction.from_pretrained(model_name, export=True).save_pretrained(directory)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(directory)
+
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(model_path, os.path.join(directory, cls.QUANTIZED_MODEL_FILE), weight_type=QuantType.QInt8)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed ``texts`` in batches of similar length."""
+        if not texts:
+            return []
+        # Sorting by length keeps padding, and so wasted compute, low in each batch.
+        order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+        vectors: list[Optional[list[float]]] = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for index, vector in zip(batch, self._encode([texts[index] for index in batch])):
+                vectors[index] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._encode([text])[0].tolist()
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """Run one batch through the model and pool it to unit vectors."""
+        encodings = self.tokenizer.encode_batch([text.replace("\n", " ") for text in texts])
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            inputs["token_type_ids"] = np.array([encoding.type_ids for encoding in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, inputs)[0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Sequence, Tuple
+
+
+class PrefixCache:
+    """LRU store of per-NPC model key/value state for reusable prompt prefixes.
+
+    Each entry remembers the token ids the cached state was computed for and
+    the signature of the inputs that produced them. A lookup returns the
+    cached state together with the number of leading tokens it shares with
+    the new prompt; the caller is responsible for trimming a copy of the
+    state to that length before continuing generation from it.
+    """
+
+    def __init__(self, max_entries: int = 8, min_reuse_tokens: int = 16) -> None:
+        """Create a new prefix cache.
+
+        Args:
+            max_entries: Maximum number of cached prefixes kept in memory.
+            min_reuse_tokens: Shortest shared prefix worth reusing.
+        """
+        self.max_entries = max_entries
+        self.min_reuse_tokens = min_reuse_tokens
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, list[int], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def lookup(self, key: Hashable, signature: Hashable, token_ids: Sequence[int]) -> Optional[Tuple[Any, int]]:
+        """Find reusable state for ``token_ids``.
+
+        Returns:
+            ``(state, reuse_length)`` when at least ``min_reuse_tokens``
+            leading tokens match a cached entry, otherwise ``None``. The
+            reuse length always leaves at least one token to be processed.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            cached_signature, cached_ids, state = entry
+            if cached_signature != signature:
+                del self._entries[key]
+                self.invalidations += 1
+                self.misses += 1
+                return None
+
+            reuse_length = min(self._common_prefix_length(cached_ids, token_ids), len(token_ids) - 1)
+            if reuse_length < self.min_reuse_tokens:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return state, reuse_length
+
+    def store(self, key: Hashable, signature: Hashable, token_ids: Sequence[int], state: Any) -> None:
+        """Remember ``state`` as the cached computation of ``token_ids``."""
+        with self._lock:
+            self._entries[key] = (signature, list(token_ids), state)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop the entry for ``key``, or every entry when ``key`` is ``None``."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _common_prefix_length(first: Sequence[int], second: Sequence[int]) -> int:
+        """Return the number of leading tokens two sequences share."""
+        length = 0
+        for a, b in zip(first, second):
+            if a != b:
+                break
+            length += 1
+        return length
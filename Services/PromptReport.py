@@ -0,0 +1,32 @@
+class PromptReport:
+    """Token use of one assembled prompt, section by section.
+
+    ``sections`` maps each section name (``"fixed"`` for the template text,
+    persona and question) to the tokens it occupies after trimming, and
+    ``trimmed`` maps section names to the number of entries, names or
+    sentences dropped from them to fit ``budget``.
+    """
+
+    def __init__(self, template_type: str, budget: int, sections: dict[str, int], trimmed: dict[str, int]) -> None:
+        self.template_type = template_type
+        self.budget = budget
+        self.sections = sections
+        self.trimmed = trimmed
+
+    @property
+    def total(self) -> int:
+        """Tokens used by the whole prompt."""
+        return sum(self.sections.values())
+
+    @property
+    def over_budget(self) -> bool:
+        """``True`` if even the untrimmable part of the prompt exceeds the budget."""
+        return self.total > self.budget
+
+    def __str__(self) -> str:
+        sections = ", ".join(f"{name} {tokens}" for name, tokens in self.sections.items())
+        text = f"{self.template_type} prompt: {self.total}/{self.budget} tokens ({sections})"
+        dropped = {name: count for name, count in self.trimmed.items() if count}
+        if dropped:
+            text += "; trimmed " + ", ".join(f"{name} -{count}" for name, count in dropped.items())
+        return text
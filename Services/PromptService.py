@@ -1,19 +1,55 @@
+import re
+from typing import Callable, Optional
+
 from langchain_core.prompts import ChatPromptTemplate
 from entities.Question import Question
 from entities.Location import Location
 from entities.Room import Room
 from entities.Player import Player
 from config.GameConfig import GameConfig
+from config.ModelConfig import ModelConfig
+from Services.ErrorHandler import ErrorHandler
+from Services.PromptReport import PromptReport
 
 
 class PromptService:
     """Handles prompt template creation and formatting"""
     
-    def __init__(self):
+    # Sections trimmed to fit the prompt budget: (priority, entries always kept).
+    # Lower priorities are trimmed first, each from its least relevant end.
+    TRIMMABLE_SECTIONS = {
+        "location_description": (0, 0),
+        "event_description": (1, 0),
+        "current_room_description": (2, 1),
+        "nearby_players": (3, 0),
+        "context": (4, 0),
+        "known_inventory": (5, 1),
+    }
+    
+    def __init__(self, token_counter: Optional[Callable[[str], int]] = None,
+                 error_handler: Optional[ErrorHandler] = None):
+        """
+        Args:
+            token_counter: Counts tokens with the model's tokenizer, e.g.
+                ``LLMService.count_tokens``. While it is unavailable tokens
+                are estimated at four characters each.
+            error_handler: Logs the first failure of ``token_counter`` after
+                each success, so an outage is reported once.
+        """
         self.prompt_templates = self._create_prompt_templates()
+        self.token_counter = token_counter
+        self.error_handler = error_handler or ErrorHandler()
+        self._token_counter_failing = False
     
     def _create_prompt_templates(self) -> dict:
-        """Create comprehensive prompt templates for different scenarios"""
+        """Create comprehensive prompt templates for different scenarios
+
+        Each system prompt starts with the character's stable persona (who
+        they are, where they are, their role, mood and suspicion band) and
+        ends with the details that change between questions (known items,
+        nearby people, retrieved memories). Keeping the stable part first
+        lets the model reuse its cached prefix for follow-up questions.
+        """
         return {
             "basic": ChatPromptTemplate.from_messages([
                 ("system", """You are {character_name}, a {character_job} attending an event at {location_name}. 
@@ -22,15 +58,16 @@ class PromptService:
                 Current Room: {current_room_name} - {current_room_description}
                 Your Role: {role}
                 Your Mood: {character_mood}
-                Your Known Items: {known_inventory}
-                Nearby People: {nearby_players}
                 Suspicion Level: {suspicion_level}
 
-                {context}
-
                 IMPORTANT: Respond ONLY with your character's dialogue. Do not include any explanations, labels, or system messages.
                 Keep your responses brief (1-2 sentences). Stay consistent with your role and mood. 
-                If you're the murderer, be careful not to reveal your guilt. If innocent, try to be helpful."""),
+                If you're the murderer, be careful not to reveal your guilt. If innocent, try to be helpful.
+
+                Your Known Items: {known_inventory}
+                Nearby People: {nearby_players}
+
+                {context}"""),
                 ("human", "{question}")
             ]),
             
@@ -38,17 +75,18 @@ class PromptService:
                 ("system", """You are {character_name}, a {character_job} at {location_name}.
                 Your Role: {role}  
                 Your Mood: {character_mood}
-                Your Actual Inventory: {known_inventory}
                 Suspicion Level: {suspicion_level}
 
-                {context}
-
                 IMPORTANT: Respond ONLY with your character's dialogue about what items you have. 
                 - If you're INNOCENT: Be truthful about items others know you have. You can mention personal items freely.
                 - If you're the MURDERER: Be evasive about suspicious items. You might lie about or downplay certain items, especially weapons. 
                 - Never directly admit to having a murder weapon if you're the murderer.
                 - Keep responses natural and in character.
-                - Do not include any explanations, labels, or system messages."""),
+                - Do not include any explanations, labels, or system messages.
+
+                Your Actual Inventory: {known_inventory}
+
+                {context}"""),
                 ("human", "{question}")
             ]),
             
@@ -56,14 +94,15 @@ class PromptService:
                 ("system", """You are {character_name} in the {current_room_name} at {location_name}.
                 Room Description: {current_room_description}
                 Room Type: {room_type}
-                Nearby People: {nearby_players}
                 Your Role: {role}
                 Your Job: {character_job}
 
-                {context}
-
                 Incorporate your surroundings into your response naturally. Reference the room features or other people if relevant.
-                Keep responses brief and in character."""),
+                Keep responses brief and in character.
+
+                Nearby People: {nearby_players}
+
+                {context}"""),
                 ("human", "{question}")
             ]),
             
@@ -73,16 +112,47 @@ class PromptService:
                 Your Role: {role}
                 Your Mood: {character_mood}
 
-                {context}
-
                 You're feeling defensive due to high suspicion. Choose your words carefully.
                 - If INNOCENT: You might be frustrated or anxious about false suspicion.
                 - If MURDERER: You're becoming nervous and more careful about what you say.
-                Respond accordingly, keeping answers brief but meaningful."""),
+                Respond accordingly, keeping answers brief but meaningful.
+
+                {context}"""),
                 ("human", "{question}")
             ])
         }
     
+    @staticmethod
+    def suspicion_band(suspicion: int) -> str:
+        """Describe a suspicion score as a coarse band (low, moderate or high)"""
+        if suspicion > GameConfig.HIGH_SUSPICION_THRESHOLD:
+            return "high"
+        if suspicion > GameConfig.MODERATE_SUSPICION_THRESHOLD:
+            return "moderate"
+        return "low"
+    
+    def prefix_cache_key(self, question: Question, current_room: Room, template_type: str) -> tuple[tuple, tuple]:
+        """Return the cache key and signature of the listener's stable prompt prefix
+
+        The key identifies whose persona prefix this is; the signature holds
+        the inputs the prefix is built from, so a cached prefix is reused only
+        while the room, mood and suspicion band stay the same.
+        """
+        listener = question.listener
+        key = (listener.id, template_type)
+        signature = (current_room.name, listener.mood, self.suspicion_band(listener.suspicion))
+        return key, signature
+    
+    @staticmethod
+    def prompt_budget(template_type: str) -> int:
+        """Return the maximum number of tokens a prompt built from this template may use"""
+        return ModelConfig.PROMPT_TOKEN_BUDGETS.get(template_type, ModelConfig.DEFAULT_PROMPT_TOKEN_BUDGET)
+    
+    @staticmethod
+    def token_budget(template_type: str) -> int:
+        """Return the maximum number of new tokens a reply to this template may use"""
+        return ModelConfig.TEMPLATE_TOKEN_BUDGETS.get(template_type, ModelConfig.DEFAULT_TOKEN_BUDGET)
+    
     def select_template_type(self, question: Question) -> str:
         """Choose the most appropriate template based on conversation context"""
         question_lower = question.question.lower()
@@ -102,35 +172,111 @@ class PromptService:
     def create_prompt(self, question: Question, location: Location, current_room: Room, 
                      context: str, template_type: str, nearby_players: list[Player]):
         """Create appropriate prompt based on template type"""
+        return self.build_prompt(question, location, current_room, context, template_type, nearby_players)[0]
+    
+    def build_prompt(self, question: Question, location: Location, current_room: Room,
+                     context: str, template_type: str, nearby_players: list[Player]) -> tuple[list, PromptReport]:
+        """Create the prompt for ``template_type`` within its token budget
+        
+        Descriptions are split into sentences, retrieved memories into entries
+        (most relevant first) and nearby people and known items into names,
+        putting those mentioned in the question first. While the prompt is
+        over :meth:`prompt_budget`, entries are dropped from the end of the
+        lowest-priority section in :attr:`TRIMMABLE_SECTIONS`.
+        
+        Returns:
+            tuple: The chat messages and a :class:`PromptReport` of the
+            tokens each section uses.
+        """
         listener = question.listener
+        template = self.prompt_templates[template_type]
+        question_lower = question.question.lower()
 
-        nearby_players_text = ""
-        if nearby_players:
-            nearby_players_text = ", ".join([p.name for p in nearby_players if p.id != listener.id])
-
+        nearby = [p for p in nearby_players or [] if p.id != listener.id]
+        nearby.sort(key=lambda p: p.name.lower() not in question_lower)
         known_inventory = [item for item in listener.inventory if item.known]
-        inventory_text = "None known to others"
-        if known_inventory:
-            inventory_text = ", ".join([f"{item.name} ({item.description})" for item in known_inventory])
+        known_inventory.sort(key=lambda item: item.name.lower() not in question_lower)
+        context_header, context_entries = self._split_context(context)
 
-        template = self.prompt_templates[template_type]
-        
-        messages = template.format_messages(
+        sections = {
+            "location_description": self._split_sentences(location.description),
+            "event_description": self._split_sentences(location.event_description),
+            "current_room_description": self._split_sentences(current_room.description),
+            "nearby_players": [p.name for p in nearby],
+            "known_inventory": [f"{item.name} ({item.description})" for item in known_inventory],
+            "context": context_entries,
+        }
+        sections = {name: parts for name, parts in sections.items() if name in template.input_variables}
+
+        def render(name: str, parts: list[str]) -> str:
+            if name == "context":
+                return context_header + "".join(parts) if parts else ""
+            if name == "known_inventory":
+                return ", ".join(parts) if parts else "None known to others"
+            if name == "nearby_players":
+                return ", ".join(parts)
+            return " ".join(parts)
+
+        values = dict(
             character_name=listener.name,
             character_job=listener.job,
             character_mood=listener.mood,
             location_name=location.name,
-            location_description=location.description,
-            event_description=location.event_description,
             current_room_name=current_room.name,
-            current_room_description=current_room.description,
             room_type=current_room.room_type,
-            nearby_players=nearby_players_text,
-            known_inventory=inventory_text,
-            context=context,
             question=question.question,
             role="MURDERER - be defensive, evasive, and careful about what you reveal" if listener.murderer else "INNOCENT - be helpful, cooperative, and truthful",
-            suspicion_level=listener.suspicion
+            suspicion_level=self.suspicion_band(listener.suspicion)
         )
-        
-        return messages
+        values = {name: value for name, value in values.items() if name in template.input_variables}
+
+        budget = self.prompt_budget(template_type)
+        fixed_tokens = self._count_message_tokens(
+            template.format_messages(**values, **{name: "" for name in sections})
+        )
+        section_tokens = {name: self.count_tokens(render(name, parts)) for name, parts in sections.items()}
+        trimmed = {name: 0 for name in sections}
+        for name in sorted(sections, key=lambda section: self.TRIMMABLE_SECTIONS[section][0]):
+            keep = self.TRIMMABLE_SECTIONS[name][1]
+            while fixed_tokens + sum(section_tokens.values()) > budget and len(sections[name]) > keep:
+                sections[name] = sections[name][:-1]
+                trimmed[name] += 1
+                section_tokens[name] = self.count_tokens(render(name, sections[name]))
+
+        messages = template.format_messages(
+            **values, **{name: render(name, parts) for name, parts in sections.items()}
+        )
+        report = PromptReport(template_type, budget, {"fixed": fixed_tokens, **section_tokens}, trimmed)
+        return messages, report
+    
+    def count_tokens(self, text: str) -> int:
+        """Count the tokens ``text`` occupies, estimating when no tokenizer is available"""
+        if not text:
+            return 0
+        if self.token_counter is not None:
+            try:
+                count = self.token_counter(text)
+                self._token_counter_failing = False
+                return count
+            except Exception as error:
+                if not self._token_counter_failing:
+                    self._token_counter_failing = True
+                    self.error_handler.log_error(error, context="PromptService.count_tokens, estimating tokens")
+        return max(1, round(len(text) / 4))
+    
+    def _count_message_tokens(self, messages: list) -> int:
+        """Count the tokens of every message's content"""
+        return sum(self.count_tokens(message.content) for message in messages)
+    
+    @staticmethod
+    def _split_sentences(text: str) -> list[str]:
+        """Split a description into sentences"""
+        return [sentence for sentence in re.split(r"(?<=[.!?])\s+", text.strip()) if sentence]
+    
+    @staticmethod
+    def _split_context(context: str) -> tuple[str, list[str]]:
+        """Split retrieved context into its header and numbered memory entries"""
+        parts = re.split(r"(?m)^(?=\d+\. )", context)
+        if len(parts) == 1:
+            return "", [context] if context else []
+        return parts[0], parts[1:]
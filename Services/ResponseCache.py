@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+
+class ResponseCache:
+    """Semantic cache of generated NPC replies, persisted to a JSON file.
+
+    Replies are grouped by a key describing the answering character and
+    everything its reply depends on (who it is, its role, mood, suspicion
+    band, inventory, the template type, room and event location), so one
+    character's reply is never served for another. Within a group, a
+    question is answered from the cache when its embedding is at least
+    ``similarity_threshold`` cosine-similar to a previously answered one;
+    each group's embeddings are scored as one NumPy matrix, built on first
+    use and rebuilt only after the group changes. Entries expire after
+    ``ttl_seconds`` and the least recently used ones are evicted once
+    ``max_entries`` is exceeded.
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        path: Optional[str] = None,
+        similarity_threshold: float = 0.92,
+        max_entries: int = 1000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        save_every: int = 10,
+    ) -> None:
+        """Create a response cache.
+
+        Args:
+            embeddings: Object with an ``embed_query(text) -> list[float]``
+                method, e.g. ``MemoryService.embeddings``.
+            path: JSON file the cache is loaded from and saved to. ``None``
+                keeps the cache in memory only.
+            similarity_threshold: Minimum cosine similarity for a hit.
+            max_entries: Maximum number of cached replies.
+            ttl_seconds: Age after which a cached reply is discarded.
+            save_every: Number of new entries after which the file is rewritten.
+        """
+        self.embeddings = embeddings
+        self.path = path
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.save_every = save_every
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, dict]" = OrderedDict()
+        self._keys: dict[str, list[int]] = {}
+        self._matrices: dict[str, tuple[list[int], np.ndarray]] = {}
+        self._next_id = 0
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def make_key(character: str, job: str, role: str, mood: str, suspicion_band: str,
+                 inventory: Iterable[str], template_type: str, room: str, location: str) -> str:
+        """Build the cache key for a character's conversational state."""
+        return "|".join([character, job, role, mood, suspicion_band, ",".join(sorted(inventory)),
+                         template_type, room, location])
+
+    def lookup(self, key: str, question: str, embedding: Optional[list[float]] = None) -> Optional[str]:
+        """Return a cached reply for a similar question under ``key``, if any."""
+        with self._lock:
+            if key not in self._keys:
+                self.misses += 1
+                return None
+
+        embedding = embedding if embedding is not None else self.embeddings.embed_query(question)
+        query = self._unit(np.asarray([embedding], dtype=np.float32))[0]
+        now = time.time()
+        with self._lock:
+            for entry_id in [entry_id for entry_id in self._keys.get(key, [])
+                             if now - self._entries[entry_id]["created"] > self.ttl_seconds]:
+                self._remove_locked(entry_id)
+            group = self._matrix_locked(key)
+            if group is None or group[1].shape[1] != len(query):
+                self.misses += 1
+                return None
+
+            ids, matrix = group
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(ids[best])
+            self.hits += 1
+            return self._entries[ids[best]]["response"]
+
+    def store(self, key: str, question: str, response: str, embedding: Optional[list[float]] = None) -> None:
+        """Cache ``response`` as the reply to ``question`` under ``key``."""
+        embedding = embedding if embedding is not None else self.embeddings.embed_query(question)
+        with self._lock:
+            self._add_locked({
+                "key": key,
+                "question": question,
+                "response": response,
+                "embedding": [float(value) for value in embedding],
+                "created": time.time(),
+            })
+            self._unsaved += 1
+            should_save = self._unsaved >= self.save_every
+
+        if should_save:
+            self.save()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self) -> None:
+        """Load cached replies from :attr:`path`, skipping expired ones."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                stored = json.load(cache_file)
+        except (OSError, ValueError) as error:
+            print(f"Could not load response cache {self.path}: {error}")
+            return
+
+        now = time.time()
+        with self._lock:
+            for entry in stored.get("entries", []):
+                if now - entry.get("created", 0) <= self.ttl_seconds:
+                    self._add_locked(entry)
+
+    def save(self) -> None:
+        """Write the cache to :attr:`path`, replacing the previous file atomically."""
+        if not self.path:
+            return
+        with self._lock:
+            payload = {"entries": list(self._entries.values())}
+            self._unsaved = 0
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as cache_file:
+            json.dump(payload, cache_file)
+        os.replace(temporary_path, self.path)
+
+    def _add_locked(self, entry: dict) -> None:
+        """Add an entry, evicting the least recently used beyond ``max_entries``; the lock must be held."""
+        self._entries[self._next_id] = entry
+        self._keys.setdefault(entry["key"], []).append(self._next_id)
+        self._matrices.pop(entry["key"], None)
+        self._next_id += 1
+        while len(self._entries) > self.max_entries:
+            self._remove_locked(next(iter(self._entries)))
+
+    def _remove_locked(self, entry_id: int) -> None:
+        """Forget an entry; the lock must be held."""
+        key = self._entries.pop(entry_id)["key"]
+        ids = self._keys[key]
+        ids.remove(entry_id)
+        if not ids:
+            del self._keys[key]
+        self._matrices.pop(key, None)
+
+    def _matrix_locked(self, key: str) -> Optional[tuple[list[int], np.ndarray]]:
+        """Return the entry ids of ``key`` and their unit embeddings as one matrix; the lock must be held."""
+        if key not in self._keys:
+            return None
+        group = self._matrices.get(key)
+        if group is None:
+            ids = list(self._keys[key])
+            matrix = self._unit(np.asarray([self._entries[entry_id]["embedding"] for entry_id in ids], dtype=np.float32))
+            group = self._matrices[key] = (ids, matrix)
+        return group
+
+    @staticmethod
+    def _unit(vectors: np.ndarray) -> np.ndarray:
+        """Return ``vectors`` with every row scaled to unit length."""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
@@ -1,25 +1,91 @@
 import random
+from typing import Callable, Hashable, Optional
+from config.ModelConfig import ModelConfig
 from entities.Question import Question
+from Services.StopPolicy import StopPolicy
 
 
 class ResponseService:
     """Handles response generation and cleaning"""
     
-    def __init__(self, llm_service):
-        self.llm = llm_service.model if llm_service else None
+    def __init__(self, llm_service, stop_policy: Optional[StopPolicy] = None):
+        self.llm_service = llm_service
+        self.stop_policy = stop_policy or StopPolicy(
+            max_sentences=ModelConfig.STOP_MAX_SENTENCES,
+            ngram_size=ModelConfig.STOP_NGRAM_SIZE,
+            max_ngram_occurrences=ModelConfig.STOP_NGRAM_MAX_OCCURRENCES,
+        )
+
+    @property
+    def llm(self):
+        """Return the loaded generation backend, or ``None`` while it is unavailable."""
+        return self.llm_service.model if self.llm_service else None
     
-    def generate_response(self, prompt) -> str:
-        """Generate response from LLM using the provided prompt"""
+    def generate_response(self, prompt, on_token: Optional[Callable[[str], None]] = None,
+                          cache_key: Optional[Hashable] = None, cache_signature: Optional[Hashable] = None,
+                          max_new_tokens: Optional[int] = None, stop_policy: Optional[StopPolicy] = None) -> str:
+        """Generate response from LLM using the provided prompt
+
+        When ``on_token`` is given the reply is streamed and the callback
+        receives the cleaned text generated so far each time it grows.
+        ``cache_key`` and ``cache_signature`` let the model reuse the cached
+        prefix of an earlier prompt for the same character.
+        Decoding stops as soon as :attr:`stop_policy` (or the given
+        ``stop_policy``) says the reply is complete, and never runs past
+        ``max_new_tokens`` when given.
+        """
         if not self.llm:
             raise ValueError("LLM not available")
         
-        response = self.llm.invoke(prompt)
-        response_text = response if isinstance(response, str) else getattr(response, 'content', str(response))
+        if on_token is not None:
+            return self.stream_response(prompt, on_token, cache_key, cache_signature, max_new_tokens, stop_policy)
+        
+        response_text = self.llm_service.generate(
+            prompt, cache_key=cache_key, cache_signature=cache_signature,
+            **self._generation_kwargs(max_new_tokens, stop_policy)
+        )
         return self.clean_response(response_text)
     
-    def clean_response(self, response: str) -> str:
-        """Clean up model response to extract only the assistant's reply"""
-        response = str(response)
+    def generate_responses(self, prompts: list, max_new_tokens: Optional[int] = None) -> list[str]:
+        """Generate cleaned responses for several prompts in a single batch"""
+        if not self.llm:
+            raise ValueError("LLM not available")
+        
+        replies = self.llm_service.batch_generate(prompts, **self._generation_kwargs(max_new_tokens))
+        return [self.clean_response(text) for text in replies]
+    
+    def stream_response(self, prompt, on_token: Callable[[str], None],
+                        cache_key: Optional[Hashable] = None, cache_signature: Optional[Hashable] = None,
+                        max_new_tokens: Optional[int] = None, stop_policy: Optional[StopPolicy] = None) -> str:
+        """Stream a reply, pushing cleaned partial text to ``on_token``"""
+        raw_text = ""
+        last_partial = ""
+        for chunk in self.llm_service.stream(prompt, cache_key=cache_key, cache_signature=cache_signature,
+                                             **self._generation_kwargs(max_new_tokens, stop_policy)):
+            raw_text += chunk
+            partial = self.clean_response(raw_text, partial=True)
+            if partial and partial != last_partial:
+                last_partial = partial
+                on_token(partial)
+        return self.clean_response(raw_text)
+    
+    def _generation_kwargs(self, max_new_tokens: Optional[int], stop_policy: Optional[StopPolicy] = None) -> dict:
+        """Keyword arguments passed to the backend for one generation"""
+        kwargs = {"stop_policy": stop_policy or self.stop_policy}
+        if max_new_tokens is not None:
+            kwargs["max_new_tokens"] = max_new_tokens
+        return kwargs
+    
+    def clean_response(self, response: str, partial: bool = False) -> str:
+        """Clean up model response to extract only the assistant's reply
+
+        Anything past the :attr:`stop_policy` stopping point (a further
+        sentence, a leaked role turn or a repetition loop) is dropped first.
+        With ``partial=True`` the text is treated as an unfinished stream:
+        an empty string is returned instead of the placeholder reply when
+        there is not enough text yet.
+        """
+        response = self.stop_policy.truncate(str(response))
 
         assistant_markers = [
             "Assistant:", "### Assistant:", "<|assistant|>", 
@@ -64,7 +130,7 @@ class ResponseService:
         response = ' '.join(cleaned_lines).strip('"\' \n\t')
         
         if not response or len(response) < 5:
-            return "I'm not sure how to respond to that."
+            return "" if partial else "I'm not sure how to respond to that."
     
         if "?" in response and response.find("?") < len(response) // 3:
             parts = response.rsplit("?", 1)
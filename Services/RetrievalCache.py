@@ -0,0 +1,65 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class RetrievalCache:
+    """Small LRU cache of retrieved conversation context.
+
+    Entries are keyed by player pair, normalized question, number of
+    documents and the pair's version. The repository bumps a pair's version
+    on every write to that pair, so an entry can only be found while the
+    pair's history is unchanged and invalidation needs no scan. Stale
+    entries simply age out of the LRU. ``hits`` and ``misses`` count
+    lookups.
+    """
+
+    _PUNCTUATION = re.compile(r"[^\w\s]")
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def normalize(cls, question: str) -> str:
+        """Return ``question`` lowercased, without punctuation and with single spaces."""
+        return " ".join(cls._PUNCTUATION.sub(" ", question.lower()).split())
+
+    @classmethod
+    def key(cls, player_ids: str, question: str, k: int, version: int) -> Hashable:
+        return player_ids, cls.normalize(question), k, version
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """Return the cached context for ``key``, or ``None``."""
+        with self._lock:
+            context = self._entries.get(key)
+            if context is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return context
+
+    def put(self, key: Hashable, context: str) -> None:
+        with self._lock:
+            self._entries[key] = context
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,109 @@
+import json
+import os
+import socket
+import time
+from typing import Callable, Iterable
+
+
+class SessionJanitor:
+    """Keeps track of live game sessions and drops what dead ones leave behind.
+
+    Every session holds a lease file ``<session_id>.json`` in ``directory``
+    recording the host and process that own it. A session is alive while its
+    lease exists and, on this host, its process is still running; leases
+    written on other hosts expire ``lease_ttl`` seconds after they were last
+    touched. :meth:`collect_orphans` drops the namespace of every session
+    that is not alive, so a crashed game's memories are reclaimed the next
+    time a game starts.
+    """
+
+    def __init__(self, directory: str, lease_ttl: float = 24 * 3600) -> None:
+        """Create a janitor.
+
+        Args:
+            directory: Directory holding the lease files.
+            lease_ttl: Age, in seconds, after which a lease from another host
+                is considered abandoned.
+        """
+        self.directory = directory
+        self.lease_ttl = lease_ttl
+
+    def register(self, session_id: str) -> None:
+        """Take the lease of ``session_id`` for this process."""
+        os.makedirs(self.directory, exist_ok=True)
+        lease = {"host": socket.gethostname(), "pid": os.getpid(), "started": time.time()}
+        path = self._lease_path(session_id)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as lease_file:
+            json.dump(lease, lease_file)
+        os.replace(temporary_path, path)
+
+    def release(self, session_id: str) -> None:
+        """Give up the lease of ``session_id``."""
+        try:
+            os.remove(self._lease_path(session_id))
+        except FileNotFoundError:
+            pass
+
+    def leased_sessions(self) -> list[str]:
+        """Return the ids of every session holding a lease."""
+        if not os.path.isdir(self.directory):
+            return []
+        return [name[:-len(".json")] for name in os.listdir(self.directory) if name.endswith(".json")]
+
+    def is_alive(self, session_id: str) -> bool:
+        """Return ``True`` if the session's owner still appears to be running."""
+        path = self._lease_path(session_id)
+        try:
+            with open(path, encoding="utf-8") as lease_file:
+                lease = json.load(lease_file)
+            modified = os.path.getmtime(path)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError):
+            # A lease being written right now; leave it alone.
+            return True
+
+        if lease.get("host") != socket.gethostname():
+            return time.time() - modified < self.lease_ttl
+        return self._process_running(int(lease.get("pid", 0)))
+
+    def collect_orphans(self, session_ids: Iterable[str], drop: Callable[[str], None]) -> list[str]:
+        """Drop the namespaces of sessions that are no longer alive.
+
+        Args:
+            session_ids: Sessions found in storage. Sessions holding a lease
+                are checked as well, so leases of sessions that stored
+                nothing are cleaned up too.
+            drop: Deletes the namespace of one session.
+
+        Returns:
+            The ids of the sessions that were dropped.
+        """
+        dropped = []
+        for session_id in sorted(set(session_ids) | set(self.leased_sessions())):
+            if self.is_alive(session_id):
+                continue
+            try:
+                drop(session_id)
+            except Exception as error:
+                print(f"Could not drop orphaned session {session_id}: {error}")
+                continue
+            self.release(session_id)
+            dropped.append(session_id)
+        return dropped
+
+    def _lease_path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.json")
+
+    @staticmethod
+    def _process_running(pid: int) -> bool:
+        if pid <= 0:
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
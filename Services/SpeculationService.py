@@ -0,0 +1,229 @@
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterable, Iterator, Optional
+
+from Services.ErrorHandler import ErrorHandler
+
+
+def lower_thread_priority(niceness: int) -> None:
+    """Best-effort: make the calling thread yield CPU to the rest of the game.
+
+    Only the Python thread itself is affected, not the thread pools a math
+    library (OpenMP, MKL) runs its kernels on; see :class:`PreemptibleStopPolicy`
+    for getting background generation out of the way of the foreground.
+    """
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), niceness)
+    except (AttributeError, OSError):
+        pass
+
+
+class _Draft:
+    """A speculatively generated answer and the game state it was made for."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+
+    def __init__(self, fingerprint: Hashable, producer: Callable[[], Optional[str]], group: Hashable) -> None:
+        self.fingerprint = fingerprint
+        self.producer = producer
+        self.group = group
+        self.state = self.PENDING
+        self.response: Optional[str] = None
+        self.done = threading.Event()
+
+
+class _IdleJob:
+    """Background work queued behind the drafts, and its outcome."""
+
+    def __init__(self, job: Callable[[], Any]) -> None:
+        self.job = job
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class SpeculationService:
+    """Generates likely answers in the background before they are asked for.
+
+    Drafts are produced one at a time on a single daemon thread, and only
+    start while no foreground generation is running (see :meth:`foreground`).
+    A draft already running when the foreground starts is pre-empted by its
+    producer, which decodes with a :class:`PreemptibleStopPolicy` watching
+    :meth:`foreground_active`. A draft is handed out by :meth:`take` only if
+    the game state fingerprint it was prepared for still matches; otherwise
+    it is discarded.
+
+    Other background generation (e.g. memory summaries) is queued on the same
+    thread through :meth:`run_when_idle`, so at most one background
+    generation competes with the foreground at any time.
+    """
+
+    def __init__(self, error_handler: Optional[ErrorHandler] = None, idle_niceness: int = 19) -> None:
+        """Create a speculation service.
+
+        Args:
+            error_handler: Optional error handler used to log failed drafts.
+            idle_niceness: Scheduling niceness applied to the worker thread
+                where the platform supports per-thread priorities.
+        """
+        self._error_handler = error_handler
+        self._idle_niceness = idle_niceness
+        self._drafts: dict[Hashable, _Draft] = {}
+        self._jobs: "deque[Hashable]" = deque()
+        self._idle_jobs: "deque[_IdleJob]" = deque()
+        self._condition = threading.Condition()
+        self._foreground_count = 0
+        self._worker: Optional[threading.Thread] = None
+        self.started = 0
+        self.committed = 0
+        self.discarded = 0
+
+    def speculate(self, key: Hashable, fingerprint: Hashable,
+                  producer: Callable[[], Optional[str]], group: Hashable = None) -> None:
+        """Queue ``producer`` to draft the answer identified by ``key``.
+
+        A draft already queued or prepared for ``key`` is kept when its
+        fingerprint still matches. Drafts of other groups are left alone;
+        call :meth:`discard` once per selection to drop the groups the
+        player has moved away from.
+        """
+        with self._condition:
+            existing = self._drafts.get(key)
+            if existing is not None and existing.fingerprint == fingerprint:
+                return
+            if existing is not None:
+                self._remove_locked(key)
+
+            self._drafts[key] = _Draft(fingerprint, producer, group)
+            self._jobs.append(key)
+            self._ensure_worker_locked()
+            self._condition.notify_all()
+
+    def take(self, key: Hashable, fingerprint: Hashable, timeout: Optional[float] = None) -> Optional[str]:
+        """Return the prepared answer for ``key`` if it matches ``fingerprint``.
+
+        A draft still waiting in the queue is dropped so the caller generates
+        the answer itself; a draft being generated right now is waited for,
+        since finishing it is cheaper than starting over, but for no longer
+        than ``timeout`` seconds.
+        """
+        with self._condition:
+            draft = self._drafts.get(key)
+            if draft is None:
+                return None
+            self._remove_locked(key)
+            if draft.fingerprint != fingerprint or draft.state == _Draft.PENDING:
+                self.discarded += 1
+                return None
+
+        if not draft.done.wait(timeout) or draft.response is None:
+            return None
+        self.committed += 1
+        return draft.response
+
+    def run_when_idle(self, job: Callable[[], Any]) -> Any:
+        """Run ``job`` on the worker thread after the queued drafts and return its result.
+
+        Like a draft, it only starts while no foreground generation runs.
+        Exceptions raised by ``job`` are raised here.
+        """
+        idle_job = _IdleJob(job)
+        with self._condition:
+            self._idle_jobs.append(idle_job)
+            self._ensure_worker_locked()
+            self._condition.notify_all()
+        idle_job.done.wait()
+        if idle_job.error is not None:
+            raise idle_job.error
+        return idle_job.result
+
+    def foreground_active(self) -> bool:
+        """Return ``True`` while a foreground generation runs or waits to run."""
+        with self._condition:
+            return self._foreground_count > 0
+
+    def discard(self, keep_groups: Iterable[Hashable] = ()) -> None:
+        """Drop every queued and prepared draft outside ``keep_groups``.
+
+        A draft already being generated finishes, but is no longer handed out.
+        """
+        keep_groups = set(keep_groups)
+        with self._condition:
+            self._discard_locked(lambda draft: draft.group not in keep_groups)
+
+    @contextmanager
+    def foreground(self) -> Iterator[None]:
+        """Mark a foreground generation; no new draft starts while it runs."""
+        with self._condition:
+            self._foreground_count += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._foreground_count -= 1
+                self._condition.notify_all()
+
+    def wait_until_idle(self) -> None:
+        """Block until no foreground generation is running."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._foreground_count == 0)
+
+    def _discard_locked(self, predicate: Callable[[_Draft], bool]) -> None:
+        """Remove drafts matching ``predicate``; the lock must be held."""
+        for key in [key for key, draft in self._drafts.items() if predicate(draft)]:
+            self._remove_locked(key)
+            self.discarded += 1
+
+    def _remove_locked(self, key: Hashable) -> None:
+        """Forget the draft for ``key`` and its queued job; the lock must be held."""
+        self._drafts.pop(key, None)
+        try:
+            self._jobs.remove(key)
+        except ValueError:
+            pass
+
+    def _ensure_worker_locked(self) -> None:
+        """Start the worker thread if it is not running; the lock must be held."""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="SpeculationWorker")
+            self._worker.daemon = True
+            self._worker.start()
+
+    def _run(self) -> None:
+        """Worker loop: draft queued answers, then run idle jobs, whenever the foreground is idle."""
+        lower_thread_priority(self._idle_niceness)
+        while True:
+            with self._condition:
+                while (not self._jobs and not self._idle_jobs) or self._foreground_count > 0:
+                    self._condition.wait()
+                if self._jobs:
+                    draft = self._drafts.get(self._jobs.popleft())
+                    if draft is None:
+                        continue
+                    draft.state = _Draft.RUNNING
+                    self.started += 1
+                    idle_job = None
+                else:
+                    draft, idle_job = None, self._idle_jobs.popleft()
+
+            if idle_job is not None:
+                try:
+                    idle_job.result = idle_job.job()
+                except BaseException as error:
+                    idle_job.error = error
+                finally:
+                    idle_job.done.set()
+                continue
+
+            try:
+                draft.response = draft.producer()
+            except Exception as error:  # pragma: no cover - defensive logging
+                if self._error_handler is not None:
+                    self._error_handler.log_error(error, context="SpeculationService draft")
+            finally:
+                draft.state = _Draft.DONE
+                draft.done.set()
@@ -0,0 +1,160 @@
+import re
+from typing import Callable, Optional, Sequence
+
+
+class StopPolicy:
+    """Decides where an NPC reply should end while it is being generated.
+
+    A reply ends after ``max_sentences`` complete sentences, at the first
+    chat-role marker or prompt label the model starts to echo (markers at the
+    very start of the reply are skipped, the cleaner strips those), or where
+    the model starts looping: once any ``ngram_size``-word sequence occurs
+    more than ``max_ngram_occurrences`` times, the text is cut where its
+    first repetition began.
+
+    The same rules are used by the backends to stop decoding early and by
+    :class:`ResponseService` to trim whatever was generated past the cut.
+    """
+
+    ROLE_MARKERS = (
+        "Human:", "User:", "Assistant:", "AI:", "System:", "Question:", "Answer:",
+        "###", "<|user|>", "<|assistant|>", "<|system|>", "<|im_start|>", "<|im_end|>",
+        "[INST]", "[/INST]", "</s>",
+        "Your Role:", "Your Mood:", "Current Room:", "Location:",
+    )
+    ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "st", "prof", "sr", "jr"}
+
+    _SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*(?=\s)")
+    _WORD = re.compile(r"\w+")
+
+    def __init__(
+        self,
+        max_sentences: Optional[int] = 2,
+        stop_markers: Sequence[str] = ROLE_MARKERS,
+        ngram_size: int = 4,
+        max_ngram_occurrences: int = 2,
+    ) -> None:
+        """Create a stop policy.
+
+        Args:
+            max_sentences: Number of sentences after which the reply ends.
+                ``None`` disables the sentence limit.
+            stop_markers: Strings that end the reply when they appear after
+                some dialogue.
+            ngram_size: Length, in words, of the sequences checked for loops.
+            max_ngram_occurrences: How often a sequence may occur before the
+                reply is considered to be looping.
+        """
+        self.max_sentences = max_sentences
+        self.stop_markers = tuple(stop_markers)
+        self.ngram_size = ngram_size
+        self.max_ngram_occurrences = max_ngram_occurrences
+
+    def should_stop(self, text: str) -> bool:
+        """Return ``True`` once ``text`` has reached a stopping point."""
+        return self.stop_index(text) is not None
+
+    def truncate(self, text: str) -> str:
+        """Return ``text`` cut at its stopping point, if it has one."""
+        index = self.stop_index(text)
+        return text if index is None else text[:index].rstrip()
+
+    def stop_index(self, text: str) -> Optional[int]:
+        """Return the offset at which ``text`` should end, or ``None``."""
+        start = self._dialogue_start(text)
+        candidates = [
+            index for index in (
+                self._marker_index(text, start),
+                self._sentence_limit_index(text, start),
+                self._repetition_index(text, start),
+            )
+            if index is not None
+        ]
+        return min(candidates) if candidates else None
+
+    def _dialogue_start(self, text: str) -> int:
+        """Skip leading whitespace and role markers preceding the dialogue."""
+        position = 0
+        while True:
+            stripped = len(text) - len(text[position:].lstrip())
+            position = stripped
+            marker = next((m for m in self.stop_markers if text.startswith(m, position)), None)
+            if marker is None:
+                return position
+            position += len(marker)
+
+    def _marker_index(self, text: str, start: int) -> Optional[int]:
+        """Return the offset of the first stop marker after the dialogue starts."""
+        indexes = [text.find(marker, start) for marker in self.stop_markers]
+        indexes = [index for index in indexes if index != -1]
+        return min(indexes) if indexes else None
+
+    def _sentence_limit_index(self, text: str, start: int) -> Optional[int]:
+        """Return the offset just after the last allowed sentence."""
+        if not self.max_sentences:
+            return None
+        sentences = 0
+        for match in self._SENTENCE_END.finditer(text, start):
+            word = self._WORD.findall(text[start:match.start()][-12:])
+            if text[match.start()] == "." and word and word[-1].lower() in self.ABBREVIATIONS:
+                continue
+            sentences += 1
+            if sentences >= self.max_sentences:
+                return match.end()
+        return None
+
+    def _repetition_index(self, text: str, start: int) -> Optional[int]:
+        """Return the offset where a looping word sequence first repeated."""
+        if self.ngram_size <= 0:
+            return None
+        words = list(self._WORD.finditer(text, start))
+        occurrences: dict[tuple, list[int]] = {}
+        for index in range(len(words) - self.ngram_size + 1):
+            ngram = tuple(word.group().lower() for word in words[index:index + self.ngram_size])
+            starts = occurrences.setdefault(ngram, [])
+            starts.append(words[index].start())
+            if len(starts) > self.max_ngram_occurrences:
+                return starts[1]
+        return None
+
+
+class PreemptibleStopPolicy(StopPolicy):
+    """Stop policy that also ends decoding as soon as ``interrupted()`` is true.
+
+    Background generation (speculative drafts, memory summaries) passes
+    ``SpeculationService.foreground_active`` so it stops at the next token
+    once the player asks something; :attr:`preempted` records that it did.
+    """
+
+    def __init__(self, interrupted: Callable[[], bool], **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.interrupted = interrupted
+        self.preempted = False
+
+    @classmethod
+    def like(cls, policy: StopPolicy, interrupted: Callable[[], bool]) -> "PreemptibleStopPolicy":
+        """Return a pre-emptible policy with the same rules as ``policy``."""
+        return cls(
+            interrupted,
+            max_sentences=policy.max_sentences,
+            stop_markers=policy.stop_markers,
+            ngram_size=policy.ngram_size,
+            max_ngram_occurrences=policy.max_ngram_occurrences,
+        )
+
+    def should_stop(self, text: str) -> bool:
+        if self.interrupted():
+            self.preempted = True
+            return True
+        return super().should_stop(text)
+
+    def __getstate__(self) -> dict:
+        # An out-of-process backend cannot see the foreground; it gets a plain policy.
+        state = dict(self.__dict__)
+        state["interrupted"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self.interrupted is None:
+            self.interrupted = lambda: False
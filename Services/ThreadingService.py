@@ -1,10 +1,31 @@
+import asyncio
 import threading
 import queue
-from typing import Callable, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Any, Coroutine, Optional, Tuple, TypeVar
 
 from Services.ErrorHandler import ErrorHandler
 
 
+T = TypeVar("T")
+
+
+def run_sync(coroutine: Coroutine[Any, Any, T]) -> T:
+    """Run ``coroutine`` to completion from synchronous code and return its result.
+
+    Outside an event loop this is :func:`asyncio.run`. A synchronous wrapper
+    called from code already running in a loop cannot re-enter that loop,
+    so the coroutine then runs on a fresh loop in a helper thread while the
+    caller waits.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="RunSync") as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
 class ThreadingService:
     """Handles background task execution and result management.
 
@@ -33,23 +54,43 @@ class ThreadingService:
         ``("success", result)`` or ``("error", error_message)``.
         """
         self.result_queue = queue.Queue()
+        self._start(task, args, kwargs)
+        return self.result_queue
+
+    def execute_stream(self, task: Callable[..., Any], *args: Any, **kwargs: Any) -> "queue.Queue[Tuple[str, Any]]":
+        """Execute a streaming task asynchronously and return the result queue.
+
+        ``task`` is called with an ``emit`` callback as its first argument.
+        Every value passed to ``emit`` is queued as ``("partial", value)``
+        before the final ``("success", result)`` or ``("error", message)``.
+        """
+        self.result_queue = queue.Queue()
+        result_queue = self.result_queue
+
+        def emit(value: Any) -> None:
+            result_queue.put(("partial", value))
+
+        self._start(task, (emit, *args), kwargs)
+        return result_queue
+
+    def _start(self, task: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        """Run ``task`` on a daemon thread, reporting into the current queue."""
+        result_queue = self.result_queue
 
         def wrapper() -> None:
             try:
                 result = task(*args, **kwargs)
-                self.result_queue.put(("success", result))
+                result_queue.put(("success", result))
             except Exception as error:  # pragma: no cover - defensive logging
                 if self._error_handler is not None:
                     context = getattr(task, "__name__", "background_task")
                     self._error_handler.log_error(error, context=context)
-                self.result_queue.put(("error", str(error)))
+                result_queue.put(("error", str(error)))
 
         self.current_thread = threading.Thread(target=wrapper)
         self.current_thread.daemon = True
         self.current_thread.start()
 
-        return self.result_queue
-
     def is_task_complete(self) -> bool:
         """Return ``True`` if the current task has completed."""
         return not self.result_queue.empty()
@@ -0,0 +1,161 @@
+from typing import Optional
+
+import numpy as np
+
+
+class VectorCodec:
+    """Stores unit vectors as float32 and scores them exactly.
+
+    A codec turns unit vectors into fixed-width code rows (plus one float32
+    scale per row for codecs that need it) and scores code rows against a
+    unit query. Subclasses trade precision for size; the store re-ranks their
+    best candidates with exact vectors.
+    """
+
+    name = "float32"
+    code_dtype = np.float32
+    uses_scale = False
+    needs_training = False
+
+    def __init__(self, dimension: int) -> None:
+        self.dimension = dimension
+
+    @property
+    def code_size(self) -> int:
+        """Width of one code row, in elements of :attr:`code_dtype`."""
+        return self.dimension
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return self.code_size * np.dtype(self.code_dtype).itemsize + (4 if self.uses_scale else 0)
+
+    @property
+    def exact(self) -> bool:
+        """``True`` if scores need no re-ranking."""
+        return self.name == "float32"
+
+    def encode(self, vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return the code rows and scales of float32 unit ``vectors``."""
+        return vectors.astype(self.code_dtype), np.ones(len(vectors), dtype=np.float32)
+
+    def decode(self, codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        """Return approximate float32 vectors of code rows."""
+        return codes.astype(np.float32)
+
+    def scores(self, codes: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Return the approximate cosine similarity of each code row to a unit ``query``."""
+        return codes.astype(np.float32, copy=False) @ query
+
+    @staticmethod
+    def create(name: str, dimension: int, subspaces: int = 48) -> "VectorCodec":
+        """Return the codec called ``name``: float32, float16, int8 or pq."""
+        codecs = {"float32": VectorCodec, "float16": Float16Codec, "int8": Int8Codec}
+        if name == "pq":
+            return ProductQuantizationCodec(dimension, subspaces)
+        if name not in codecs:
+            raise ValueError(f"Unknown vector codec '{name}', expected float32, float16, int8 or pq")
+        return codecs[name](dimension)
+
+
+class Float16Codec(VectorCodec):
+    """Half-precision vectors: half the size, scores within about 1e-3 of exact."""
+
+    name = "float16"
+    code_dtype = np.float16
+
+
+class Int8Codec(VectorCodec):
+    """Scalar-quantized vectors: int8 components with one float32 scale per vector.
+
+    Each vector is scaled so its largest component maps to 127, which keeps
+    the quantization error proportional to that vector's own range.
+    """
+
+    name = "int8"
+    code_dtype = np.int8
+    uses_scale = True
+
+    def encode(self, vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def decode(self, codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        return codes.astype(np.float32) * scales[:, None]
+
+    def scores(self, codes: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+        return (codes.astype(np.float32) @ query) * scales
+
+
+class ProductQuantizationCodec(VectorCodec):
+    """Product-quantized vectors: one byte per subspace.
+
+    The vector is split into ``subspaces`` equal slices and each slice is
+    replaced by the index of its nearest centroid among up to 256 learned
+    by k-means for that slice. A query is scored with one lookup table per
+    slice, so scoring costs ``subspaces`` additions per stored vector.
+    """
+
+    name = "pq"
+    code_dtype = np.uint8
+    needs_training = True
+
+    def __init__(self, dimension: int, subspaces: int = 48, iterations: int = 12, seed: int = 0) -> None:
+        super().__init__(dimension)
+        # Use the largest subspace count not above the requested one that divides the dimension.
+        self.subspaces = next(count for count in range(min(subspaces, dimension), 0, -1) if dimension % count == 0)
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_on = 0
+
+    @property
+    def code_size(self) -> int:
+        return self.subspaces
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def fit(self, vectors: np.ndarray) -> None:
+        """Learn the centroids of every subspace from ``vectors``."""
+        rng = np.random.default_rng(self.seed)
+        clusters = min(256, len(vectors))
+        slices = self._slices(vectors)
+        centroids = np.empty((self.subspaces, clusters, slices.shape[2]), dtype=np.float32)
+        for subspace in range(self.subspaces):
+            points = slices[:, subspace]
+            centers = points[rng.choice(len(points), clusters, replace=False)].copy()
+            for _ in range(self.iterations):
+                assignment = self._nearest(points, centers)
+                for cluster in range(clusters):
+                    members = points[assignment == cluster]
+                    if len(members):
+                        centers[cluster] = members.mean(axis=0)
+            centroids[subspace] = centers
+        self.centroids = centroids
+        self.trained_on = len(vectors)
+
+    def encode(self, vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        slices = self._slices(vectors)
+        codes = np.empty((len(vectors), self.subspaces), dtype=np.uint8)
+        for subspace in range(self.subspaces):
+            codes[:, subspace] = self._nearest(slices[:, subspace], self.centroids[subspace])
+        return codes, np.ones(len(vectors), dtype=np.float32)
+
+    def decode(self, codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        parts = [self.centroids[subspace][codes[:, subspace]] for subspace in range(self.subspaces)]
+        return np.concatenate(parts, axis=1) if parts else np.empty((0, self.dimension), dtype=np.float32)
+
+    def scores(self, codes: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+        tables = np.einsum("skd,sd->sk", self.centroids, query.reshape(self.subspaces, -1))
+        return tables[np.arange(self.subspaces), codes].sum(axis=1)
+
+    def _slices(self, vectors: np.ndarray) -> np.ndarray:
+        return np.asarray(vectors, dtype=np.float32).reshape(len(vectors), self.subspaces, -1)
+
+    @staticmethod
+    def _nearest(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        distances = (points ** 2).sum(axis=1)[:, None] - 2 * points @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+        return distances.argmin(axis=1)
@@ -0,0 +1,140 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from Services.ErrorHandler import ErrorHandler
+
+
+class WriteBehindQueue:
+    """Buffers writes and hands them to ``flush`` in batches on a background thread.
+
+    :meth:`put` returns immediately. A batch is written once ``batch_size``
+    items are waiting or ``flush_interval`` seconds after the oldest one
+    arrived, whichever comes first. Items stay visible through
+    :meth:`pending` until ``flush`` has returned for them, so readers can
+    merge them into their results. A failed batch is logged and retried
+    with the next one, after a pause that doubles with each consecutive
+    failure; items that failed ``max_attempts`` writes are logged and
+    dropped.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list], None],
+        batch_size: int = 8,
+        flush_interval: float = 2.0,
+        error_handler: Optional[ErrorHandler] = None,
+        max_attempts: int = 5,
+        max_backoff: float = 60.0,
+    ) -> None:
+        """Create a write-behind queue.
+
+        Args:
+            flush: Writes one batch of items to the backing store.
+            batch_size: Number of waiting items that triggers a write.
+            flush_interval: Longest time, in seconds, an item waits.
+            error_handler: Optional error handler used to log failed writes.
+            max_attempts: Writes an item may fail before it is dropped.
+            max_backoff: Longest pause, in seconds, after a failed write.
+        """
+        self._flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._error_handler = error_handler
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self._waiting: list = []
+        # Failed writes of each waiting item, in the same order as _waiting
+        self._attempts: list[int] = []
+        self._in_flight: list = []
+        self._consecutive_failures = 0
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self.batches_written = 0
+        self.items_dropped = 0
+
+    def put(self, item: Any) -> None:
+        """Queue ``item`` for writing and return immediately."""
+        with self._condition:
+            self._waiting.append(item)
+            self._attempts.append(0)
+            self._ensure_worker_locked()
+            self._condition.notify_all()
+
+    def pending(self) -> list:
+        """Return the items queued or being written, oldest first."""
+        with self._condition:
+            return self._in_flight + self._waiting
+
+    def flush(self) -> bool:
+        """Write everything queued now, on the calling thread; ``False`` if the write failed."""
+        with self._write_lock:
+            with self._condition:
+                batch, attempts = self._take_batch_locked()
+            return self._write(batch, attempts)
+
+    def clear(self) -> None:
+        """Drop every queued item without writing it."""
+        with self._condition:
+            self._waiting.clear()
+            self._attempts.clear()
+
+    def _take_batch_locked(self) -> tuple[list, list[int]]:
+        """Move all waiting items in flight with their failed write counts; the lock must be held."""
+        batch, self._waiting = self._waiting, []
+        attempts, self._attempts = self._attempts, []
+        self._in_flight.extend(batch)
+        return batch, attempts
+
+    def _write(self, batch: list, attempts: list[int]) -> bool:
+        """Write ``batch``; on failure put it back to be retried, dropping items out of attempts."""
+        if not batch:
+            return True
+        try:
+            self._flush(batch)
+        except Exception as error:
+            if self._error_handler is not None:
+                self._error_handler.log_error(error, context="WriteBehindQueue flush")
+            retry = [(item, count + 1) for item, count in zip(batch, attempts) if count + 1 < self.max_attempts]
+            with self._condition:
+                del self._in_flight[:len(batch)]
+                self._waiting[:0] = [item for item, _ in retry]
+                self._attempts[:0] = [count for _, count in retry]
+                self._consecutive_failures += 1
+            dropped = len(batch) - len(retry)
+            if dropped:
+                self.items_dropped += dropped
+                if self._error_handler is not None:
+                    self._error_handler.log_warning(
+                        f"WriteBehindQueue dropped {dropped} items after {self.max_attempts} failed writes"
+                    )
+            return False
+        with self._condition:
+            del self._in_flight[:len(batch)]
+            self._consecutive_failures = 0
+        self.batches_written += 1
+        return True
+
+    def _backoff(self) -> float:
+        """Seconds to pause after the latest failed write."""
+        return min(self.max_backoff, self.flush_interval * 2 ** max(self._consecutive_failures - 1, 0))
+
+    def _ensure_worker_locked(self) -> None:
+        """Start the flushing thread if it is not running; the lock must be held."""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="WriteBehindQueue")
+            self._worker.daemon = True
+            self._worker.start()
+
+    def _run(self) -> None:
+        """Flushing loop: write a batch when it is full or old enough."""
+        while True:
+            with self._condition:
+                while not self._waiting:
+                    self._condition.wait()
+                self._condition.wait_for(
+                    lambda: len(self._waiting) >= self.batch_size, timeout=self.flush_interval
+                )
+            if not self.flush():
+                time.sleep(self._backoff())
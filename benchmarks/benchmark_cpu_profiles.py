@@ -0,0 +1,104 @@
+"""Compare LLMService CPU profiles (fp32, bf16, int8).
+
+Each profile is measured in a fresh subprocess so resident memory is not
+shared between runs. For every profile the script reports model load time,
+resident set size after loading, peak RSS and generation throughput.
+
+Usage:
+    python benchmarks/benchmark_cpu_profiles.py [--model NAME] [--tokens 64]
+                                                [--profiles fp32 bf16 int8]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+PROMPT = "Where were you when the lights went out in the ballroom?"
+
+
+def read_rss_mb() -> float:
+    """Return the current resident set size of this process in MB."""
+    with open("/proc/self/status", encoding="utf-8") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_single(profile: str, model_name: str | None, tokens: int) -> dict:
+    """Load the model with one profile and measure it in this process."""
+    from langchain_core.messages import HumanMessage
+    from config.ModelConfig import ModelConfig
+    from Services.LLMService import LLMService
+
+    if model_name:
+        ModelConfig.DEFAULT_MODEL = model_name
+    ModelConfig.MODEL_WARMUP = False
+
+    start = time.perf_counter()
+    llm_service = LLMService(background=False, cpu_profile=profile, backend="huggingface")
+    load_seconds = time.perf_counter() - start
+    if not llm_service.is_ready():
+        return {"profile": profile, "error": f"model failed to load ({llm_service.state})"}
+    rss_mb = read_rss_mb()
+
+    messages = [HumanMessage(content=PROMPT)]
+    llm_service.generate(messages, max_new_tokens=4, do_sample=False)  # warm caches
+
+    start = time.perf_counter()
+    reply = llm_service.generate(messages, max_new_tokens=tokens, min_new_tokens=tokens, do_sample=False)
+    generate_seconds = time.perf_counter() - start
+    generated = llm_service.count_tokens(reply)
+
+    return {
+        "profile": profile,
+        "model": llm_service.model_name if llm_service.state == LLMService.STATE_READY else llm_service.fallback_model,
+        "load_seconds": round(load_seconds, 2),
+        "rss_mb": round(rss_mb, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "tokens_per_second": round(generated / generate_seconds, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Model to load instead of ModelConfig.DEFAULT_MODEL")
+    parser.add_argument("--tokens", type=int, default=64, help="Tokens to generate per measurement")
+    parser.add_argument("--profiles", nargs="+", default=["fp32", "bf16", "int8"])
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(args.single, args.model, args.tokens)))
+        return
+
+    from Services.CPUProfile import CPUProfile
+    print(f"Auto-selected profile on this CPU: {CPUProfile.select('auto').name}")
+    print(f"{'profile':<8} {'load s':>8} {'RSS MB':>9} {'peak MB':>9} {'tok/s':>8}")
+    for profile in args.profiles:
+        command = [sys.executable, __file__, "--single", profile, "--tokens", str(args.tokens)]
+        if args.model:
+            command += ["--model", args.model]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        lines = completed.stdout.strip().splitlines()
+        if completed.returncode != 0 or not lines:
+            print(f"{profile:<8} failed: {completed.stderr.strip().splitlines()[-1:]}")
+            continue
+        result = json.loads(lines[-1])
+        if "error" in result:
+            print(f"{profile:<8} {result['error']}")
+            continue
+        print(
+            f"{profile:<8} {result['load_seconds']:>8} {result['rss_mb']:>9} "
+            f"{result['peak_rss_mb']:>9} {result['tokens_per_second']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Compare the conversation embedding backends (PyTorch, ONNX, ONNX int8).
+
+Each backend is measured in a fresh subprocess so imports and resident memory
+are not shared between runs. For every backend the script reports the cold
+start (imports plus model load), resident set size after loading, embedding
+throughput in sentences per second, and the mean cosine similarity of its
+vectors to the PyTorch backend's, which must stay close to 1 for stored
+memories to remain valid. The ONNX graphs are exported on first use.
+
+Usage:
+    python benchmarks/benchmark_embeddings.py [--backends huggingface onnx onnx-int8]
+                                              [--sentences 512] [--batch-size 32]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SUBJECTS = ["I", "The butler", "Lady Ashford", "The gardener", "Nobody", "The colonel"]
+ACTIONS = ["was in", "heard a scream from", "saw someone leave", "locked", "never went near", "searched"]
+PLACES = ["the library", "the kitchen", "the garden", "the ballroom", "the cellar", "the study"]
+TIMES = ["before dinner.", "at midnight.", "when the lights went out.", "all evening."]
+
+
+def make_sentences(count: int) -> list[str]:
+    """Return ``count`` short conversation-like sentences."""
+    sentences = []
+    for index in range(count):
+        sentences.append(
+            f"Question: Where were you?\nResponse: {SUBJECTS[index % 6]} {ACTIONS[index // 6 % 6]} "
+            f"{PLACES[index // 36 % 6]} {TIMES[index // 216 % 4]}"
+        )
+    return sentences
+
+
+def read_rss_mb() -> float:
+    """Return the current resident set size of this process in MB."""
+    with open("/proc/self/status", encoding="utf-8") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_single(backend: str, sentences: int, batch_size: int, vectors_path: str) -> dict:
+    """Load one backend and measure it in this process."""
+    start = time.perf_counter()
+    from config.ModelConfig import ModelConfig
+    from Services.MemoryService import MemoryService
+
+    ModelConfig.EMBEDDING_BACKEND = backend
+    embeddings = MemoryService.load_embeddings()
+    if hasattr(embeddings, "batch_size"):
+        embeddings.batch_size = batch_size
+    else:
+        embeddings.encode_kwargs = {**embeddings.encode_kwargs, "batch_size": batch_size}
+    cold_start_seconds = time.perf_counter() - start
+    rss_mb = read_rss_mb()
+
+    texts = make_sentences(sentences)
+    embeddings.embed_documents(texts[:batch_size])  # warm up
+    start = time.perf_counter()
+    vectors = embeddings.embed_documents(texts)
+    embed_seconds = time.perf_counter() - start
+    np.save(vectors_path, np.asarray(vectors, dtype=np.float32))
+
+    return {
+        "backend": backend,
+        "cold_start_seconds": round(cold_start_seconds, 2),
+        "rss_mb": round(rss_mb, 1),
+        "sentences_per_second": round(len(texts) / embed_seconds, 1),
+    }
+
+
+def mean_cosine(vectors: np.ndarray, reference: np.ndarray) -> float:
+    """Mean cosine similarity of matching rows."""
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(reference, axis=1)
+    return float(np.mean(np.sum(vectors * reference, axis=1) / norms))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["huggingface", "onnx", "onnx-int8"])
+    parser.add_argument("--sentences", type=int, default=512, help="Sentences embedded per measurement")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--single", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        backend, vectors_path = args.single
+        print(json.dumps(run_single(backend, args.sentences, args.batch_size, vectors_path)))
+        return
+
+    print(f"{'backend':<12} {'start s':>8} {'RSS MB':>9} {'sent/s':>9} {'cosine':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        reference = None
+        for backend in args.backends:
+            vectors_path = os.path.join(directory, f"{backend}.npy")
+            command = [
+                sys.executable, __file__, "--single", backend, vectors_path,
+                "--sentences", str(args.sentences), "--batch-size", str(args.batch_size),
+            ]
+            completed = subprocess.run(command, capture_output=True, text=True)
+            lines = completed.stdout.strip().splitlines()
+            if completed.returncode != 0 or not lines:
+                print(f"{backend:<12} failed: {completed.stderr.strip().splitlines()[-1:]}")
+                continue
+            result = json.loads(lines[-1])
+            vectors = np.load(vectors_path)
+            if backend == "huggingface":
+                reference = vectors
+            cosine = f"{mean_cosine(vectors, reference):.4f}" if reference is not None else "n/a"
+            print(
+                f"{backend:<12} {result['cold_start_seconds']:>8} {result['rss_mb']:>9} "
+                f"{result['sentences_per_second']:>9} {cosine:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Compare retrieval quality and size of the NumPy store's vector codecs.
+
+The store is filled with synthetic clustered unit vectors (conversations
+about the same subject land near each other) and queried with perturbed
+copies of stored vectors. For every codec the script reports bytes per
+stored vector in memory and on disk, memories per GB of memory relative to
+float32, recall@k against exact float32 search both from the codes alone and
+after exact re-ranking, and the median search latency of each. Re-ranking
+reads the candidates' exact vectors from the store's memory-mapped side
+file, which costs the full float32 size on disk; without it nothing is
+written to disk.
+
+Usage:
+    python benchmarks/benchmark_vector_codecs.py [--documents 20000] [--queries 200]
+                                                 [--codecs float32 float16 int8 pq]
+                                                 [--k 3] [--rerank-factor 4]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from Services.NumpyVectorStore import NumpyVectorStore
+
+DIMENSION = 384
+SUBJECTS = 200
+
+
+class LookupEmbeddings(Embeddings):
+    """Returns precomputed vectors for known texts, like a warm embedding cache."""
+
+    def __init__(self, vectors: dict[str, np.ndarray]) -> None:
+        self.vectors = vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.vectors[text] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.vectors[text]
+
+
+def make_data(documents: int, queries: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Return clustered unit document vectors and queries near some of them."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((SUBJECTS, DIMENSION))
+    vectors = centers[rng.integers(0, SUBJECTS, documents)] + 0.6 * rng.standard_normal((documents, DIMENSION))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    targets = vectors[rng.integers(0, documents, queries)]
+    query_vectors = targets + 0.03 * rng.standard_normal((queries, DIMENSION))
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32), query_vectors.astype(np.float32)
+
+
+def build_store(codec: str, vectors: np.ndarray, exact_rerank: bool, rerank_factor: int) -> NumpyVectorStore:
+    texts = [f"document {index}" for index in range(len(vectors))]
+    store = NumpyVectorStore(
+        LookupEmbeddings(dict(zip(texts, vectors))), codec=codec, pq_max_training=len(vectors),
+        rerank_factor=rerank_factor, exact_rerank=exact_rerank,
+    )
+    # One batch, so the pq codebooks are learned once on the whole corpus.
+    store.add_embeddings(texts, vectors, [{"player_ids": "1-2", "turn": 0} for _ in texts])
+    return store
+
+
+def measure(store: NumpyVectorStore, queries: np.ndarray, truth: list[set], k: int) -> tuple[float, float]:
+    """Return recall@k and median latency in milliseconds."""
+    recalls, latencies = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        results = store.similarity_search_by_vector(query.tolist(), k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(len({document.page_content for document in results} & expected) / k)
+    return float(np.mean(recalls)), statistics.median(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--codecs", nargs="+", default=["float32", "float16", "int8", "pq"])
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    args = parser.parse_args()
+
+    vectors, queries = make_data(args.documents, args.queries)
+    truth = [
+        {f"document {index}" for index in np.argsort(-(vectors @ query))[:args.k]}
+        for query in queries
+    ]
+
+    print(f"{args.documents} documents, {args.queries} queries, recall@{args.k}")
+    print(
+        f"{'codec':<8} {'RAM B':>6} {'disk B':>6} {'x/GB':>6} {'codes':>7} {'p50 ms':>8} "
+        f"{'rerank':>7} {'p50 ms':>8}"
+    )
+    baseline = None
+    for codec in args.codecs:
+        start = time.perf_counter()
+        store = build_store(codec, vectors, exact_rerank=False, rerank_factor=args.rerank_factor)
+        build_seconds = time.perf_counter() - start
+        codes_recall, codes_latency = measure(store, queries, truth, args.k)
+        size = store.bytes_per_vector
+        baseline = baseline or (size if codec == "float32" else DIMENSION * 4)
+
+        store = build_store(codec, vectors, exact_rerank=True, rerank_factor=args.rerank_factor)
+        rerank_recall, rerank_latency = measure(store, queries, truth, args.k)
+        print(
+            f"{codec:<8} {size:>6} {store.disk_bytes_per_vector:>6} {baseline / size:>6.1f} "
+            f"{codes_recall:>7.3f} {codes_latency:>8.3f} {rerank_recall:>7.3f} {rerank_latency:>8.3f}  "
+            f"(built in {build_seconds:.1f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
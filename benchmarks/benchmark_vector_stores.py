@@ -0,0 +1,145 @@
+"""Compare the conversation vector stores (NumPy and Chroma).
+
+Each store is filled with synthetic conversation documents spread over the
+player pairs of a game, embedded with random unit vectors so the embedding
+model does not dominate the timings. For every size the script reports the
+time to build the store, the resident memory it added, and the median and
+95th percentile latency of a top-k search filtered on one player pair.
+Chroma is reported as failed when ``langchain_chroma`` is not installed.
+
+Usage:
+    python benchmarks/benchmark_vector_stores.py [--sizes 100 10000 1000000]
+                                                 [--stores numpy chroma]
+                                                 [--dimension 384] [--queries 200]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+PLAYERS = 8
+BATCH_SIZE = 5000
+
+
+class RandomEmbeddings(Embeddings):
+    """Random unit vectors, deterministic per text."""
+
+    def __init__(self, dimension: int) -> None:
+        self.dimension = dimension
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        generator = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+        vector = generator.standard_normal(self.dimension).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+def read_rss_mb() -> float:
+    """Return the current resident set size of this process in MB."""
+    with open("/proc/self/status", encoding="utf-8") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def player_pairs() -> list[str]:
+    return [f"{speaker}-{listener}" for speaker in range(PLAYERS) for listener in range(PLAYERS) if speaker != listener]
+
+
+def make_store(name: str, embeddings: Embeddings, directory: str):
+    if name == "numpy":
+        from Services.NumpyVectorStore import NumpyVectorStore
+        return NumpyVectorStore(embeddings)
+    from langchain_chroma import Chroma
+    return Chroma(collection_name="benchmark", embedding_function=embeddings, persist_directory=directory)
+
+
+def run_single(name: str, size: int, dimension: int, queries: int) -> dict:
+    """Build one store of ``size`` documents and measure it in this process."""
+    embeddings = RandomEmbeddings(dimension)
+    pairs = player_pairs()
+    with tempfile.TemporaryDirectory() as directory:
+        rss_before = read_rss_mb()
+        store = make_store(name, embeddings, directory)
+
+        start = time.perf_counter()
+        for offset in range(0, size, BATCH_SIZE):
+            batch = range(offset, min(offset + BATCH_SIZE, size))
+            documents = [
+                Document(
+                    page_content=f"Question: where were you on turn {index}?\nResponse: answer {index}",
+                    metadata={"player_ids": pairs[index % len(pairs)], "turn": index // len(pairs)},
+                )
+                for index in batch
+            ]
+            store.add_documents(documents)
+        build_seconds = time.perf_counter() - start
+        rss_mb = read_rss_mb() - rss_before
+
+        latencies = []
+        for index in range(queries):
+            start = time.perf_counter()
+            store.similarity_search(f"query {index}", k=3, filter={"player_ids": pairs[index % len(pairs)]})
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    return {
+        "store": name,
+        "size": size,
+        "build_seconds": round(build_seconds, 2),
+        "rss_mb": round(rss_mb, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 10_000, 1_000_000])
+    parser.add_argument("--stores", nargs="+", default=["numpy", "chroma"])
+    parser.add_argument("--dimension", type=int, default=384, help="Embedding dimension (all-MiniLM-L6-v2 is 384)")
+    parser.add_argument("--queries", type=int, default=200, help="Searches timed per measurement")
+    parser.add_argument("--single", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        name, size = args.single
+        print(json.dumps(run_single(name, int(size), args.dimension, args.queries)))
+        return
+
+    print(f"{'store':<7} {'docs':>9} {'build s':>9} {'RSS MB':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for size in args.sizes:
+        for name in args.stores:
+            command = [
+                sys.executable, __file__, "--single", name, str(size),
+                "--dimension", str(args.dimension), "--queries", str(args.queries),
+            ]
+            completed = subprocess.run(command, capture_output=True, text=True)
+            lines = completed.stdout.strip().splitlines()
+            if completed.returncode != 0 or not lines:
+                print(f"{name:<7} {size:>9} failed: {completed.stderr.strip().splitlines()[-1:]}")
+                continue
+            result = json.loads(lines[-1])
+            print(
+                f"{name:<7} {size:>9} {result['build_seconds']:>9} {result['rss_mb']:>9} "
+                f"{result['p50_ms']:>9} {result['p95_ms']:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
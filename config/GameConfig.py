@@ -14,4 +14,9 @@ class GameConfig:
     # Suspicion modifiers
     MURDERER_SUSPICION_MODIFIER = 2
     WRONG_ACCUSATION_PENALTY = 30
+    MODERATE_SUSPICION_THRESHOLD = 10
     HIGH_SUSPICION_THRESHOLD = 25
+    
+    # Speculative answer drafting
+    SPECULATION_MAX_PLAYERS = 2  # candidates prepared when a suspect list is shown
+    SPECULATION_MAX_QUESTIONS = 1  # recent questions drafted again for each candidate
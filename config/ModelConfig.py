@@ -5,4 +5,93 @@ class ModelConfig:
     load_dotenv()
     DEFAULT_MODEL = os.getenv("MISTRAL_7B_HUGGINGFACEHUB")
     FALLBACK_MODEL = os.getenv("ZEPHYR_7B_HUGGINGFACEHUB")
-    EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
\ No newline at end of file
+    EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    # Embedding backend: "huggingface" (PyTorch), "onnx" or "onnx-int8" (ONNX Runtime, exported on first use)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "huggingface")
+    EMBEDDING_ONNX_PATH = os.getenv("EMBEDDING_ONNX_PATH", "./database/onnx")
+    # Embeddings cached by text hash: vectors kept in memory, and the on-disk store directory ("" disables it)
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./database/embedding_cache")
+    # Conversation vector store: "numpy" (in-process, exact search) or "chroma" (persistent, for large deployments)
+    VECTOR_STORE = os.getenv("VECTOR_STORE", "numpy")
+    # NumPy store vector storage: "float32", "float16", "int8" or "pq"; re-ranking re-scores rerank_factor * k candidates exactly
+    VECTOR_CODEC = os.getenv("VECTOR_CODEC", "float32")
+    VECTOR_RERANK_FACTOR = int(os.getenv("VECTOR_RERANK_FACTOR", "4"))
+    # Keep exact vectors in a temporary file (float32 size on disk) to re-rank lossy codes: "1", "0", or unset for "pq" only
+    VECTOR_EXACT_RERANK = {"1": True, "0": False}.get(os.getenv("VECTOR_EXACT_RERANK", ""))
+    # Bytes per vector with the "pq" codec (product quantization subspaces)
+    VECTOR_PQ_SUBSPACES = int(os.getenv("VECTOR_PQ_SUBSPACES", "48"))
+    # Keep the Chroma collection in memory only instead of persisting every write to CHROMA_PERSIST_DIRECTORY
+    CHROMA_EPHEMERAL = os.getenv("CHROMA_EPHEMERAL", "0") == "1"
+    CHROMA_PERSIST_DIRECTORY = os.getenv("CHROMA_PERSIST_DIRECTORY", "./database/conversation.db")
+    # Leases of running game sessions, and the age after which a lease from another host is abandoned
+    SESSION_LEASE_PATH = os.getenv("SESSION_LEASE_PATH", "./database/sessions")
+    SESSION_LEASE_TTL_SECONDS = float(os.getenv("SESSION_LEASE_TTL_SECONDS", str(24 * 3600)))
+    # Conversations are stored behind the turn: documents per batched write, and longest wait in seconds
+    INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "8"))
+    INGEST_FLUSH_SECONDS = float(os.getenv("INGEST_FLUSH_SECONDS", "2.0"))
+    # Recent conversations kept in memory per player pair; a pair with no more history than requested skips retrieval
+    RECENT_HISTORY_SIZE = int(os.getenv("RECENT_HISTORY_SIZE", "8"))
+    # Retrieved contexts cached per (player pair, question, pair version)
+    RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "256"))
+    # Cosine similarity at or above which a new conversation counts as a repeat of a stored one of the same pair (above 1 disables)
+    DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.97"))
+    # A pair with more conversations than this has its oldest folded into a summary (0 disables), keeping the newest verbatim
+    COMPACTION_THRESHOLD = int(os.getenv("COMPACTION_THRESHOLD", "12"))
+    COMPACTION_KEEP_RECENT = int(os.getenv("COMPACTION_KEEP_RECENT", "6"))
+    # Token budget of a summary written by the language model
+    COMPACTION_SUMMARY_TOKENS = int(os.getenv("COMPACTION_SUMMARY_TOKENS", "96"))
+    # Saved conversation memories: root directory (one subdirectory per session), and "float16" or "float32" embeddings
+    MEMORY_SNAPSHOT_PATH = os.getenv("MEMORY_SNAPSHOT_PATH", "./database/saves/memories")
+    MEMORY_SNAPSHOT_DTYPE = os.getenv("MEMORY_SNAPSHOT_DTYPE", "float16")
+    # Save a snapshot of the session's memories once, when the game ends
+    MEMORY_SNAPSHOT_ON_EXIT = os.getenv("MEMORY_SNAPSHOT_ON_EXIT", "0") == "1"
+    # Number of per-NPC prompt prefixes whose key/value state is kept for reuse
+    PREFIX_CACHE_SIZE = int(os.getenv("PREFIX_CACHE_SIZE", "8"))
+    # CPU inference: "auto", "fp32", "bf16" or "int8" (dynamic quantization of linear layers)
+    CPU_PROFILE = os.getenv("CPU_PROFILE", "auto")
+    # Intra-op thread count for torch on CPU; 0 keeps the torch default
+    CPU_THREADS = int(os.getenv("CPU_THREADS", "0"))
+    # Run a tiny generation after loading so the first question is not the slowest
+    MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"
+    # Text generation backend: "huggingface" (local model) or "fake" (deterministic, no weights)
+    GENERATION_BACKEND = os.getenv("GENERATION_BACKEND", "huggingface")
+    # Simulated delays of the fake backend, in seconds per reply and per generated word
+    FAKE_BACKEND_LATENCY = float(os.getenv("FAKE_BACKEND_LATENCY", "0"))
+    FAKE_BACKEND_TOKEN_LATENCY = float(os.getenv("FAKE_BACKEND_TOKEN_LATENCY", "0"))
+    # Semantic cache of generated replies, keyed on the answering character's state
+    RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "./database/response_cache.json")
+    RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.92"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+    RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    # Maximum prompt tokens per template; lower-priority sections are trimmed to fit
+    DEFAULT_PROMPT_TOKEN_BUDGET = int(os.getenv("DEFAULT_PROMPT_TOKEN_BUDGET", "448"))
+    PROMPT_TOKEN_BUDGETS = {
+        "basic": int(os.getenv("BASIC_PROMPT_TOKEN_BUDGET", "448")),
+        "inventory_query": int(os.getenv("INVENTORY_QUERY_PROMPT_TOKEN_BUDGET", "384")),
+        "location_aware": int(os.getenv("LOCATION_AWARE_PROMPT_TOKEN_BUDGET", "384")),
+        "suspicion_high": int(os.getenv("SUSPICION_HIGH_PROMPT_TOKEN_BUDGET", "320")),
+    }
+    # Generation stops after this many sentences, at leaked role markers, or when
+    # a STOP_NGRAM_SIZE-word sequence occurs more than STOP_NGRAM_MAX_OCCURRENCES times
+    STOP_MAX_SENTENCES = int(os.getenv("STOP_MAX_SENTENCES", "2"))
+    STOP_NGRAM_SIZE = int(os.getenv("STOP_NGRAM_SIZE", "4"))
+    STOP_NGRAM_MAX_OCCURRENCES = int(os.getenv("STOP_NGRAM_MAX_OCCURRENCES", "2"))
+    # Maximum new tokens per prompt template; templates not listed use DEFAULT_TOKEN_BUDGET
+    DEFAULT_TOKEN_BUDGET = int(os.getenv("DEFAULT_TOKEN_BUDGET", "80"))
+    TEMPLATE_TOKEN_BUDGETS = {
+        "basic": int(os.getenv("BASIC_TOKEN_BUDGET", "64")),
+        "inventory_query": int(os.getenv("INVENTORY_QUERY_TOKEN_BUDGET", "80")),
+        "location_aware": int(os.getenv("LOCATION_AWARE_TOKEN_BUDGET", "64")),
+        "suspicion_high": int(os.getenv("SUSPICION_HIGH_TOKEN_BUDGET", "56")),
+    }
+    # Seconds a question may wait for the model before the rule-based fallback is
+    # served; the late reply still lands in the response cache. 0 disables the deadline
+    RESPONSE_DEADLINE_SECONDS = float(os.getenv("RESPONSE_DEADLINE_SECONDS", "20"))
+    # Host the language and embedding models in a separate worker process ("1") instead of the UI process
+    INFERENCE_WORKER = os.getenv("INFERENCE_WORKER", "0") == "1"
+    # Seconds before a crashed worker is restarted, and how long embedding calls wait for it
+    INFERENCE_WORKER_RESTART_DELAY = float(os.getenv("INFERENCE_WORKER_RESTART_DELAY", "1"))
+    INFERENCE_WORKER_START_TIMEOUT = float(os.getenv("INFERENCE_WORKER_START_TIMEOUT", "120"))
+    # Worker messages of at least this many bytes are passed through shared memory
+    INFERENCE_WORKER_SHM_THRESHOLD = int(os.getenv("INFERENCE_WORKER_SHM_THRESHOLD", str(64 * 1024)))
@@ -5,12 +5,15 @@ from entities.Room import Room
 from managers.GameManager import GameManager
 import random
 
+INVENTORY_QUESTION = "What items are you carrying?"
+SUGGESTED_QUESTION = "Where were you when the murder happened?"
+
 def ask_about_inventory(game_manager: GameManager, selected_player: Player):
     """Ask a player about their inventory - returns formatted response data"""
     question = Question(
         game_manager.user_player,
         selected_player,
-        "What items are you carrying?"
+        INVENTORY_QUESTION
     )
     response, suspicion_change_speaker, suspicion_change_listener = game_manager.strike_conversation(question)
     
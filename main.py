@@ -3,6 +3,7 @@ from tkinter import ttk, messagebox, scrolledtext
 
 from managers.GameManager import GameManager
 from Services.ErrorHandler import ErrorHandler
+from config.GameConfig import GameConfig
 from game_logic import generate_location, register_user_player
 from ui.GameUIController import GameUIController
 
@@ -213,6 +214,9 @@ class GameScreen:
         self.current_action: str = ""
         self.loading_indicator: LoadingIndicator | None = None
         self.current_result_queue = None
+        self.streaming_message: bool = False
+        self.streamed_question: tuple | None = None
+        self.stream_started: bool = False
 
         self.setup_ui()
         self.update_display()
@@ -222,6 +226,17 @@ class GameScreen:
         self.log_message(f"📍 You are at {self.location.name}", '#f39c12')
         self.log_message(f"📖 {self.location.event_description}", '#ecf0f1')
         self.log_message("🔍 Investigate the murder by questioning suspects and gathering clues!", '#27ae60')
+        self.check_model_state()
+    
+    def check_model_state(self) -> None:
+        """Report when the background model load finishes."""
+        state = self.controller.get_model_state()
+        if state == "loading":
+            self.root.after(500, self.check_model_state)
+        elif state in ("ready", "fallback"):
+            self.log_message("🧠 The suspects are ready to talk in their own words.", '#27ae60')
+        else:
+            self.log_message("⚠️ The AI model could not be loaded; suspects will give brief answers.", '#e67e22')
     
     def setup_ui(self):
         """Create the main game interface"""
@@ -268,6 +283,7 @@ class GameScreen:
         # Action buttons
         actions = [
             ("🔍 Ask Question", self.ask_question),
+            ("🗣️ Interrogate Room", self.interrogate_room),
             ("⚖️ Accuse Player", self.accuse_player),
             ("👥 See Players in Room", self.see_players),
             ("🚪 Move to Another Room", self.move_room),
@@ -343,10 +359,20 @@ class GameScreen:
             if widget != self.action_label:
                 widget.destroy()
     
-    def log_message(self, message: str, color: str = '#00ff00') -> None:
-        """Add a message to the game log."""
+    def log_message(self, message: str, color: str = '#00ff00', streaming: bool = False) -> None:
+        """Add a message to the game log.
+
+        A message logged with ``streaming=True`` is provisional: the next
+        call to this method replaces it instead of appending a new line.
+        """
         self.output_text.config(state=tk.NORMAL)
+        if self.streaming_message:
+            self.output_text.delete("stream_start", "end-1c")
+        elif streaming:
+            self.output_text.mark_set("stream_start", "end-1c")
+            self.output_text.mark_gravity("stream_start", tk.LEFT)
         self.output_text.insert(tk.END, f"{message}\n")
+        self.streaming_message = streaming
         self.output_text.config(state=tk.DISABLED)
         self.output_text.see(tk.END)
     
@@ -373,6 +399,76 @@ class GameScreen:
         self.current_action = "ask_question"
         self.show_player_selection(players, "Ask a question to:")
     
+    def interrogate_room(self) -> None:
+        """Handle putting one question to everyone in the room."""
+        players = self.controller.get_players_in_current_room()
+        
+        if not players:
+            self.log_message("❌ No one is near you. Move to another room to find suspects.", '#e74c3c')
+            return
+        
+        self.current_action = "interrogate_room"
+        self.update_display()
+        self.action_label.config(text=f"Ask everyone in the room ({len(players)} people):")
+        
+        question_frame = tk.Frame(self.action_frame, bg='#34495e')
+        question_frame.pack(fill='x', padx=10, pady=5)
+        
+        question_entry = tk.Entry(question_frame, font=('Arial', 11), width=50)
+        question_entry.pack(side='left', padx=(0, 10))
+        question_entry.focus()
+        self.controller.prefetch_answers(players, include_inventory=False)
+        
+        def submit_question() -> None:
+            question_text = question_entry.get().strip()
+            if question_text:
+                self.show_loading("The room is thinking...")
+                self.current_result_queue = self.controller.start_room_interrogation_async(question_text)
+                self.check_interrogation_result()
+        
+        submit_btn = tk.Button(
+            question_frame,
+            text="Ask All",
+            bg='#27ae60',
+            fg='white',
+            command=submit_question
+        )
+        submit_btn.pack(side='left')
+        
+        question_entry.bind('<Return>', lambda e: submit_question())
+    
+    def check_interrogation_result(self) -> None:
+        """Check for room interrogation result from background thread."""
+        if self.current_result_queue is None:
+            return
+
+        if not self.current_result_queue.empty():
+            status, payload = self.current_result_queue.get()
+            self.current_result_queue = None
+            self.hide_loading()
+
+            if status == "success":
+                self.log_message(
+                    f"🗣️ You ask everyone in the room: \"{payload['question_text']}\"", "#3498db"
+                )
+                for answer in payload["answers"]:
+                    player = answer["player"]
+                    self.log_message(f"💬 {player.name} says: {answer['response']}", "#f39c12")
+                    if answer["suspicion_change_speaker"] != 0 or answer["suspicion_change_listener"] != 0:
+                        self.log_suspicion_changes(
+                            answer["suspicion_change_speaker"],
+                            answer["suspicion_change_listener"],
+                            player.name,
+                        )
+
+                self.update_display()
+            else:
+                error_message = str(payload)
+                self.log_message(f"❌ Error: {error_message}", "#e74c3c")
+        else:
+            # Check again after 100ms
+            self.root.after(100, self.check_interrogation_result)
+    
     def accuse_player(self) -> None:
         """Handle accusing players."""
         players = self.controller.get_players_in_current_room()
@@ -410,6 +506,23 @@ class GameScreen:
                 padx=10
             )
             btn.pack(side='left', padx=5, pady=5)
+
+        self.prefetch_likely_answers(players)
+
+    def prefetch_likely_answers(self, players) -> None:
+        """Start drafting answers the user is likely to pick next.
+
+        Only the most suspicious candidates are prepared, since those are the
+        ones the user usually questions.
+        """
+        if self.current_action not in ("ask_question", "inventory"):
+            return
+        likely_players = sorted(players, key=lambda p: p.suspicion, reverse=True)
+        self.controller.prefetch_answers(
+            likely_players[:GameConfig.SPECULATION_MAX_PLAYERS],
+            include_inventory=self.current_action == "inventory",
+            include_question=self.current_action == "ask_question",
+        )
     
     def ask_question_to_player(self, player) -> None:
         """Show interface for asking a specific question."""
@@ -422,6 +535,7 @@ class GameScreen:
         question_entry = tk.Entry(question_frame, font=('Arial', 11), width=50)
         question_entry.pack(side='left', padx=(0, 10))
         question_entry.focus()
+        self.controller.prefetch_answers([player], include_inventory=False)
         
         def submit_question() -> None:
             question_text = question_entry.get().strip()
@@ -429,10 +543,12 @@ class GameScreen:
                 # Show loading indicator
                 self.show_loading(f"{player.name} is thinking...")
 
-                # Start conversation asynchronously via controller
-                self.current_result_queue = self.controller.start_conversation_async(
+                # Start a streamed conversation via controller
+                self.current_result_queue = self.controller.start_conversation_stream(
                     player, question_text
                 )
+                self.streamed_question = (player, question_text)
+                self.stream_started = False
 
                 # Check for result periodically
                 self.check_conversation_result()
@@ -453,8 +569,12 @@ class GameScreen:
         if self.current_result_queue is None:
             return
 
-        if not self.current_result_queue.empty():
+        while not self.current_result_queue.empty():
             status, payload = self.current_result_queue.get()
+            if status == "partial":
+                self.show_streamed_partial(payload)
+                continue
+
             self.current_result_queue = None
             self.hide_loading()
 
@@ -466,9 +586,11 @@ class GameScreen:
                 sus_speaker = result_data["suspicion_change_speaker"]
                 sus_listener = result_data["suspicion_change_listener"]
 
-                self.log_message(
-                    f"🗣️ You ask {player.name}: \"{question_text}\"", "#3498db"
-                )
+                if not self.stream_started:
+                    self.log_message(
+                        f"🗣️ You ask {player.name}: \"{question_text}\"", "#3498db"
+                    )
+                self.stream_started = False
                 self.log_message(f"💬 {player.name} says: {response}", "#f39c12")
 
                 if sus_speaker != 0 or sus_listener != 0:
@@ -476,11 +598,24 @@ class GameScreen:
 
                 self.update_display()
             else:
+                self.stream_started = False
                 error_message = str(payload)
                 self.log_message(f"❌ Error: {error_message}", "#e74c3c")
-        else:
-            # Check again after 100ms
-            self.root.after(100, self.check_conversation_result)
+            return
+
+        # Check again after 100ms
+        self.root.after(100, self.check_conversation_result)
+    
+    def show_streamed_partial(self, partial_response: str) -> None:
+        """Show the reply generated so far for the current streamed question."""
+        player, question_text = self.streamed_question
+        if not self.stream_started:
+            self.stream_started = True
+            self.hide_loading()
+            self.log_message(
+                f"🗣️ You ask {player.name}: \"{question_text}\"", "#3498db"
+            )
+        self.log_message(f"💬 {player.name} says: {partial_response}", "#f39c12", streaming=True)
     
     def make_accusation(self, player) -> None:
         """Handle player accusation with confirmation."""
@@ -670,6 +805,8 @@ class GameScreen:
         else:
             self.log_message("   No known items yet.", '#95a5a6')
 
+        self.controller.prefetch_answers([player])
+
 
 class MysteryGameUI:
     """Main application controller for the Murder Mystery game UI."""
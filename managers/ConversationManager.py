@@ -1,9 +1,13 @@
+import asyncio
+from typing import Callable, Optional
+
 from entities.Question import Question
 from entities.Conversation import Conversation
 from entities.Location import Location
 from managers.PlayerManager import PlayerManager
 from managers.RagManager import RagManager
 from managers.GameStateManager import GameStateManager
+from Services.ThreadingService import run_sync
 
 
 class ConversationManager:
@@ -14,16 +18,79 @@ class ConversationManager:
         self.player_manager = player_manager
         self.location = location
 
-    def strike_conversation(self, question: Question) -> tuple[str, int, int]:
+    def strike_conversation(self, question: Question, on_token: Optional[Callable[[str], None]] = None) -> tuple[str, int, int]:
+        return run_sync(self.astrike_conversation(question, on_token=on_token))
+
+    async def astrike_conversation(self, question: Question,
+                                   on_token: Optional[Callable[[str], None]] = None) -> tuple[str, int, int]:
         # Get current room and nearby players for context
         current_room = self.player_manager.get_current_room(question.listener)
         nearby_players = self.player_manager.get_players_in_room(current_room)
         
-        response_text, suspicion_change_speaker, suspicion_change_listener = self.rag_manager.generate_response(
-            question, self.location, current_room, nearby_players
+        response_text, suspicion_change_speaker, suspicion_change_listener = await self.rag_manager.agenerate_response(
+            question, self.location, current_room, nearby_players, on_token=on_token,
+            state_fingerprint=self.state_fingerprint(question)
+        )
+        await self._apply_conversation_outcome(question, response_text, suspicion_change_speaker, suspicion_change_listener)
+        return response_text, suspicion_change_speaker, suspicion_change_listener
+
+    def strike_group_conversation(self, questions: list[Question]) -> list[tuple[str, int, int]]:
+        """Put one question to several players at once; see :meth:`astrike_group_conversation`."""
+        return run_sync(self.astrike_group_conversation(questions))
+
+    async def astrike_group_conversation(self, questions: list[Question]) -> list[tuple[str, int, int]]:
+        """Put one question to several players in the same room at once.
+
+        The replies are generated as a single batch; each one is then stored
+        and applied to suspicion and mood exactly like a single conversation.
+        """
+        if not questions:
+            return []
+
+        current_room = self.player_manager.get_current_room(questions[0].listener)
+        nearby_players = self.player_manager.get_players_in_room(current_room)
+
+        results = await self.rag_manager.agenerate_responses(
+            questions, self.location, current_room, nearby_players
         )
+        await asyncio.gather(*(
+            self._apply_conversation_outcome(question, response_text, suspicion_change_speaker, suspicion_change_listener)
+            for question, (response_text, suspicion_change_speaker, suspicion_change_listener) in zip(questions, results)
+        ))
+        return results
+
+    def prefetch_answers(self, questions: list[Question]) -> None:
+        """Start drafting answers to likely questions in the background.
+
+        Nothing about the game changes; a draft is only used if the same
+        question is later asked while the game state is unchanged. Drafts
+        for listeners not among ``questions`` are dropped first, since the
+        player has moved their attention elsewhere.
+        """
+        self.rag_manager.focus_speculation({question.listener.id for question in questions})
+        for question in questions:
+            current_room = self.player_manager.get_current_room(question.listener)
+            nearby_players = self.player_manager.get_players_in_room(current_room)
+            self.rag_manager.speculate(
+                question, self.location, current_room, nearby_players, self.state_fingerprint(question)
+            )
+
+    def state_fingerprint(self, question: Question) -> tuple:
+        """Summarize the game state a reply to ``question`` depends on"""
+        listener = question.listener
+        return (
+            self.game_state.current_turn,
+            self.player_manager.get_current_room(listener).name,
+            listener.mood,
+            listener.suspicion,
+            tuple(sorted(item.name for item in listener.get_known_items())),
+        )
+
+    async def _apply_conversation_outcome(self, question: Question, response_text: str,
+                                          suspicion_change_speaker: int, suspicion_change_listener: int) -> None:
+        """Store the exchange and update suspicion, moods and known items"""
         conversation = Conversation(question, response_text)
-        self.rag_manager.add_conversation(conversation, self.game_state.current_turn)
+        await self.rag_manager.aadd_conversation(conversation, self.game_state.current_turn)
         question.listener.suspicion += suspicion_change_listener
         question.speaker.suspicion += suspicion_change_speaker
         
@@ -36,8 +103,6 @@ class ConversationManager:
         
         if "item" in question.question.lower() or "inventory" in question.question.lower() or "carry" in question.question.lower():
             self._update_known_items_from_conversation(question, response_text)
-        
-        return response_text, suspicion_change_speaker, suspicion_change_listener
 
     def _update_known_items_from_conversation(self, question: Question, response: str) -> None:
         """Update known items based on conversation content"""
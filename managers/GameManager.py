@@ -1,4 +1,5 @@
-from typing import Optional
+import uuid
+from typing import Callable, Optional
 
 from entities.Player import Player
 from entities.Room import Room
@@ -10,6 +11,7 @@ from managers.GameStateManager import GameStateManager
 from managers.PlayerManager import PlayerManager
 from managers.ResourceManager import ResourceManager
 from Services.ErrorHandler import ErrorHandler
+from Services.ThreadingService import run_sync
 from .RagManager import RagManager
 
 
@@ -37,10 +39,14 @@ class GameManager:
         self.location = location
         self.user_player = user_player
         self.error_handler: ErrorHandler = error_handler or ErrorHandler()
+        # Namespaces this game's conversation memory apart from other games on the host
+        self.session_id = uuid.uuid4().hex
+        # Questions the user has put to NPCs, oldest first; used to predict the next one
+        self.asked_questions: list[str] = []
 
         self.player_manager = PlayerManager()
         self.game_state_manager = GameStateManager(max_turns, suspicion_limit)
-        self.rag_manager = RagManager(error_handler=self.error_handler)
+        self.rag_manager = RagManager(error_handler=self.error_handler, session_id=self.session_id)
         self.conversation_manager = ConversationManager(
             self.rag_manager,
             self.game_state_manager,
@@ -61,6 +67,8 @@ class GameManager:
             self.rag_manager.llm_service,
             self.rag_manager.memory_service,
             self.rag_manager.conversation_repository,
+            self.rag_manager.response_cache,
+            self.rag_manager.inference_worker,
         )
 
     def advance_turn_with_npc_movement(self) -> None:
@@ -77,14 +85,77 @@ class GameManager:
         if player is self.user_player:
             self.advance_turn_with_npc_movement()
 
-    def strike_conversation(self, question: Question) -> tuple[str, int, int]:
-        """Strike a conversation and advance the game turn."""
+    def strike_conversation(
+        self,
+        question: Question,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> tuple[str, int, int]:
+        """Strike a conversation and advance the game turn.
+
+        ``on_token`` optionally receives the partial reply while it streams.
+        """
+        return run_sync(self.astrike_conversation(question, on_token=on_token))
+
+    async def astrike_conversation(
+        self,
+        question: Question,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> tuple[str, int, int]:
+        """Async counterpart of :meth:`strike_conversation`."""
+        if question.speaker is self.user_player:
+            self.asked_questions.append(question.question)
         response, suspicion_change_speaker, suspicion_change_listener = (
-            self.conversation_manager.strike_conversation(question)
+            await self.conversation_manager.astrike_conversation(question, on_token=on_token)
         )
         self.advance_turn_with_npc_movement()
         return response, suspicion_change_speaker, suspicion_change_listener
 
+    def interrogate_room(self, question_text: str) -> list[tuple[Player, str, int, int]]:
+        """Put one question to every NPC in the user's room; see :meth:`ainterrogate_room`."""
+        return run_sync(self.ainterrogate_room(question_text))
+
+    async def ainterrogate_room(self, question_text: str) -> list[tuple[Player, str, int, int]]:
+        """Put one question to every NPC in the user's room.
+
+        All replies are generated as one batch and the whole interrogation
+        costs a single game turn.
+
+        Returns:
+            A ``(player, response, suspicion_change_speaker,
+            suspicion_change_listener)`` tuple for each questioned NPC.
+        """
+        self.asked_questions.append(question_text)
+        players = self.get_other_players_in_current_room()
+        questions = [Question(self.user_player, player, question_text) for player in players]
+        results = await self.conversation_manager.astrike_group_conversation(questions)
+        if questions:
+            self.advance_turn_with_npc_movement()
+        return [(player, *result) for player, result in zip(players, results)]
+
+    def likely_questions(self, limit: int, exclude: tuple[str, ...] = ()) -> list[str]:
+        """Return up to ``limit`` questions the user is likely to ask next.
+
+        The user tends to repeat a question to each suspect, so the most
+        recently asked distinct questions come first. Texts in ``exclude`` are
+        skipped.
+        """
+        likely: list[str] = []
+        for question_text in reversed(self.asked_questions):
+            if len(likely) >= limit:
+                break
+            if question_text not in likely and question_text not in exclude:
+                likely.append(question_text)
+        return likely
+
+    def prefetch_answers(self, players: list[Player], question_texts: list[str]) -> None:
+        """Speculatively prepare the player's likely questions to each of ``players``.
+
+        Costs no turn and changes nothing; see
+        :meth:`ConversationManager.prefetch_answers`.
+        """
+        questions = [Question(self.user_player, player, text) for player in players for text in question_texts]
+        self.conversation_manager.prefetch_answers(questions)
+
     def accuse_player(self, accuser: Player, accused: Player) -> bool:
         """Accuse a player and end the game on correct accusation."""
         result = self.accusation_manager.accuse_player(accuser, accused)
@@ -107,6 +178,10 @@ class GameManager:
             current_room, self.user_player
         )
 
+    def get_model_state(self) -> str:
+        """Return the loading state of the language model."""
+        return self.rag_manager.llm_service.state
+
     def is_game_active(self) -> bool:
         """Return ``True`` if the game is still active."""
         return self.game_state_manager.is_game_active()
@@ -1,52 +1,106 @@
-from typing import Optional, Tuple
+import asyncio
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Iterable, Optional, Tuple
 
 from entities.Question import Question
 from entities.Conversation import Conversation
 from entities.Location import Location
 from entities.Player import Player
 from entities.Room import Room
+from Services.InferenceWorker import InferenceWorker, WorkerEmbeddings, WorkerLLMService
 from Services.LLMService import LLMService
 from Services.MemoryService import MemoryService
 from Services.PromptService import PromptService
+from Services.ResponseCache import ResponseCache
 from Services.ResponseService import ResponseService
+from Services.SpeculationService import SpeculationService
+from Services.StopPolicy import PreemptibleStopPolicy, StopPolicy
+from Services.MemoryCompactor import MemoryCompactor
 from Services.SuspicionCalculator import SuspicionCalculator
+from Services.ThreadingService import run_sync
 from Services.ErrorHandler import ErrorHandler
+from config.ModelConfig import ModelConfig
 from repositories.ConversationRepository import ConversationRepository
 
 
 class RagManager:
     """Orchestrates RAG services for conversation generation."""
 
-    def __init__(self, error_handler: Optional[ErrorHandler] = None) -> None:
+    def __init__(self, error_handler: Optional[ErrorHandler] = None, session_id: Optional[str] = None) -> None:
         """Create a new RAG manager instance.
 
         Args:
             error_handler: Optional shared :class:`ErrorHandler` used for
                 logging errors that occur during response generation.
+            session_id: Namespace of this game's conversation memory; a new
+                one is generated when omitted.
         """
         self.error_handler: ErrorHandler = error_handler or ErrorHandler()
 
-        self.memory_service = MemoryService()
-        self.llm_service = LLMService()
+        self.inference_worker: Optional[InferenceWorker] = None
+        if ModelConfig.INFERENCE_WORKER:
+            # Keep model inference out of the UI process; see InferenceWorker.
+            self.inference_worker = InferenceWorker(
+                error_handler=self.error_handler,
+                restart_delay=ModelConfig.INFERENCE_WORKER_RESTART_DELAY,
+                shared_memory_threshold=ModelConfig.INFERENCE_WORKER_SHM_THRESHOLD,
+            )
+            self.memory_service = MemoryService(
+                WorkerEmbeddings(self.inference_worker, ModelConfig.INFERENCE_WORKER_START_TIMEOUT),
+                session_id=session_id,
+            )
+            self.llm_service = WorkerLLMService(self.inference_worker)
+        else:
+            self.memory_service = MemoryService(session_id=session_id)
+            self.llm_service = LLMService()
 
         # Initialize specialized services
-        self.prompt_service = PromptService()
+        self.prompt_service = PromptService(
+            token_counter=self.llm_service.count_tokens, error_handler=self.error_handler
+        )
         self.response_service = ResponseService(self.llm_service)
         self.suspicion_calculator = SuspicionCalculator()
+        self.speculation_service = SpeculationService(error_handler=self.error_handler)
+        self.memory_compactor = MemoryCompactor(
+            self.llm_service,
+            speculation_service=self.speculation_service,
+            error_handler=self.error_handler,
+            max_new_tokens=ModelConfig.COMPACTION_SUMMARY_TOKENS,
+        )
         self.conversation_repository = ConversationRepository(
-            self.memory_service, error_handler=self.error_handler
+            self.memory_service, error_handler=self.error_handler, compactor=self.memory_compactor
         )
+        self.response_cache = ResponseCache(
+            self.memory_service.embeddings,
+            path=ModelConfig.RESPONSE_CACHE_PATH,
+            similarity_threshold=ModelConfig.RESPONSE_CACHE_THRESHOLD,
+            max_entries=ModelConfig.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl_seconds=ModelConfig.RESPONSE_CACHE_TTL_SECONDS,
+        )
+        self.response_deadline: Optional[float] = ModelConfig.RESPONSE_DEADLINE_SECONDS or None
+        self.deadline_misses = 0
 
         # For backward compatibility
         self.vector_store = self.conversation_repository.vector_store
     
     def add_conversation(self, conversation: Conversation, turn: int) -> None:
         """Store a conversation in memory"""
-        self.conversation_repository.add_conversation(conversation, turn)
+        run_sync(self.aadd_conversation(conversation, turn))
+
+    async def aadd_conversation(self, conversation: Conversation, turn: int) -> None:
+        """Store a conversation in memory without blocking the event loop"""
+        await self.conversation_repository.aadd_conversation(conversation, turn)
         
     def get_conversation_context(self, current_question: Question, number_docs_to_retrieve: int = 3) -> str:
         """Retrieve relevant conversation history"""
-        return self.conversation_repository.get_conversation_context(current_question, number_docs_to_retrieve)
+        return run_sync(self.aget_conversation_context(current_question, number_docs_to_retrieve))
+
+    async def aget_conversation_context(self, current_question: Question, number_docs_to_retrieve: int = 3) -> str:
+        """Retrieve relevant conversation history without blocking the event loop"""
+        return await self.conversation_repository.aget_conversation_context(current_question, number_docs_to_retrieve)
 
     def generate_response(
         self,
@@ -54,56 +108,459 @@ class RagManager:
         location: Location,
         current_room: Room,
         nearby_players: list[Player],
+        on_token: Optional[Callable[[str], None]] = None,
+        state_fingerprint: Optional[Hashable] = None,
+    ) -> Tuple[str, int, int]:
+        """Generate NPC response using RAG; see :meth:`agenerate_response`."""
+        return run_sync(
+            self.agenerate_response(
+                question, location, current_room, nearby_players, on_token, state_fingerprint
+            )
+        )
+
+    async def agenerate_response(
+        self,
+        question: Question,
+        location: Location,
+        current_room: Room,
+        nearby_players: list[Player],
+        on_token: Optional[Callable[[str], None]] = None,
+        state_fingerprint: Optional[Hashable] = None,
     ) -> Tuple[str, int, int]:
         """Generate NPC response using RAG with proper context.
 
+        When ``on_token`` is provided the reply is streamed and the callback
+        receives the cleaned partial text as it is generated.
+
         On any error during LLM invocation or suspicion calculation, a
         fallback response is generated and the error is logged via the
-        configured :class:`ErrorHandler`.
+        configured :class:`ErrorHandler`. While the model is still loading in
+        the background the rule-based fallback is served immediately.
+
+        A draft prepared by :meth:`speculate` for the same question and
+        ``state_fingerprint``, or a reply cached for a similar question asked
+        of a character in the same state, is returned without calling the
+        model.
+
+        If the reply is not ready within :attr:`response_deadline` seconds the
+        fallback is returned instead and the miss is counted in
+        :attr:`deadline_misses`. Generation then finishes in the background
+        and its reply is stored in the response cache for next time. A
+        streamed reply only has to start within the deadline: once its first
+        tokens have been shown it is never replaced by the fallback.
+
+        Retrieval runs on the event loop; blocking work (cache embeddings and
+        the model itself) runs on worker threads, so many conversations can
+        be awaited concurrently.
         """
-        try:
-            # Get conversation context
-            context = self.get_conversation_context(question)
+        started = time.monotonic()
+        template_type = self.prompt_service.select_template_type(question)
+        response_cache_key = self._response_cache_key(question, location, current_room, template_type)
 
-            # Select template and create prompt
-            template_type = self.prompt_service.select_template_type(question)
-            prompt = self.prompt_service.create_prompt(
-                question,
-                location,
-                current_room,
-                context,
-                template_type,
-                nearby_players,
+        prepared_response = None
+        if state_fingerprint is not None:
+            prepared_response = await asyncio.to_thread(
+                self.speculation_service.take,
+                self._speculation_key(question), state_fingerprint, self._time_left(started)
             )
+        if prepared_response is None:
+            prepared_response = await self._alookup_cached_response(response_cache_key, question, started)
+        if prepared_response is not None:
+            if on_token is not None:
+                on_token(prepared_response)
+            return self._score_response(question, template_type, prepared_response)
 
-            # Generate response
-            if not self.response_service.llm:
-                return self._generate_fallback_response(question)
+        if not self.llm_service.is_ready():
+            return self._generate_fallback_response(question)
 
-            response_text = self.response_service.generate_response(prompt)
+        expired = threading.Event()
+        streaming = threading.Event()
+        stream_lock = threading.Lock()
 
-            # Calculate suspicion changes
-            suspicion_change_speaker, suspicion_change_listener = (
-                self.suspicion_calculator.calculate_suspicion_change(
-                    question.question,
-                    response_text,
-                    question.listener.murderer,
-                    question.listener.lying_ability,
-                    question.listener.mood,
+        def forward_token(partial: str) -> None:
+            with stream_lock:
+                if expired.is_set():
+                    return
+                streaming.set()
+            on_token(partial)
+
+        try:
+            try:
+                context = await asyncio.wait_for(
+                    self.aget_conversation_context(question), timeout=self._time_left(started)
                 )
-            )
+            except asyncio.TimeoutError:
+                self._record_deadline_miss(None, started, "RagManager.generate_response")
+                return self._generate_fallback_response(question)
 
-            # Mark items as known for inventory queries (innocent players only)
-            if "inventory" in template_type and not question.listener.murderer:
-                for item in question.listener.inventory:
-                    if not item.murder_weapon:
-                        item.known = True
+            def generate() -> str:
+                with self.speculation_service.foreground():
+                    response_text = self._generate_from_context(
+                        question, location, current_room, nearby_players, template_type, context,
+                        forward_token if on_token is not None else None
+                    )
+                self._store_cached_response(response_cache_key, question, response_text)
+                return response_text
 
-            return response_text, suspicion_change_speaker, suspicion_change_listener
+            generation = self._start_generation(generate)
+            try:
+                response_text = await self._await_generation(generation, self._time_left(started))
+            except asyncio.TimeoutError:
+                with stream_lock:
+                    if not streaming.is_set():
+                        expired.set()
+                if expired.is_set():
+                    self._record_deadline_miss(generation, started, "RagManager.generate_response")
+                    return self._generate_fallback_response(question)
+                # The player is already reading this reply; let it finish
+                response_text = await self._await_generation(generation, None)
+
+            return self._score_response(question, template_type, response_text)
 
         except Exception as exception:  # pragma: no cover - defensive fallback
             self.error_handler.log_error(exception, context="RagManager.generate_response")
             return self._generate_fallback_response(question)
+
+    def speculate(
+        self,
+        question: Question,
+        location: Location,
+        current_room: Room,
+        nearby_players: list[Player],
+        state_fingerprint: Hashable,
+    ) -> None:
+        """Draft the reply to a likely question in the background.
+
+        The draft has no side effects on the game. It is used by
+        :meth:`generate_response` only if the same question is asked with
+        the same ``state_fingerprint``; otherwise it is discarded. A draft
+        stops decoding as soon as a foreground question starts generating,
+        and is then dropped rather than cached half-written.
+        """
+        if not self.llm_service.is_ready():
+            return
+
+        def draft() -> Optional[str]:
+            template_type = self.prompt_service.select_template_type(question)
+            response_cache_key = self._response_cache_key(question, location, current_room, template_type)
+            cached_response = self._lookup_cached_response(response_cache_key, question)
+            if cached_response is not None:
+                return cached_response
+            stop_policy = PreemptibleStopPolicy.like(
+                self.response_service.stop_policy, self.speculation_service.foreground_active
+            )
+            response_text = self._generate_text(
+                question, location, current_room, nearby_players, template_type, stop_policy=stop_policy
+            )
+            if stop_policy.preempted:
+                return None
+            self._store_cached_response(response_cache_key, question, response_text)
+            return response_text
+
+        self.speculation_service.speculate(
+            self._speculation_key(question), state_fingerprint, draft, group=question.listener.id
+        )
+
+    def focus_speculation(self, listener_ids: Iterable[Hashable]) -> None:
+        """Drop drafts for every listener outside ``listener_ids``."""
+        self.speculation_service.discard(keep_groups=listener_ids)
+
+    def _generate_text(
+        self,
+        question: Question,
+        location: Location,
+        current_room: Room,
+        nearby_players: list[Player],
+        template_type: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        stop_policy: Optional[StopPolicy] = None,
+    ) -> str:
+        """Retrieve context, build the prompt and generate the cleaned reply."""
+        context = self.get_conversation_context(question)
+        return self._generate_from_context(
+            question, location, current_room, nearby_players, template_type, context, on_token, stop_policy
+        )
+
+    def _generate_from_context(
+        self,
+        question: Question,
+        location: Location,
+        current_room: Room,
+        nearby_players: list[Player],
+        template_type: str,
+        context: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        stop_policy: Optional[StopPolicy] = None,
+    ) -> str:
+        """Build the prompt around retrieved ``context`` and generate the cleaned reply."""
+        # Create prompt for the selected template
+        prompt, prompt_report = self.prompt_service.build_prompt(
+            question,
+            location,
+            current_room,
+            context,
+            template_type,
+            nearby_players,
+        )
+        self.error_handler.log_debug(str(prompt_report))
+
+        cache_key, cache_signature = self.prompt_service.prefix_cache_key(
+            question, current_room, template_type
+        )
+        return self.response_service.generate_response(
+            prompt,
+            on_token=on_token,
+            cache_key=cache_key,
+            cache_signature=cache_signature,
+            max_new_tokens=self.prompt_service.token_budget(template_type),
+            stop_policy=stop_policy,
+        )
+
+    def _start_generation(self, task: Callable[[], Any]) -> Future:
+        """Run ``task`` on a daemon thread and return a future for its result.
+
+        A daemon thread rather than an executor keeps work that outlived its
+        deadline from delaying the end of the event loop or interpreter exit.
+        """
+        future: Future = Future()
+
+        def run() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(task())
+            except Exception as exception:
+                future.set_exception(exception)
+
+        thread = threading.Thread(target=run, name="RagGeneration")
+        thread.daemon = True
+        thread.start()
+        return future
+
+    async def _await_generation(self, generation: Future, timeout: Optional[float]) -> Any:
+        """Await ``generation`` for up to ``timeout`` seconds; raises ``asyncio.TimeoutError``.
+
+        Only a waiter owned by this loop is cancelled by a missed deadline, so
+        the generation runs to completion in the background. By then the loop
+        may be closed, and the generation's result is simply not delivered.
+        """
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+
+        def settle(done: Future) -> None:
+            if waiter.done():
+                return
+            if done.cancelled():
+                waiter.cancel()
+            elif done.exception() is not None:
+                waiter.set_exception(done.exception())
+            else:
+                waiter.set_result(done.result())
+
+        def deliver(done: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(settle, done)
+            except RuntimeError:
+                pass  # The waiting loop has closed since the deadline was missed
+
+        generation.add_done_callback(deliver)
+        return await asyncio.wait_for(waiter, timeout=timeout)
+
+    def _time_left(self, started: float) -> Optional[float]:
+        """Seconds remaining of the response deadline, or ``None`` without one."""
+        if self.response_deadline is None:
+            return None
+        return max(0.0, self.response_deadline - (time.monotonic() - started))
+
+    def _record_deadline_miss(self, generation: Optional[Future], started: float, context: str) -> None:
+        """Count a missed deadline and log the background generation's outcome, if any."""
+        self.deadline_misses += 1
+        self.error_handler.log_warning(
+            f"{context}: no reply after {time.monotonic() - started:.1f}s "
+            f"(deadline {self.response_deadline}s, {self.deadline_misses} misses so far); "
+            "serving fallback" + (" and finishing in the background" if generation is not None else "")
+        )
+        if generation is None:
+            return
+
+        def log_failure(future: Future) -> None:
+            if future.exception() is not None:
+                self.error_handler.log_error(future.exception(), context=f"{context} (background)")
+
+        generation.add_done_callback(log_failure)
+
+    @staticmethod
+    def _speculation_key(question: Question) -> tuple:
+        """Identify a question to a listener, ignoring case and punctuation."""
+        normalized = " ".join(re.sub(r"[^\w\s]", " ", question.question.lower()).split())
+        return question.listener.id, normalized
+
+    def generate_responses(
+        self,
+        questions: list[Question],
+        location: Location,
+        current_room: Room,
+        nearby_players: list[Player],
+    ) -> list[Tuple[str, int, int]]:
+        """Generate responses for several NPCs at once; see :meth:`agenerate_responses`."""
+        return run_sync(self.agenerate_responses(questions, location, current_room, nearby_players))
+
+    async def agenerate_responses(
+        self,
+        questions: list[Question],
+        location: Location,
+        current_room: Room,
+        nearby_players: list[Player],
+    ) -> list[Tuple[str, int, int]]:
+        """Generate responses for several NPCs in the same room at once.
+
+        Questions with a cached reply are answered from the response cache;
+        context for the others is retrieved concurrently and their prompts
+        are decoded together as one padded batch, within the largest token
+        budget of their templates. Each answer is then scored exactly like
+        :meth:`agenerate_response`. If the model is unavailable, the batch
+        fails or misses :attr:`response_deadline`, the uncached questions get
+        fallback responses instead; a late batch still fills the cache.
+        """
+        started = time.monotonic()
+        template_types = [self.prompt_service.select_template_type(question) for question in questions]
+        cache_keys = [
+            self._response_cache_key(question, location, current_room, template_type)
+            for question, template_type in zip(questions, template_types)
+        ]
+        response_texts = list(await asyncio.gather(*(
+            self._alookup_cached_response(cache_key, question, started)
+            for question, cache_key in zip(questions, cache_keys)
+        )))
+        pending = [index for index, response_text in enumerate(response_texts) if response_text is None]
+
+        if pending and not self.llm_service.is_ready():
+            return [
+                self._generate_fallback_response(question) if response_text is None
+                else self._score_response(question, template_type, response_text)
+                for question, template_type, response_text in zip(questions, template_types, response_texts)
+            ]
+
+        try:
+            try:
+                contexts = await asyncio.wait_for(
+                    asyncio.gather(*(self.aget_conversation_context(questions[index]) for index in pending)),
+                    timeout=self._time_left(started),
+                )
+            except asyncio.TimeoutError:
+                self._record_deadline_miss(None, started, "RagManager.generate_responses")
+                contexts = None
+
+            prompts = []
+            for index, context in zip(pending, contexts or []):
+                prompt, prompt_report = self.prompt_service.build_prompt(
+                    questions[index],
+                    location,
+                    current_room,
+                    context,
+                    template_types[index],
+                    nearby_players,
+                )
+                self.error_handler.log_debug(str(prompt_report))
+                prompts.append(prompt)
+
+            def generate() -> list[str]:
+                with self.speculation_service.foreground():
+                    budget = max(self.prompt_service.token_budget(template_types[index]) for index in pending)
+                    generated = self.response_service.generate_responses(prompts, max_new_tokens=budget)
+                for index, response_text in zip(pending, generated):
+                    self._store_cached_response(cache_keys[index], questions[index], response_text)
+                return generated
+
+            if prompts:
+                generation = self._start_generation(generate)
+                try:
+                    generated = await self._await_generation(generation, self._time_left(started))
+                except asyncio.TimeoutError:
+                    self._record_deadline_miss(generation, started, "RagManager.generate_responses")
+                    generated = [None] * len(pending)
+                for index, response_text in zip(pending, generated):
+                    response_texts[index] = response_text
+
+            return [
+                self._generate_fallback_response(question) if response_text is None
+                else self._score_response(question, template_type, response_text)
+                for question, template_type, response_text in zip(questions, template_types, response_texts)
+            ]
+
+        except Exception as exception:  # pragma: no cover - defensive fallback
+            self.error_handler.log_error(exception, context="RagManager.generate_responses")
+            return [
+                self._generate_fallback_response(question) if index in pending
+                else self._score_response(question, template_types[index], response_texts[index])
+                for index, question in enumerate(questions)
+            ]
+
+    def _response_cache_key(
+        self, question: Question, location: Location, current_room: Room, template_type: str
+    ) -> str:
+        """Describe the listener and its situation for the response cache."""
+        listener = question.listener
+        return ResponseCache.make_key(
+            f"{listener.id}:{listener.name}",
+            listener.job,
+            "murderer" if listener.murderer else "innocent",
+            listener.mood,
+            self.prompt_service.suspicion_band(listener.suspicion),
+            [f"{item.name}{'*' if item.known else ''}" for item in listener.inventory],
+            template_type,
+            current_room.name,
+            location.name,
+        )
+
+    async def _alookup_cached_response(self, cache_key: str, question: Question, started: float) -> Optional[str]:
+        """Look up a cached reply on a daemon thread; a lookup past the deadline counts as a miss."""
+        lookup = self._start_generation(lambda: self._lookup_cached_response(cache_key, question))
+        try:
+            return await self._await_generation(lookup, self._time_left(started))
+        except asyncio.TimeoutError:
+            return None
+
+    def _lookup_cached_response(self, cache_key: str, question: Question) -> Optional[str]:
+        """Return a cached reply for the question, or ``None`` on a miss or error.
+
+        While the inference worker is restarting this is always a miss:
+        embedding the question would wait for the worker to come back.
+        """
+        if self.inference_worker is not None and not self.inference_worker.is_started():
+            return None
+        try:
+            return self.response_cache.lookup(cache_key, question.question)
+        except Exception as exception:  # pragma: no cover - cache is best effort
+            self.error_handler.log_error(exception, context="RagManager._lookup_cached_response")
+            return None
+
+    def _store_cached_response(self, cache_key: str, question: Question, response_text: str) -> None:
+        """Remember a generated reply; failures are logged and ignored."""
+        try:
+            self.response_cache.store(cache_key, question.question, response_text)
+        except Exception as exception:  # pragma: no cover - cache is best effort
+            self.error_handler.log_error(exception, context="RagManager._store_cached_response")
+
+    def _score_response(self, question: Question, template_type: str, response_text: str) -> Tuple[str, int, int]:
+        """Calculate suspicion changes and reveal items for a generated response."""
+        suspicion_change_speaker, suspicion_change_listener = (
+            self.suspicion_calculator.calculate_suspicion_change(
+                question.question,
+                response_text,
+                question.listener.murderer,
+                question.listener.lying_ability,
+                question.listener.mood,
+            )
+        )
+
+        # Mark items as known for inventory queries (innocent players only)
+        if "inventory" in template_type and not question.listener.murderer:
+            for item in question.listener.inventory:
+                if not item.murder_weapon:
+                    item.known = True
+
+        return response_text, suspicion_change_speaker, suspicion_change_listener
     
     def _generate_fallback_response(self, question: Question) -> Tuple[str, int, int]:
         """Generate fallback response when LLM is unavailable or fails."""
@@ -117,6 +574,21 @@ class RagManager:
         )
         return response, suspicion_change_speaker, suspicion_change_listener
 
+    def save_memories(self, path: Optional[str] = None) -> int:
+        """Save this game's conversation memories to ``path`` (this session's snapshot directory by default)"""
+        return self.conversation_repository.save_snapshot(
+            path or self.conversation_repository.snapshot_path, dtype=ModelConfig.MEMORY_SNAPSHOT_DTYPE
+        )
+
+    def load_memories(self, path: str) -> int:
+        """Restore conversation memories saved by :meth:`save_memories` to ``path``
+
+        The path is required: the default save directory is keyed by the
+        session id, which is new for every game, so a new game's default
+        never holds an earlier game's snapshot.
+        """
+        return self.conversation_repository.load_snapshot(path)
+
     def clear_database(self) -> None:
-        """Clear the entire conversation database"""
+        """Clear this game's conversation memory"""
         self.conversation_repository.clear_database()
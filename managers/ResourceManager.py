@@ -1,8 +1,12 @@
 from typing import Optional
 
+from config.ModelConfig import ModelConfig
 from Services.LLMService import LLMService
 from Services.MemoryService import MemoryService
+from Services.CachedEmbeddings import CachedEmbeddings
 from Services.ErrorHandler import ErrorHandler
+from Services.InferenceWorker import InferenceWorker
+from Services.ResponseCache import ResponseCache
 from repositories.ConversationRepository import ConversationRepository
 
 
@@ -19,15 +23,21 @@ class ResourceManager:
         self.llm_service: Optional[LLMService] = None
         self.memory_service: Optional[MemoryService] = None
         self.conversation_repository: Optional[ConversationRepository] = None
+        self.response_cache: Optional[ResponseCache] = None
+        self.inference_worker: Optional[InferenceWorker] = None
         self._initialized = False
         self._error_handler = error_handler
     
     def initialize(self, llm_service: LLMService, memory_service: MemoryService, 
-                  conversation_repository: ConversationRepository):
+                  conversation_repository: ConversationRepository,
+                  response_cache: Optional[ResponseCache] = None,
+                  inference_worker: Optional[InferenceWorker] = None):
         """Initialize resources"""
         self.llm_service = llm_service
         self.memory_service = memory_service
         self.conversation_repository = conversation_repository
+        self.response_cache = response_cache
+        self.inference_worker = inference_worker
         self._initialized = True
     
     def cleanup(self) -> None:
@@ -36,11 +46,37 @@ class ResourceManager:
             return
 
         try:
+            if self.response_cache:
+                self.response_cache.save()
+
+            if self.memory_service and isinstance(self.memory_service.embeddings, CachedEmbeddings):
+                embeddings = self.memory_service.embeddings
+                embeddings.save()
+                if self._error_handler is not None:
+                    self._error_handler.log_info(
+                        f"Embedding cache: {embeddings.hits} hits, {embeddings.disk_hits} disk hits, "
+                        f"{embeddings.misses} misses"
+                    )
+
             if self.conversation_repository:
+                retrieval_cache = self.conversation_repository.retrieval_cache
+                if self._error_handler is not None:
+                    self._error_handler.log_info(
+                        f"Retrieval cache: {retrieval_cache.hits} hits, {retrieval_cache.misses} misses "
+                        f"({retrieval_cache.hit_rate:.0%} hit rate)"
+                    )
+                if ModelConfig.MEMORY_SNAPSHOT_ON_EXIT:
+                    self._save_memory_snapshot()
                 self.conversation_repository.clear_database()
 
-            if self.llm_service and hasattr(self.llm_service, "model"):
-                self.llm_service.model = None
+            if self.memory_service:
+                self.memory_service.close()
+
+            if self.llm_service:
+                self.llm_service.close()
+
+            if self.inference_worker:
+                self.inference_worker.close()
 
             if self._error_handler is not None:
                 self._error_handler.log_info("Resources cleaned up successfully.")
@@ -50,6 +86,18 @@ class ResourceManager:
         finally:
             self._initialized = False
     
+    def _save_memory_snapshot(self) -> None:
+        """Write the end-of-session snapshot; a failure is logged and does not stop cleanup."""
+        path = self.conversation_repository.snapshot_path
+        try:
+            saved = self.conversation_repository.save_snapshot(path, dtype=ModelConfig.MEMORY_SNAPSHOT_DTYPE)
+        except Exception as error:
+            if self._error_handler is not None:
+                self._error_handler.log_error(error, context="ResourceManager snapshot")
+            return
+        if self._error_handler is not None:
+            self._error_handler.log_info(f"Saved {saved} conversation memories to {path}")
+    
     def __enter__(self):
         """Context manager entry"""
         return self
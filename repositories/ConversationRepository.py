@@ -1,19 +1,351 @@
+import os
+import threading
+import uuid
+from collections import deque
+from typing import Optional
+
+import numpy as np
 from langchain_core.documents import Document
+from config.ModelConfig import ModelConfig
 from entities.Conversation import Conversation
 from entities.Question import Question
 from Services.MemoryService import MemoryService
+from Services.CachedEmbeddings import CachedEmbeddings
 from Services.ErrorHandler import ErrorHandler
+from Services.MemoryCompactor import MemoryCompactor
+from Services.MemorySnapshot import MemorySnapshot
+from Services.RetrievalCache import RetrievalCache
+from Services.ThreadingService import run_sync
+from Services.WriteBehindQueue import WriteBehindQueue
 
 
 class ConversationRepository:
-    """Handles conversation storage and retrieval using vector database"""
+    """Handles conversation storage and retrieval using vector database.
+
+    Conversations are written behind the turn: they are queued and stored in
+    batches (one embedding batch, one ``add_documents`` call) by a
+    :class:`WriteBehindQueue`. Queued conversations are merged into the
+    retrieved context, so the next question to the same person sees them.
+    
+    The repository also counts the conversations of each player pair and keeps
+    the most recent ones in memory. While a pair's whole history fits in the
+    requested context, it is returned directly, without embedding the query or
+    searching the index. This relies on the repository being the only writer
+    of its session's namespace.
+    
+    Once a pair has more than ``COMPACTION_THRESHOLD`` conversations, its
+    oldest ones are folded by a :class:`MemoryCompactor` into a single summary
+    document recording the turn range it covers, keeping the newest
+    ``COMPACTION_KEEP_RECENT`` verbatim. Each pair therefore holds at most
+    one summary plus a bounded number of transcripts, however long the game.
+    
+    Retrieved context is cached in a :class:`RetrievalCache` under the pair's
+    version, which every write to the pair increments, so repeating a
+    question between writes costs no search at all.
+    
+    Repeats are not stored twice. When a batch is written, a conversation
+    whose text matches one already stored for the pair (by hash), or whose
+    embedding is at least ``DEDUP_SIMILARITY_THRESHOLD`` cosine-similar to
+    the pair's nearest stored conversation, only bumps that conversation's
+    ``repeats`` counter and moves its ``turn`` forward (``first_turn`` keeps
+    the original). The store therefore grows with what was said, not with
+    how often it was asked.
+    """
     
-    def __init__(self, memory_service: MemoryService, error_handler: ErrorHandler):
+    def __init__(self, memory_service: MemoryService, error_handler: ErrorHandler,
+                 compactor: Optional[MemoryCompactor] = None):
         self.vector_store = memory_service.vector_store
+        self.embeddings = memory_service.embeddings
+        self.session_id = memory_service.session_id
+        self.error_handler = error_handler
+        self.write_queue = WriteBehindQueue(
+            self._write_documents,
+            batch_size=ModelConfig.INGEST_BATCH_SIZE,
+            flush_interval=ModelConfig.INGEST_FLUSH_SECONDS,
+            error_handler=error_handler,
+        )
+        self.recent_history_size = ModelConfig.RECENT_HISTORY_SIZE
+        self._pair_counts: dict[str, int] = {}
+        self._recent: dict[str, deque] = {}
+        self._history_lock = threading.Lock()
+        self.short_circuits = 0
+        self._pair_versions: dict[str, int] = {}
+        self.retrieval_cache = RetrievalCache(ModelConfig.RETRIEVAL_CACHE_SIZE)
+        self.compactor = compactor or MemoryCompactor(error_handler=error_handler)
+        self.compaction_threshold = ModelConfig.COMPACTION_THRESHOLD
+        self.compaction_keep_recent = ModelConfig.COMPACTION_KEEP_RECENT
+        self.dedup_threshold = ModelConfig.DEDUP_SIMILARITY_THRESHOLD
+        self._content_hashes: dict[str, dict[str, str]] = {}
+        self.duplicates = 0
     
     def add_conversation(self, conversation: Conversation, turn: int) -> None:
-        """Store a conversation in memory"""
+        """Queue a conversation to be stored in memory"""
+        doc = self._to_document(conversation, turn)
+        pair = doc.metadata["player_ids"]
+        with self._history_lock:
+            self._pair_counts[pair] = self._pair_counts.get(pair, 0) + 1
+            self._recent.setdefault(pair, deque(maxlen=self.recent_history_size)).append(doc)
+            self._pair_versions[pair] = self._pair_versions.get(pair, 0) + 1
+            count = self._pair_counts[pair]
+        self.write_queue.put(doc)
+        if self.compaction_threshold and count > self.compaction_threshold:
+            self.compactor.submit(pair, lambda: self.compact(pair))
+    
+    async def aadd_conversation(self, conversation: Conversation, turn: int) -> None:
+        """Queue a conversation to be stored in memory; returns without waiting for storage"""
+        self.add_conversation(conversation, turn)
+    
+    def flush(self) -> None:
+        """Store every queued conversation now"""
+        self.write_queue.flush()
+    
+    def _write_documents(self, documents: list[Document]) -> None:
+        """Store one batch of queued conversations, folding repeats into what is already stored"""
+        vectors = self._unit(self.embeddings.embed_documents([doc.page_content for doc in documents]))
+        kept: list[Document] = []
+        kept_vectors: list[np.ndarray] = []
+        for doc, vector in zip(documents, vectors):
+            original = self._find_duplicate(doc, vector, kept, kept_vectors)
+            if original is None:
+                kept.append(doc)
+                kept_vectors.append(vector)
+            else:
+                self._record_repeat(original, doc, stored=all(original is not earlier for earlier in kept))
+        if not kept:
+            return
+        
+        if hasattr(self.vector_store, "add_embeddings"):
+            self.vector_store.add_embeddings(
+                [doc.page_content for doc in kept], np.stack(kept_vectors),
+                [doc.metadata for doc in kept], ids=[doc.id for doc in kept],
+            )
+        else:
+            # Embedding again is a cache hit in the CachedEmbeddings
+            self.vector_store.add_documents(kept)
+        with self._history_lock:
+            for doc in kept:
+                self._content_hashes.setdefault(doc.metadata["player_ids"], {})[
+                    CachedEmbeddings.text_key(doc.page_content)] = doc.id
+    
+    def _find_duplicate(self, doc: Document, vector: np.ndarray,
+                        batch: list[Document], batch_vectors: list[np.ndarray]) -> Optional[Document]:
+        """Return the stored or earlier-batched conversation of the pair that ``doc`` repeats, if any"""
+        pair = doc.metadata["player_ids"]
+        batch_pairs = [(earlier, earlier_vector) for earlier, earlier_vector in zip(batch, batch_vectors)
+                       if earlier.metadata["player_ids"] == pair]
+        key = CachedEmbeddings.text_key(doc.page_content)
+        for earlier, _ in batch_pairs:
+            if CachedEmbeddings.text_key(earlier.page_content) == key:
+                return earlier
+        with self._history_lock:
+            stored_id = self._content_hashes.get(pair, {}).get(key)
+        if stored_id is not None:
+            stored = self.vector_store.get_by_ids([stored_id])
+            if stored:
+                return stored[0]
+        
+        if self.dedup_threshold > 1:
+            return None
+        best, best_similarity = None, self.dedup_threshold
+        for earlier, earlier_vector in batch_pairs:
+            similarity = float(earlier_vector @ vector)
+            if similarity >= best_similarity:
+                best, best_similarity = earlier, similarity
+        nearest = self.vector_store.similarity_search_by_vector(vector.tolist(), k=1, filter={"player_ids": pair})
+        if nearest and not nearest[0].metadata.get("summary"):
+            # Score the candidate against its exact vector, whatever the store's metric or codec
+            similarity = float(self._unit(self.embeddings.embed_documents([nearest[0].page_content]))[0] @ vector)
+            if similarity >= best_similarity:
+                best = nearest[0]
+        return best
+    
+    def _record_repeat(self, original: Document, duplicate: Document, stored: bool) -> None:
+        """Count ``duplicate`` as one more occurrence of ``original`` instead of storing it"""
+        metadata = dict(original.metadata)
+        metadata.setdefault("first_turn", metadata.get("turn", 0))
+        metadata["turn"] = max(metadata.get("turn", 0), duplicate.metadata.get("turn", 0))
+        metadata["repeats"] = metadata.get("repeats", 0) + 1
+        if stored:
+            if hasattr(self.vector_store, "update_metadata"):
+                self.vector_store.update_metadata([original.id], [metadata])
+            else:
+                self.vector_store._collection.update(ids=[original.id], metadatas=[metadata])
+        else:
+            original.metadata.update(metadata)
+        
+        pair = duplicate.metadata["player_ids"]
+        with self._history_lock:
+            self.duplicates += 1
+            if pair not in self._pair_counts:
+                return
+            self._pair_counts[pair] -= 1
+            self._pair_versions[pair] = self._pair_versions.get(pair, 0) + 1
+            recent = [doc for doc in self._recent.get(pair, ()) if doc is not duplicate]
+            repeated = [doc for doc in recent if doc.id == original.id]
+            for doc in repeated:
+                doc.metadata.update(metadata)
+            # The repeated conversation is now the pair's most recent one
+            recent = [doc for doc in recent if doc.id != original.id] + repeated
+            self._recent[pair] = deque(recent, maxlen=self.recent_history_size)
+    
+    @staticmethod
+    def _unit(vectors) -> np.ndarray:
+        """Return ``vectors`` as a float32 matrix of unit rows"""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+    
+    def compact(self, player_ids: str) -> Optional[Document]:
+        """Fold a pair's oldest conversations into one summary document
+        
+        Everything but the newest ``compaction_keep_recent`` conversations,
+        including an earlier summary, is replaced by a summary whose metadata
+        records the covered turns (``turn_start`` to ``turn_end``).
+        
+        Returns:
+            The summary document, or ``None`` if there was nothing to fold.
+        """
+        self.write_queue.flush()
+        stored = self.vector_store.get(where={"player_ids": player_ids})
+        entries = sorted(
+            zip(stored["ids"], stored["documents"], stored["metadatas"]),
+            key=lambda entry: (entry[2].get("turn", 0), 0 if entry[2].get("summary") else 1),
+        )
+        fold = entries[:len(entries) - self.compaction_keep_recent]
+        if len(fold) < 2:
+            return None
+        
+        folded = [Document(page_content=text, metadata=metadata) for _, text, metadata in fold]
+        turn_start = min(doc.metadata.get("turn_start", doc.metadata.get("first_turn", doc.metadata.get("turn", 0)))
+                         for doc in folded)
+        turn_end = max(doc.metadata.get("turn", 0) for doc in folded)
+        summary = Document(
+            id=str(uuid.uuid4()),
+            page_content=f"Summary of turns {turn_start}-{turn_end}: {self.compactor.summarize(folded)}",
+            metadata={
+                "player_ids": player_ids,
+                "players": folded[-1].metadata.get("players", ""),
+                "turn": turn_end,
+                "turn_start": turn_start,
+                "turn_end": turn_end,
+                "summary": True,
+            }
+        )
+        # Store the summary before deleting what it replaces, so nothing is ever missing
+        self.vector_store.add_documents([summary])
+        self.vector_store.delete(ids=[document_id for document_id, _, _ in fold])
+        
+        removed = {(doc.page_content, doc.metadata.get("turn")) for doc in folded}
+        with self._history_lock:
+            hashes = self._content_hashes.get(player_ids, {})
+            folded_ids = {document_id for document_id, _, _ in fold}
+            for key in [key for key, document_id in hashes.items() if document_id in folded_ids]:
+                del hashes[key]
+            if player_ids in self._pair_counts:
+                self._pair_counts[player_ids] -= len(folded) - 1
+                self._pair_versions[player_ids] = self._pair_versions.get(player_ids, 0) + 1
+                recent = [doc for doc in self._recent.get(player_ids, ())
+                          if (doc.page_content, doc.metadata.get("turn")) not in removed]
+                self._recent[player_ids] = deque([summary] + recent, maxlen=self.recent_history_size)
+        return summary
+    
+    @property
+    def snapshot_path(self) -> str:
+        """Default snapshot directory of this session, under ``ModelConfig.MEMORY_SNAPSHOT_PATH``
+        
+        Keyed by the session id, so only this session writes there; loading
+        an earlier game's snapshot needs that game's directory.
+        """
+        return os.path.join(ModelConfig.MEMORY_SNAPSHOT_PATH, self.session_id)
+    
+    def save_snapshot(self, path: str, dtype: str = "float16") -> int:
+        """Save this session's conversations and their embeddings to the directory ``path``
+        
+        Returns:
+            The number of conversations saved.
+        """
+        self.write_queue.flush()
+        stored = self.vector_store.get(include=["documents", "metadatas", "embeddings"])
+        embeddings = stored.get("embeddings")
+        vectors = np.asarray(embeddings if embeddings is not None else [], dtype=np.float32)
+        snapshot = MemorySnapshot(list(stored["ids"]), list(stored["documents"]), list(stored["metadatas"]), vectors)
+        snapshot.save(path, dtype=dtype)
+        return len(snapshot)
+    
+    def load_snapshot(self, path: str) -> int:
+        """Restore conversations saved by :meth:`save_snapshot`, without embedding them again
+        
+        The snapshot replaces this session's memory, so loading the same
+        snapshot twice leaves the repository as loading it once.
+        
+        Returns:
+            The number of conversations restored.
+        """
+        snapshot = MemorySnapshot.load(path)
+        self.write_queue.clear()
+        stored_ids = self.vector_store.get()["ids"]
+        if stored_ids:
+            self.vector_store.delete(ids=list(stored_ids))
+        if len(snapshot):
+            self._restore(snapshot)
+        self._rebuild_history()
+        return len(snapshot)
+    
+    def _restore(self, snapshot: MemorySnapshot) -> None:
+        """Add a snapshot's conversations to the store with their saved embeddings"""
+        if hasattr(self.vector_store, "add_embeddings"):
+            self.vector_store.add_embeddings(snapshot.texts, snapshot.vectors, snapshot.metadatas, ids=snapshot.ids)
+        else:
+            self.vector_store._collection.upsert(
+                ids=snapshot.ids,
+                embeddings=np.asarray(snapshot.vectors, dtype=np.float32),
+                documents=snapshot.texts,
+                metadatas=snapshot.metadatas,
+            )
+    
+    def _rebuild_history(self) -> None:
+        """Recompute pair counts, recent history and content hashes from what is stored"""
+        stored = self.vector_store.get(include=["documents", "metadatas"])
+        docs = sorted(
+            (Document(id=document_id, page_content=text, metadata=metadata)
+             for document_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"])),
+            key=lambda doc: (doc.metadata.get("turn", 0), 0 if doc.metadata.get("summary") else 1),
+        )
+        with self._history_lock:
+            self._pair_counts.clear()
+            self._recent.clear()
+            self._content_hashes.clear()
+            # Versions only ever grow, so no cached retrieval of the old memory can match again
+            for pair in self._pair_versions:
+                self._pair_versions[pair] += 1
+            for doc in docs:
+                pair = doc.metadata.get("player_ids", "")
+                self._pair_counts[pair] = self._pair_counts.get(pair, 0) + 1
+                self._recent.setdefault(pair, deque(maxlen=self.recent_history_size)).append(doc)
+                self._pair_versions.setdefault(pair, 1)
+                if not doc.metadata.get("summary"):
+                    self._content_hashes.setdefault(pair, {})[CachedEmbeddings.text_key(doc.page_content)] = doc.id
+        self.retrieval_cache.clear()
+    
+    def pair_count(self, player_ids: str) -> int:
+        """Number of conversations recorded for a player pair (``"speakerId-listenerId"``)"""
+        with self._history_lock:
+            return self._pair_counts.get(player_ids, 0)
+    
+    def _recent_history(self, player_ids: str, k: int) -> Optional[list[Document]]:
+        """Return the pair's whole history, newest first, if it is at most ``k`` conversations"""
+        with self._history_lock:
+            count = self._pair_counts.get(player_ids, 0)
+            if count > min(k, self.recent_history_size):
+                return None
+            return list(reversed(self._recent.get(player_ids, ())))
+    
+    @staticmethod
+    def _to_document(conversation: Conversation, turn: int) -> Document:
+        """Build the stored document of a conversation"""
         doc = Document(
+            id=str(uuid.uuid4()),
             page_content=f"Question: {conversation.question.question}\nResponse: {conversation.response}",
             metadata={
                 "player_ids": f"{conversation.question.speaker.id}-{conversation.question.listener.id}",
@@ -21,31 +353,71 @@ class ConversationRepository:
                 "turn": turn
             }
         )
-        self.vector_store.add_documents([doc])
+        return doc
     
     def get_conversation_context(self, current_question: Question, number_docs_to_retrieve: int = 3) -> str:
         """Retrieve relevant conversation history"""
-        if self.vector_store._collection.count() == 0:
-            return "No previous conversations."
-        
+        return run_sync(self.aget_conversation_context(current_question, number_docs_to_retrieve))
+    
+    async def aget_conversation_context(self, current_question: Question, number_docs_to_retrieve: int = 3) -> str:
+        """Retrieve relevant conversation history using the vector store's async API"""
         player_filter = f"{current_question.speaker.id}-{current_question.listener.id}"
-        results = self.vector_store.similarity_search(
-            f"Conversation between {current_question.speaker.name} and {current_question.listener.name}: {current_question.question}",
-            k=number_docs_to_retrieve,
-            filter={"player_ids": player_filter}
-        )
+        with self._history_lock:
+            if not self._pair_counts:
+                return "No previous conversations."
         
+        results = self._recent_history(player_filter, number_docs_to_retrieve)
+        if results is not None:
+            self.short_circuits += 1
+            return self._format_context(results)
+        
+        with self._history_lock:
+            version = self._pair_versions.get(player_filter, 0)
+        cache_key = RetrievalCache.key(player_filter, current_question.question, number_docs_to_retrieve, version)
+        context = self.retrieval_cache.get(cache_key)
+        if context is not None:
+            return context
+        
+        # Queued conversations are the most recent ones: newest first, then the stored matches
+        queued = self.write_queue.pending()
+        results = [doc for doc in reversed(queued) if doc.metadata["player_ids"] == player_filter]
+        if len(results) < number_docs_to_retrieve:
+            stored = await self.vector_store.asimilarity_search(
+                f"Conversation between {current_question.speaker.name} and {current_question.listener.name}: {current_question.question}",
+                k=number_docs_to_retrieve,
+                filter={"player_ids": player_filter}
+            )
+            seen = {(doc.page_content, doc.metadata.get("turn")) for doc in results}
+            results += [doc for doc in stored if (doc.page_content, doc.metadata.get("turn")) not in seen]
+        context = self._format_context(results[:number_docs_to_retrieve])
+        self.retrieval_cache.put(cache_key, context)
+        return context
+    
+    @staticmethod
+    def _format_context(results: list[Document]) -> str:
+        """Render retrieved conversations for the prompt"""
         if not results:
             return "No previous conversations with this person."
         
         context = "Previous conversations with this person:\n"
         for i, doc in enumerate(results):
-            context += f"{i+1}. {doc.page_content}\n"
+            repeats = doc.metadata.get("repeats", 0)
+            context += f"{i+1}. {doc.page_content}" + (f" (asked {repeats + 1} times)" if repeats else "") + "\n"
         
         return context
     
     def clear_database(self) -> None:
-        """Clear the entire conversation database"""
+        """Clear this session's conversation memory, including queued conversations
+
+        The vector store only holds this session's namespace, so dropping it
+        costs time proportional to this game's conversations alone.
+        """
+        self.write_queue.clear()
+        with self._history_lock:
+            self._pair_counts.clear()
+            self._recent.clear()
+            self._content_hashes.clear()
+        self.retrieval_cache.clear()
         try:
             self.vector_store.delete_collection()
             print("Conversation database cleared.")
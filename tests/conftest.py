@@ -1,13 +1,29 @@
 import pytest
 import sys
+import zlib
 from pathlib import Path
 
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from entities.Player import Player
 from entities.Item import Item
 from entities.Question import Question
+from config.ModelConfig import ModelConfig
+from Services.MemoryService import MemoryService
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic embeddings: equal texts get equal vectors, other texts unrelated ones"""
+    
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+    
+    def embed_query(self, text):
+        return np.random.default_rng(zlib.crc32(text.encode("utf-8"))).standard_normal(16).tolist()
 
 
 @pytest.fixture
@@ -40,3 +56,17 @@ def sample_weapon():
 def sample_question(sample_player, sample_murderer):
     """Create a sample question for testing"""
     return Question(speaker=sample_player, listener=sample_murderer, question="Where were you?")
+
+
+@pytest.fixture
+def fake_models(monkeypatch, tmp_path):
+    """Run the game on the fake generation backend and in-memory hash embeddings"""
+    monkeypatch.setattr(ModelConfig, "GENERATION_BACKEND", "fake")
+    monkeypatch.setattr(ModelConfig, "FAKE_BACKEND_LATENCY", 0.0)
+    monkeypatch.setattr(ModelConfig, "FAKE_BACKEND_TOKEN_LATENCY", 0.0)
+    monkeypatch.setattr(ModelConfig, "INFERENCE_WORKER", False)
+    monkeypatch.setattr(ModelConfig, "VECTOR_STORE", "numpy")
+    monkeypatch.setattr(ModelConfig, "EMBEDDING_CACHE_PATH", "")
+    monkeypatch.setattr(ModelConfig, "RESPONSE_CACHE_PATH", str(tmp_path / "response_cache.json"))
+    monkeypatch.setattr(ModelConfig, "MEMORY_SNAPSHOT_ON_EXIT", False)
+    monkeypatch.setattr(MemoryService, "load_embeddings", staticmethod(HashEmbeddings))
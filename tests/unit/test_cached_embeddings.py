@@ -0,0 +1,148 @@
+import os
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from Services.CachedEmbeddings import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic embeddings that record every text they encode"""
+    
+    def __init__(self):
+        self.encoded = []
+    
+    def embed_documents(self, texts):
+        self.encoded.extend(texts)
+        return [[float(len(text)), float(text.count("e")), 1.0] for text in texts]
+    
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+@pytest.mark.unit
+class TestCachedEmbeddings:
+    """Unit tests for CachedEmbeddings"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.inner = CountingEmbeddings()
+    
+    def test_repeated_query_is_encoded_once(self):
+        """Test that an identical text is served from memory"""
+        cache = CachedEmbeddings(self.inner)
+        
+        first = cache.embed_query("Where were you?")
+        second = cache.embed_query("Where  were you? ")
+        
+        assert first == second
+        assert self.inner.encoded == ["Where were you?"]
+        assert (cache.hits, cache.misses) == (1, 1)
+    
+    def test_documents_batch_only_encodes_misses(self):
+        """Test that a batch encodes each new text once, in one call"""
+        cache = CachedEmbeddings(self.inner)
+        cache.embed_query("known")
+        
+        vectors = cache.embed_documents(["known", "new", "new"])
+        
+        assert self.inner.encoded == ["known", "new"]
+        assert vectors[1] == vectors[2]
+        assert cache.misses == 2
+    
+    def test_lru_evicts_oldest(self):
+        """Test that the in-memory cache is bounded"""
+        cache = CachedEmbeddings(self.inner, max_entries=1)
+        cache.embed_query("first")
+        cache.embed_query("second")
+        cache.embed_query("first")
+        
+        assert self.inner.encoded == ["first", "second", "first"]
+        assert len(cache) == 1
+    
+    def test_disk_store_survives_restart(self, tmp_path):
+        """Test that saved vectors are read back from the on-disk store"""
+        cache = CachedEmbeddings(self.inner, path=str(tmp_path))
+        vector = cache.embed_query("Where were you?")
+        cache.save()
+        
+        reloaded = CachedEmbeddings(CountingEmbeddings(), path=str(tmp_path))
+        
+        assert reloaded.embed_query("Where were you?") == vector
+        assert reloaded.disk_hits == 1
+        assert reloaded.misses == 0
+    
+    def test_concurrent_caches_never_mix_up_vectors(self, tmp_path):
+        """Test that two caches sharing a directory each keep their own rows"""
+        first = CachedEmbeddings(self.inner, path=str(tmp_path))
+        second = CachedEmbeddings(CountingEmbeddings(), path=str(tmp_path))
+        first_vector = first.embed_query("Where were you?")
+        second_vector = second.embed_query("Who did you see there?")
+        first.save()
+        second.save()
+        
+        reloaded = CachedEmbeddings(CountingEmbeddings(), path=str(tmp_path))
+        
+        assert reloaded.embed_query("Where were you?") == first_vector
+        assert reloaded.embed_query("Who did you see there?") == second_vector
+        assert reloaded.misses == 0
+    
+    def test_unfinished_rows_are_ignored(self, tmp_path):
+        """Test that a hash whose vector was not fully written is not served"""
+        cache = CachedEmbeddings(self.inner, path=str(tmp_path))
+        cache.embed_query("Where were you?")
+        cache.save()
+        vectors_path = next(str(tmp_path / name) for name in os.listdir(tmp_path) if name.endswith(".f32"))
+        with open(vectors_path, "r+b") as vectors_file:
+            vectors_file.truncate(os.path.getsize(vectors_path) - 1)
+        
+        reloaded = CachedEmbeddings(CountingEmbeddings(), path=str(tmp_path))
+        reloaded.embed_query("Where were you?")
+        
+        assert reloaded.misses == 1
+    
+    def test_stale_segments_are_folded(self, tmp_path, monkeypatch):
+        """Test that old segments are merged into the new cache's own segment"""
+        monkeypatch.setattr(CachedEmbeddings, "MAX_SEGMENTS", 1)
+        monkeypatch.setattr(CachedEmbeddings, "STALE_SEGMENT_SECONDS", -1.0)
+        vectors = {}
+        for text in ("first", "second", "third"):
+            cache = CachedEmbeddings(CountingEmbeddings(), path=str(tmp_path))
+            vectors[text] = cache.embed_query(text)
+            cache.save()
+            cache._keys_file.close()
+            cache._vectors_file.close()
+        
+        folded = CachedEmbeddings(CountingEmbeddings(), path=str(tmp_path))
+        
+        assert len([name for name in os.listdir(tmp_path) if name.endswith(".keys")]) == 1
+        assert all(folded.embed_query(text) == vector for text, vector in vectors.items())
+        assert folded.misses == 0
+    
+    def test_segment_folded_by_another_process_is_skipped(self, tmp_path, monkeypatch):
+        """Test that a segment vanishing while it is folded only costs its rows"""
+        for text in ("first", "second", "third"):
+            cache = CachedEmbeddings(CountingEmbeddings(), path=str(tmp_path))
+            cache.embed_query(text)
+            cache.save()
+            cache._keys_file.close()
+            cache._vectors_file.close()
+        
+        monkeypatch.setattr(CachedEmbeddings, "MAX_SEGMENTS", 1)
+        monkeypatch.setattr(CachedEmbeddings, "STALE_SEGMENT_SECONDS", -1.0)
+        fromfile = np.fromfile
+        raced = []
+        
+        def fold_race(file, *args, **kwargs):
+            if not raced:
+                raced.append(file)
+                os.remove(file)
+            return fromfile(file, *args, **kwargs)
+        
+        monkeypatch.setattr(np, "fromfile", fold_race)
+        folded = CachedEmbeddings(CountingEmbeddings(), path=str(tmp_path))
+        for text in ("first", "second", "third"):
+            folded.embed_query(text)
+        
+        assert folded.misses == 1
@@ -0,0 +1,220 @@
+import asyncio
+import zlib
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from entities.Conversation import Conversation
+from entities.Question import Question
+from repositories.ConversationRepository import ConversationRepository
+from Services.ErrorHandler import ErrorHandler
+from Services.NumpyVectorStore import NumpyVectorStore
+from Services.RetrievalCache import RetrievalCache
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic embeddings that count the texts they embed
+    
+    Texts equal up to case and punctuation get the same vector; any other
+    texts get unrelated ones.
+    """
+    
+    def __init__(self):
+        self.queries = 0
+        self.documents = 0
+    
+    def embed_documents(self, texts):
+        self.documents += len(texts)
+        return [self.vector(text) for text in texts]
+    
+    def embed_query(self, text):
+        self.queries += 1
+        return self.vector(text)
+    
+    @staticmethod
+    def vector(text):
+        seed = zlib.crc32(RetrievalCache.normalize(text).encode("utf-8"))
+        return np.random.default_rng(seed).standard_normal(16).tolist()
+
+
+class InMemoryMemoryService:
+    """Memory service stand-in holding a NumPy vector store"""
+    
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.vector_store = NumpyVectorStore(embeddings)
+        self.session_id = "test-session"
+
+
+@pytest.mark.unit
+class TestConversationRepository:
+    """Unit tests for ConversationRepository"""
+    
+    @pytest.fixture(autouse=True)
+    def repository(self, sample_question):
+        """Create a repository over an in-memory store"""
+        self.embeddings = CountingEmbeddings()
+        self.repository = ConversationRepository(InMemoryMemoryService(self.embeddings), ErrorHandler())
+        self.question = sample_question
+    
+    def ask(self, text, turn):
+        question = Question(self.question.speaker, self.question.listener, text)
+        self.repository.add_conversation(Conversation(question, f"Answer to {text}"), turn)
+    
+    def test_empty_history(self):
+        """Test the context of a game without conversations"""
+        assert self.repository.get_conversation_context(self.question) == "No previous conversations."
+    
+    def test_short_history_skips_the_embedding_model(self):
+        """Test that a pair with no more than k conversations is answered from memory"""
+        self.ask("Where were you?", 1)
+        self.ask("Who did you see?", 2)
+        
+        context = self.repository.get_conversation_context(self.question, number_docs_to_retrieve=3)
+        
+        assert self.embeddings.queries == 0
+        assert self.repository.short_circuits == 1
+        assert context.index("Who did you see?") < context.index("Where were you?")
+    
+    def test_long_history_uses_the_index(self):
+        """Test that retrieval falls back to the vector store past k conversations"""
+        for turn in range(4):
+            self.ask(f"Question {turn}", turn)
+        self.repository.flush()
+        
+        context = self.repository.get_conversation_context(self.question, number_docs_to_retrieve=3)
+        
+        assert self.embeddings.queries == 1
+        assert self.repository.pair_count(f"{self.question.speaker.id}-{self.question.listener.id}") == 4
+        assert context.count("Question:") == 3
+    
+    def test_other_pairs_are_not_returned(self):
+        """Test that another pair's history stays out of the context"""
+        self.ask("Where were you?", 1)
+        other = Question(self.question.listener, self.question.speaker, "And you?")
+        
+        assert self.repository.get_conversation_context(other) == "No previous conversations with this person."
+    
+    def test_clear_database_forgets_history(self):
+        """Test that clearing the database also clears the in-memory history"""
+        self.ask("Where were you?", 1)
+        self.repository.clear_database()
+        
+        assert self.repository.get_conversation_context(self.question) == "No previous conversations."
+    
+    def test_compaction_folds_old_turns_into_a_summary(self):
+        """Test that old conversations become one summary covering their turns"""
+        self.repository.compaction_threshold = 0
+        self.repository.compaction_keep_recent = 2
+        for turn in range(1, 6):
+            self.ask(f"Were you in the garden on turn {turn}?", turn)
+        
+        summary = self.repository.compact(f"{self.question.speaker.id}-{self.question.listener.id}")
+        
+        assert summary.metadata["turn_start"] == 1
+        assert summary.metadata["turn_end"] == 3
+        assert summary.page_content.startswith("Summary of turns 1-3:")
+        pair = f"{self.question.speaker.id}-{self.question.listener.id}"
+        assert self.repository.pair_count(pair) == 3
+        assert self.repository.vector_store.count() == 3
+        context = self.repository.get_conversation_context(self.question, number_docs_to_retrieve=3)
+        assert self.embeddings.queries == 0
+        assert "Summary of turns 1-3" in context
+    
+    def test_snapshot_restores_without_re_embedding(self, tmp_path):
+        """Test that a saved session loads into a new repository without embedding anything"""
+        for turn in range(1, 5):
+            self.ask(f"Question {turn}", turn)
+        assert self.repository.save_snapshot(str(tmp_path / "save")) == 4
+        
+        embeddings = CountingEmbeddings()
+        restored = ConversationRepository(InMemoryMemoryService(embeddings), ErrorHandler())
+        
+        assert restored.load_snapshot(str(tmp_path / "save")) == 4
+        assert embeddings.documents == 0
+        pair = f"{self.question.speaker.id}-{self.question.listener.id}"
+        assert restored.pair_count(pair) == 4
+        assert restored.vector_store.count() == 4
+        assert restored.get_conversation_context(self.question).count("Question:") == 3
+    
+    def test_sync_context_works_inside_a_running_event_loop(self):
+        """Test that the synchronous wrapper can be called from async code"""
+        self.ask("Question 1", 1)
+        
+        async def fetch():
+            return self.repository.get_conversation_context(self.question)
+        
+        assert "Question 1" in asyncio.run(fetch())
+    
+    def test_loading_a_snapshot_twice_restores_it_once(self, tmp_path):
+        """Test that a second load replaces the first instead of duplicating it"""
+        for turn in range(1, 3):
+            self.ask(f"Question {turn}", turn)
+        self.repository.save_snapshot(str(tmp_path / "save"))
+        self.ask("Question 3", 3)
+        
+        self.repository.load_snapshot(str(tmp_path / "save"))
+        self.repository.load_snapshot(str(tmp_path / "save"))
+        
+        pair = f"{self.question.speaker.id}-{self.question.listener.id}"
+        assert self.repository.pair_count(pair) == 2
+        assert self.repository.vector_store.count() == 2
+        context = self.repository.get_conversation_context(self.question)
+        assert context.count("Question:") == 2
+        assert "Question 3" not in context
+    
+    def test_repeated_question_is_served_from_the_retrieval_cache(self):
+        """Test that retrieval is reused until the pair is written to again"""
+        for turn in range(4):
+            self.ask(f"Question {turn}", turn)
+        self.repository.flush()
+        
+        first = self.repository.get_conversation_context(self.question)
+        again = Question(self.question.speaker, self.question.listener, "where were you")
+        assert self.repository.get_conversation_context(again) == first
+        assert self.embeddings.queries == 1
+        
+        self.ask("Question 4", 4)
+        self.repository.flush()
+        self.repository.get_conversation_context(self.question)
+        assert self.embeddings.queries == 2
+        assert self.repository.retrieval_cache.hits == 1
+    
+    def test_exact_repeat_bumps_the_stored_conversation(self):
+        """Test that asking the same question again is counted, not stored twice"""
+        self.ask("Where were you?", 1)
+        self.repository.flush()
+        self.ask("Where were you?", 4)
+        self.repository.flush()
+        
+        pair = f"{self.question.speaker.id}-{self.question.listener.id}"
+        stored = self.repository.vector_store.get(where={"player_ids": pair})
+        assert self.repository.vector_store.count() == 1
+        assert stored["metadatas"][0]["repeats"] == 1
+        assert stored["metadatas"][0]["turn"] == 4
+        assert stored["metadatas"][0]["first_turn"] == 1
+        assert self.repository.pair_count(pair) == 1
+        assert "(asked 2 times)" in self.repository.get_conversation_context(self.question)
+    
+    def test_near_repeat_in_one_batch_is_folded(self):
+        """Test that conversations differing only in case and punctuation are stored once"""
+        self.ask("Where were you?", 1)
+        self.ask("where were you", 2)
+        self.ask("Who did you see?", 3)
+        self.repository.flush()
+        
+        pair = f"{self.question.speaker.id}-{self.question.listener.id}"
+        assert self.repository.vector_store.count() == 2
+        assert self.repository.duplicates == 1
+        assert self.repository.pair_count(pair) == 2
+    
+    def test_repeats_of_other_pairs_are_kept(self):
+        """Test that the same conversation with another person is stored separately"""
+        self.ask("Where were you?", 1)
+        other = Question(self.question.listener, self.question.speaker, "Where were you?")
+        self.repository.add_conversation(Conversation(other, "Answer to Where were you?"), 2)
+        self.repository.flush()
+        
+        assert self.repository.vector_store.count() == 2
+        assert self.repository.duplicates == 0
@@ -0,0 +1,56 @@
+import pytest
+from Services.CPUProfile import CPUProfile
+
+
+@pytest.mark.unit
+class TestCPUProfile:
+    """Unit tests for CPUProfile selection"""
+    
+    def test_auto_prefers_bf16_with_native_support(self):
+        """Test that CPUs with bf16 matmul get the bf16 profile"""
+        profile = CPUProfile.select("auto", cpu_flags={"avx2", "avx512_vnni", "avx512_bf16"})
+        
+        assert profile.name == "bf16"
+        assert profile.dtype_name == "bfloat16"
+        assert profile.quantize is False
+    
+    def test_auto_uses_int8_with_vnni(self):
+        """Test that CPUs with VNNI but no bf16 get the int8 profile"""
+        profile = CPUProfile.select("auto", cpu_flags={"avx2", "avx_vnni"})
+        
+        assert profile.name == "int8"
+        assert profile.dtype_name == "float32"
+        assert profile.quantize is True
+    
+    def test_auto_falls_back_to_fp32(self):
+        """Test that CPUs without bf16 or VNNI get fp32"""
+        assert CPUProfile.select("auto", cpu_flags={"sse4_2", "avx2"}).name == "fp32"
+        assert CPUProfile.select("auto", cpu_flags=set()).name == "fp32"
+    
+    def test_explicit_profile_overrides_detection(self):
+        """Test that a requested profile is used as-is"""
+        assert CPUProfile.select("INT8", cpu_flags={"avx512_bf16"}).name == "int8"
+    
+    def test_unknown_profile_raises(self):
+        """Test that an unknown profile name is rejected by the constructor"""
+        with pytest.raises(ValueError):
+            CPUProfile("fp8")
+    
+    def test_unknown_profile_falls_back_to_auto(self, caplog):
+        """Test that selecting an unknown profile warns and detects one instead"""
+        with caplog.at_level("WARNING"):
+            profile = CPUProfile.select("fp8", cpu_flags={"avx_vnni"})
+        
+        assert profile.name == "int8"
+        assert "fp8" in caplog.text
+    
+    def test_detect_cpu_flags_reads_cpuinfo(self, tmp_path):
+        """Test that flags are parsed from a cpuinfo file"""
+        cpuinfo = tmp_path / "cpuinfo"
+        cpuinfo.write_text("processor\t: 0\nflags\t\t: fpu sse avx2 avx512_vnni\n")
+        
+        assert CPUProfile.detect_cpu_flags(str(cpuinfo)) == {"fpu", "sse", "avx2", "avx512_vnni"}
+    
+    def test_detect_cpu_flags_missing_file(self, tmp_path):
+        """Test that a missing cpuinfo file yields no flags"""
+        assert CPUProfile.detect_cpu_flags(str(tmp_path / "missing")) == set()
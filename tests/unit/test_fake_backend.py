@@ -0,0 +1,68 @@
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from Services.FakeBackend import FakeBackend
+from Services.GenerationBackend import GenerationBackend
+from Services.StopPolicy import StopPolicy
+
+
+@pytest.mark.unit
+class TestFakeBackend:
+    """Unit tests for the deterministic FakeBackend"""
+    
+    def test_implements_generation_backend(self):
+        """Test that the fake satisfies the backend protocol"""
+        assert isinstance(FakeBackend(), GenerationBackend)
+    
+    def test_same_prompt_gets_same_reply(self):
+        """Test that replies are deterministic per prompt"""
+        backend = FakeBackend()
+        prompt = [SystemMessage(content="You are James."), HumanMessage(content="Where were you?")]
+        
+        assert backend.generate(prompt) == backend.generate(prompt)
+    
+    def test_configured_responses_are_used(self):
+        """Test that the reply comes from the configured list"""
+        backend = FakeBackend(responses=["I was in the kitchen."])
+        
+        assert backend.generate([HumanMessage(content="Where were you?")]) == "I was in the kitchen."
+    
+    def test_stream_yields_reply_word_by_word(self):
+        """Test that streaming reassembles into the full reply"""
+        backend = FakeBackend(responses=["I saw nothing at all."])
+        
+        chunks = list(backend.stream([HumanMessage(content="What did you see?")]))
+        
+        assert len(chunks) == 5
+        assert "".join(chunks) == "I saw nothing at all."
+    
+    def test_batch_generate_pays_latency_once(self):
+        """Test that a batch costs one latency, not one per prompt"""
+        backend = FakeBackend(latency=0.05)
+        prompts = [[HumanMessage(content=f"Question {i}")] for i in range(4)]
+        
+        start = time.perf_counter()
+        replies = backend.batch_generate(prompts)
+        elapsed = time.perf_counter() - start
+        
+        assert len(replies) == 4
+        assert elapsed < 0.15
+    
+    def test_max_new_tokens_truncates_reply(self):
+        """Test that max_new_tokens limits the reply length"""
+        backend = FakeBackend(responses=["one two three four five"])
+        
+        assert backend.generate([HumanMessage(content="Hi")], max_new_tokens=2) == "one two"
+    
+    def test_count_tokens(self):
+        """Test whitespace token counting"""
+        assert FakeBackend().count_tokens("I was in the library") == 5
+    
+    def test_stop_policy_ends_reply_early(self):
+        """Test that decoding stops at the policy's stopping point"""
+        backend = FakeBackend(responses=["I was out. I saw nothing. Human: Really?"])
+        policy = StopPolicy(max_sentences=1)
+        
+        assert backend.generate([HumanMessage(content="Where were you?")], stop_policy=policy) == "I was out. I"
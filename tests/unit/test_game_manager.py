@@ -0,0 +1,232 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from entities.Location import Location
+from entities.Player import Player
+from entities.Question import Question
+from entities.Room import Room
+from game_logic import INVENTORY_QUESTION, SUGGESTED_QUESTION
+from managers.GameManager import GameManager
+from Services.FakeBackend import FakeBackend
+from Services.ResponseService import ResponseService
+from ui.GameActionHandler import GameActionHandler
+
+
+class RecordingBackend(FakeBackend):
+    """Fake backend recording how many prompts each batch held"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+    
+    def batch_generate(self, prompts, **generate_kwargs):
+        self.batches.append(len(prompts))
+        return super().batch_generate(prompts, **generate_kwargs)
+
+
+def fallback_lines():
+    """Every rule-based fallback reply"""
+    service = ResponseService(None)
+    innocent, murderer = Player(id=90, name="A", suspicion=0), Player(id=91, name="B", suspicion=0)
+    murderer.murderer = True
+    lines = set()
+    for listener in (innocent, murderer):
+        for _ in range(200):
+            lines.add(service.generate_fallback_response(Question(innocent, listener, "Where were you?")))
+    return lines
+
+
+def new_game():
+    """Start a game with three NPCs in the entrance, the rest in the library and an empty cellar"""
+    library = Room("Library", "Shelves of old books", 10)
+    cellar = Room("Cellar", "Damp and dark", 10, "service")
+    game_manager = GameManager(
+        Location("Manor", "An old manor", 6, "", [library, cellar]),
+        Player(id=0, name="Detective", suspicion=0, job="Detective"),
+    )
+    npcs = [player for player in game_manager.player_manager.get_players() if player is not game_manager.user_player]
+    for index, npc in enumerate(npcs):
+        game_manager.player_manager.move_player_to_room(
+            npc, game_manager.location.starting_room if index < 3 else library
+        )
+    assert game_manager.rag_manager.llm_service.wait_until_ready(timeout=5)
+    return game_manager, cellar
+
+
+@pytest.mark.unit
+class TestRoomInterrogation:
+    """Tests of putting one question to every NPC in the room"""
+    
+    @pytest.fixture(autouse=True)
+    def game(self, fake_models):
+        """Start a game on the fake backend"""
+        self.game_manager, self.cellar = new_game()
+        self.rag_manager = self.game_manager.rag_manager
+        self.backend = RecordingBackend()
+        self.rag_manager.llm_service.model = self.backend
+        self.question_text = "Where were you last night?"
+        self.reply = self.backend.generate([HumanMessage(content=self.question_text)])
+        self.backend.calls = 0
+        yield
+        self.game_manager.cleanup()
+    
+    def cache_reply(self, player, response):
+        """Store a cached reply of ``player`` to the interrogation question"""
+        question = Question(self.game_manager.user_player, player, self.question_text)
+        room = self.game_manager.get_current_room()
+        template_type = self.rag_manager.prompt_service.select_template_type(question)
+        key = self.rag_manager._response_cache_key(question, self.game_manager.location, room, template_type)
+        self.rag_manager._store_cached_response(key, question, response)
+    
+    def test_empty_room_costs_no_turn(self):
+        """Test that interrogating nobody answers nothing and keeps the turn"""
+        self.game_manager.player_manager.move_player_to_room(self.game_manager.user_player, self.cellar)
+        turn = self.game_manager.game_state_manager.get_current_turn()
+        
+        assert self.game_manager.interrogate_room(self.question_text) == []
+        assert self.game_manager.game_state_manager.get_current_turn() == turn
+        assert self.backend.calls == 0
+    
+    def test_interrogation_costs_one_turn(self):
+        """Test that questioning the whole room advances the game by a single turn"""
+        turn = self.game_manager.game_state_manager.get_current_turn()
+        
+        results = self.game_manager.interrogate_room(self.question_text)
+        
+        assert len(results) == 3
+        assert self.game_manager.game_state_manager.get_current_turn() == turn + 1
+        assert self.backend.batches == [3]
+    
+    def test_cached_players_are_left_out_of_the_batch(self):
+        """Test that cached replies are served as-is and only the others are generated"""
+        players = self.game_manager.get_other_players_in_current_room()
+        self.cache_reply(players[0], "I was reading in the library until midnight.")
+        
+        results = self.game_manager.interrogate_room(self.question_text)
+        
+        responses = {player.id: response for player, response, _, _ in results}
+        assert responses[players[0].id] == "I was reading in the library until midnight."
+        assert responses[players[1].id] == responses[players[2].id] == self.reply
+        assert self.backend.batches == [2]
+    
+    def test_context_timeout_falls_back_for_uncached_players(self):
+        """Test that retrieval missing the deadline serves fallbacks but keeps cached replies"""
+        players = self.game_manager.get_other_players_in_current_room()
+        self.cache_reply(players[0], "I was reading in the library until midnight.")
+        
+        async def slow_context(question, number_docs_to_retrieve=3):
+            await asyncio.sleep(1.0)
+            return ""
+        
+        self.rag_manager.aget_conversation_context = slow_context
+        self.rag_manager.response_deadline = 0.2
+        
+        results = self.game_manager.interrogate_room(self.question_text)
+        
+        responses = {player.id: response for player, response, _, _ in results}
+        assert responses[players[0].id] == "I was reading in the library until midnight."
+        assert {responses[players[1].id], responses[players[2].id]} <= fallback_lines()
+        assert self.rag_manager.deadline_misses == 1
+        assert self.backend.batches == []
+    
+    def test_each_player_gets_its_own_outcome(self):
+        """Test that every result is stored and applied to its own player's suspicion"""
+        players = self.game_manager.get_other_players_in_current_room()
+        players[0].suspicion = 5
+        self.cache_reply(players[0], "That's none of your business, I was in my room!")
+        before = {player.id: player.suspicion for player in players}
+        
+        results = self.game_manager.interrogate_room(self.question_text)
+        
+        user = self.game_manager.user_player
+        repository = self.rag_manager.conversation_repository
+        assert [player for player, _, _, _ in results] == players
+        for player, _, _, suspicion_change_listener in results:
+            assert player.suspicion == before[player.id] + suspicion_change_listener
+            assert repository.pair_count(f"{user.id}-{player.id}") == 1
+
+
+@pytest.mark.unit
+class TestConcurrentGames:
+    """Tests of several games sharing one event loop"""
+    
+    @pytest.fixture(autouse=True)
+    def games(self, fake_models):
+        """Start three games, each answering with its own line"""
+        self.games = [new_game()[0] for _ in range(3)]
+        for index, game_manager in enumerate(self.games):
+            game_manager.rag_manager.llm_service.model = FakeBackend(
+                responses=[f"Game {index} here, I was in the garden."], latency=0.05
+            )
+        yield
+        for game_manager in self.games:
+            game_manager.cleanup()
+    
+    def test_concurrent_conversations_keep_memories_and_turns_apart(self):
+        """Test that gathered conversations of different games never mix memories or turns"""
+        turns = [game_manager.game_state_manager.get_current_turn() for game_manager in self.games]
+        listeners = [game_manager.get_other_players_in_current_room()[0] for game_manager in self.games]
+        
+        async def play(rounds):
+            for round_index in range(rounds):
+                await asyncio.gather(*(
+                    game_manager.astrike_conversation(Question(
+                        game_manager.user_player, listener, f"Game {index}, round {round_index}: where were you?"
+                    ))
+                    for index, (game_manager, listener) in enumerate(zip(self.games, listeners))
+                ))
+        
+        asyncio.run(play(3))
+        
+        assert len({game_manager.session_id for game_manager in self.games}) == 3
+        for index, game_manager in enumerate(self.games):
+            assert game_manager.game_state_manager.get_current_turn() == turns[index] + 3
+            repository = game_manager.rag_manager.conversation_repository
+            repository.flush()
+            documents = repository.vector_store.get(include=["documents"])["documents"]
+            assert len(documents) == 3
+            assert all(f"Game {index}" in document and document.count("Game") == 2 for document in documents)
+
+
+@pytest.mark.unit
+class TestLikelyQuestions:
+    """Tests of predicting the user's next question from their history"""
+    
+    @pytest.fixture(autouse=True)
+    def game(self, fake_models):
+        """Start a game on the fake backend"""
+        self.game_manager, _ = new_game()
+        self.handler = GameActionHandler(self.game_manager, self.game_manager.user_player)
+        self.listener = self.game_manager.get_other_players_in_current_room()[0]
+        self.prefetched = []
+        self.game_manager.prefetch_answers = lambda players, question_texts: self.prefetched.append(question_texts)
+        yield
+        self.game_manager.cleanup()
+    
+    def ask(self, question_text):
+        """Put ``question_text`` to the first NPC in the room"""
+        self.game_manager.strike_conversation(Question(self.game_manager.user_player, self.listener, question_text))
+    
+    def test_generic_question_before_any_was_asked(self):
+        """Test that the generic question is prepared while the history is empty"""
+        self.handler.prefetch_answers([self.listener], include_inventory=False)
+        
+        assert self.prefetched == [[SUGGESTED_QUESTION]]
+    
+    def test_most_recent_question_is_prepared(self):
+        """Test that the user's latest question, not the inventory query, is prepared again"""
+        self.ask("Who saw the butler?")
+        self.ask("Why is the cellar locked?")
+        self.ask(INVENTORY_QUESTION)
+        
+        self.handler.prefetch_answers([self.listener])
+        
+        assert self.prefetched == [[INVENTORY_QUESTION, "Why is the cellar locked?"]]
+    
+    def test_room_interrogation_counts_as_asked(self):
+        """Test that a question put to the whole room is remembered once"""
+        self.game_manager.interrogate_room("Who saw the butler?")
+        
+        assert self.game_manager.likely_questions(2) == ["Who saw the butler?"]
@@ -0,0 +1,100 @@
+import multiprocessing
+import threading
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from Services.FakeBackend import FakeBackend
+from Services.InferenceWorker import (
+    InferenceWorker, WorkerLLMService, WorkerUnavailableError, receive_message, send_message
+)
+
+
+@pytest.mark.unit
+class TestWorkerMessages:
+    """Unit tests for the worker pipe protocol"""
+    
+    def test_small_message_round_trip(self):
+        """Test that small messages go straight through the pipe"""
+        sender, receiver = multiprocessing.Pipe()
+        
+        send_message(sender, ("ok", 1, "I was in the library."))
+        
+        assert receive_message(receiver) == ("ok", 1, "I was in the library.")
+    
+    def test_large_message_uses_shared_memory(self):
+        """Test that large payloads are passed through shared memory"""
+        sender, receiver = multiprocessing.Pipe()
+        embeddings = [[0.5] * 384 for _ in range(64)]
+        
+        send_message(sender, ("ok", 2, embeddings), shared_memory_threshold=1024)
+        
+        assert receive_message(receiver) == ("ok", 2, embeddings)
+
+
+@pytest.mark.unit
+@pytest.mark.slow
+class TestInferenceWorker:
+    """Tests running a fake backend in a real worker process"""
+    
+    def setup_method(self):
+        """Start a worker hosting the fake backend"""
+        self.worker = InferenceWorker(backend="fake", host_embeddings=False, restart_delay=0.0)
+        self.llm_service = WorkerLLMService(self.worker)
+        assert self.llm_service.wait_until_ready(timeout=60)
+    
+    def teardown_method(self):
+        """Stop the worker"""
+        self.worker.close()
+    
+    def test_generates_in_worker(self):
+        """Test that replies come from the backend inside the worker"""
+        prompt = [HumanMessage(content="Where were you?")]
+        
+        assert self.llm_service.generate(prompt) == FakeBackend().generate(prompt)
+        assert "".join(self.llm_service.stream(prompt)) == FakeBackend().generate(prompt)
+    
+    def test_closed_service_reports_closed(self):
+        """Test that a closed service stops serving and says so instead of following the worker"""
+        self.llm_service.close()
+        
+        assert self.llm_service.model is None
+        assert self.llm_service.state == WorkerLLMService.STATE_CLOSED
+        assert not self.llm_service.wait_until_ready(timeout=5)
+    
+    def test_crash_is_detected_and_worker_restarts(self):
+        """Test that a dead worker makes calls fail fast and then comes back"""
+        prompt = [HumanMessage(content="Where were you?")]
+        self.worker._process.kill()
+        
+        with pytest.raises(WorkerUnavailableError):
+            self.llm_service.count_tokens("Where were you?")
+        assert self.worker.crashes == 1
+        
+        assert self.llm_service.wait_until_ready(timeout=60)
+        assert self.worker.restarts == 1
+        assert self.llm_service.generate(prompt) == FakeBackend().generate(prompt)
+    
+    def test_embeddings_do_not_wait_for_generation(self, monkeypatch):
+        """Test that embedding and token count requests are answered while a generation is running"""
+        monkeypatch.setenv("FAKE_BACKEND_LATENCY", "3")
+        worker = InferenceWorker(backend="fake", host_embeddings=False, restart_delay=0.0)
+        try:
+            assert WorkerLLMService(worker).wait_until_ready(timeout=60)
+            generation = threading.Thread(
+                target=worker.call, args=("generate", [HumanMessage(content="Where were you?")])
+            )
+            generation.start()
+            time.sleep(0.5)
+            
+            started = time.monotonic()
+            with pytest.raises(RuntimeError, match="not hosted"):
+                worker.call("embed_query", "Where were you?")
+            assert worker.call("count_tokens", "Where were you?") == FakeBackend().count_tokens("Where were you?")
+            
+            assert time.monotonic() - started < 1.5
+            assert generation.is_alive()
+            generation.join()
+        finally:
+            worker.close()
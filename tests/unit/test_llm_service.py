@@ -0,0 +1,51 @@
+import pytest
+from langchain_core.messages import HumanMessage
+
+from Services.FakeBackend import FakeBackend
+from Services.LLMService import LLMService
+
+
+@pytest.mark.unit
+class TestLLMService:
+    """Unit tests for LLMService loading and readiness states"""
+    
+    def test_fake_backend_loads_synchronously(self):
+        """Test that a foreground load is ready when the constructor returns"""
+        service = LLMService(background=False, backend="fake")
+        
+        assert service.state == LLMService.STATE_READY
+        assert service.is_ready()
+        assert isinstance(service.model, FakeBackend)
+    
+    def test_background_load_reaches_ready(self):
+        """Test that a background load can be waited on"""
+        service = LLMService(backend="fake")
+        
+        assert service.wait_until_ready(timeout=5)
+        assert not service.is_loading()
+    
+    def test_generate_delegates_to_backend(self):
+        """Test that generation goes through the loaded backend"""
+        service = LLMService(background=False, backend="fake")
+        service.model = FakeBackend(responses=["Not me, I was asleep."])
+        
+        assert service.generate([HumanMessage(content="Did you do it?")]) == "Not me, I was asleep."
+    
+    def test_close_closes_the_backend(self):
+        """Test that closing the service drops the backend and its caches"""
+        service = LLMService(background=False, backend="fake")
+        backend = service.model
+        
+        service.close()
+        
+        assert backend.closed
+        assert not service.is_ready()
+        assert service.state == LLMService.STATE_CLOSED
+    
+    def test_generate_without_model_raises(self):
+        """Test that generating before a model is available fails clearly"""
+        service = LLMService(background=False, backend="fake")
+        service.model = None
+        
+        with pytest.raises(ValueError):
+            service.generate([HumanMessage(content="Hello?")])
@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+from langchain_core.documents import Document
+
+from Services.MemoryCompactor import MemoryCompactor
+from Services.SpeculationService import SpeculationService
+
+
+class StubLLMService:
+    """LLM service stand-in returning a fixed summary"""
+    
+    def __init__(self, ready=True, reply="They claim to have been in the garden.", error=None, on_token=None):
+        self.ready = ready
+        self.reply = reply
+        self.error = error
+        self.on_token = on_token
+        self.calls = []
+    
+    def is_ready(self):
+        return self.ready
+    
+    def generate(self, messages, stop_policy=None, **kwargs):
+        self.calls.append((messages, kwargs))
+        if self.error:
+            raise self.error
+        words = self.reply.split()
+        for index in range(1, len(words) + 1):
+            if self.on_token:
+                self.on_token()
+            if stop_policy is not None and stop_policy.should_stop(" ".join(words[:index])):
+                return " ".join(words[:index])
+        return self.reply
+
+
+def transcript(question, response):
+    return Document(page_content=f"Question: {question}\nResponse: {response}")
+
+
+@pytest.mark.unit
+class TestMemoryCompactor:
+    """Unit tests for MemoryCompactor"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.documents = [
+            transcript("Where were you?", "I was in the garden. It was cold."),
+            transcript("Who was with you?", "The butler was in the garden with me. We talked."),
+            transcript("What did you hear?", "A scream from the garden. Then nothing."),
+        ]
+    
+    def test_extractive_summary_keeps_salient_sentences_in_order(self):
+        """Test that sentences about recurring subjects are kept in transcript order"""
+        summary = MemoryCompactor(summary_sentences=2).summarize(self.documents)
+        
+        assert summary == "I was in the garden. The butler was in the garden with me."
+    
+    def test_llm_summary_when_model_is_ready(self):
+        """Test that a ready model writes the summary"""
+        llm_service = StubLLMService()
+        summary = MemoryCompactor(llm_service, max_new_tokens=40).summarize(self.documents)
+        
+        assert summary == "They claim to have been in the garden."
+        assert llm_service.calls[0][1] == {"max_new_tokens": 40}
+    
+    def test_extractive_fallback_without_model(self):
+        """Test that the extractive summary is used when no model is ready or it fails"""
+        for llm_service in (StubLLMService(ready=False), StubLLMService(error=RuntimeError("oom"))):
+            summary = MemoryCompactor(llm_service).summarize(self.documents)
+            assert "garden" in summary
+    
+    def test_jobs_wait_for_idle_and_are_deduplicated(self):
+        """Test that a job runs only once the foreground is idle, once per key"""
+        speculation_service = SpeculationService()
+        runs = []
+        compactor = MemoryCompactor(speculation_service=speculation_service)
+        with speculation_service.foreground():
+            compactor.submit("1-2", lambda: runs.append("first"))
+            compactor.submit("1-2", lambda: runs.append("second"))
+            
+            assert not compactor.wait_until_done(timeout=0.1)
+        assert compactor.wait_until_done(timeout=5)
+        assert runs == ["first"]
+    
+    def test_llm_summary_runs_on_the_speculation_worker(self):
+        """Test that the model summary is generated on the shared background thread"""
+        threads = []
+        llm_service = StubLLMService(on_token=lambda: threads.append(threading.current_thread().name))
+        compactor = MemoryCompactor(llm_service, speculation_service=SpeculationService())
+        
+        assert compactor.summarize(self.documents) == "They claim to have been in the garden."
+        assert set(threads) == {"SpeculationWorker"}
+    
+    def test_foreground_request_preempts_the_llm_summary(self):
+        """Test that a foreground request stops the model summary and the extractive one is used"""
+        speculation_service = SpeculationService()
+        foreground = speculation_service.foreground()
+        llm_service = StubLLMService(on_token=lambda: foreground.__enter__())
+        compactor = MemoryCompactor(llm_service, speculation_service=speculation_service)
+        
+        summary = compactor.summarize(self.documents)
+        foreground.__exit__(None, None, None)
+        
+        assert summary == compactor.extractive_summary(self.documents)
+        assert len(llm_service.calls) == 1
+    
+    def test_no_llm_summary_while_foreground_waits(self):
+        """Test that the extractive summary is used while a foreground request is waiting"""
+        speculation_service = SpeculationService()
+        llm_service = StubLLMService()
+        compactor = MemoryCompactor(llm_service, speculation_service=speculation_service)
+        
+        with speculation_service.foreground():
+            summary = compactor.summarize(self.documents)
+        
+        assert summary == compactor.extractive_summary(self.documents)
+        assert llm_service.calls == []
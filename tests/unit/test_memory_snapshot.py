@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pytest
+
+from Services.MemorySnapshot import MemorySnapshot
+
+
+@pytest.mark.unit
+class TestMemorySnapshot:
+    """Unit tests for MemorySnapshot"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        rng = np.random.default_rng(0)
+        self.vectors = rng.standard_normal((3, 8)).astype(np.float32)
+        self.snapshot = MemorySnapshot(
+            ["a", "b", "c"],
+            ["Question: one", "Question: two", "Summary of turns 1-2: three"],
+            [{"player_ids": "1-2", "turn": 1}, {"player_ids": "1-2", "turn": 2},
+             {"player_ids": "1-3", "turn": 2, "turn_start": 1, "summary": True}],
+            self.vectors,
+        )
+    
+    @pytest.mark.parametrize("dtype", ["float16", "float32"])
+    def test_round_trip(self, tmp_path, dtype):
+        """Test that ids, texts, metadata and vectors survive a save and load"""
+        path = str(tmp_path / "memories")
+        self.snapshot.save(path, dtype=dtype)
+        loaded = MemorySnapshot.load(path)
+        
+        assert loaded.ids == self.snapshot.ids
+        assert loaded.texts == self.snapshot.texts
+        assert loaded.metadatas == self.snapshot.metadatas
+        assert isinstance(loaded.vectors, np.memmap)
+        assert np.allclose(loaded.vectors, self.vectors, atol=1e-2 if dtype == "float16" else 0)
+    
+    def test_vector_file_is_raw_data(self, tmp_path):
+        """Test that the vector file holds nothing but the array bytes"""
+        path = str(tmp_path / "memories")
+        self.snapshot.save(path, dtype="float16")
+        
+        assert os.path.getsize(os.path.join(path, "vectors.f16")) == 3 * 8 * 2
+    
+    def test_save_replaces_previous_snapshot(self, tmp_path):
+        """Test that saving again leaves only the new snapshot"""
+        path = str(tmp_path / "memories")
+        self.snapshot.save(path, dtype="float32")
+        MemorySnapshot(["a"], ["Question: one"], [{"turn": 1}], self.vectors[:1]).save(path)
+        
+        assert len(MemorySnapshot.load(path)) == 1
+        assert sorted(os.listdir(tmp_path)) == ["memories"]
+        assert sorted(os.listdir(path)) == ["metadata.json", "vectors.f16"]
+    
+    def test_save_recovers_from_interrupted_save(self, tmp_path):
+        """Test that leftovers of a crashed save neither block the swap nor leak into the snapshot"""
+        path = str(tmp_path / "memories")
+        self.snapshot.save(path, dtype="float32")
+        for leftover in ("memories.old", "memories.tmp"):
+            os.makedirs(tmp_path / leftover)
+            (tmp_path / leftover / "vectors.f32").write_bytes(b"stale")
+        
+        self.snapshot.save(path, dtype="float16")
+        
+        assert len(MemorySnapshot.load(path)) == 3
+        assert sorted(os.listdir(tmp_path)) == ["memories"]
+        assert sorted(os.listdir(path)) == ["metadata.json", "vectors.f16"]
@@ -0,0 +1,136 @@
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from Services.NumpyVectorStore import NumpyVectorStore
+
+
+class KeywordEmbeddings(Embeddings):
+    """Embeds a text by counting a few keywords"""
+    
+    KEYWORDS = ("knife", "garden", "kitchen", "alibi")
+    
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+    
+    def embed_query(self, text):
+        return [float(text.lower().count(word)) + 0.01 for word in self.KEYWORDS]
+
+
+class CountingKeywordEmbeddings(KeywordEmbeddings):
+    """Keyword embeddings that count the documents they embed"""
+    
+    def __init__(self):
+        self.documents = 0
+    
+    def embed_documents(self, texts):
+        self.documents += len(texts)
+        return super().embed_documents(texts)
+
+
+def conversation(text, pair, turn):
+    return Document(page_content=text, metadata={"player_ids": pair, "turn": turn})
+
+
+@pytest.mark.unit
+class TestNumpyVectorStore:
+    """Unit tests for NumpyVectorStore"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.store = NumpyVectorStore(KeywordEmbeddings(), initial_capacity=2)
+        self.store.add_documents([
+            conversation("I saw the knife in the kitchen", "1-2", 1),
+            conversation("I was in the garden all night", "1-2", 2),
+            conversation("The knife was gone by then", "1-2", 3),
+            conversation("My alibi is the garden party", "1-3", 1),
+        ])
+    
+    def test_search_is_limited_to_the_pair(self):
+        """Test that a player_ids filter only returns that pair's documents"""
+        results = self.store.similarity_search("garden", k=5, filter={"player_ids": "1-3"})
+        
+        assert [doc.page_content for doc in results] == ["My alibi is the garden party"]
+    
+    def test_results_are_ranked_by_cosine_similarity(self):
+        """Test that the most similar document comes first"""
+        results = self.store.similarity_search("knife kitchen", k=2, filter={"player_ids": "1-2"})
+        
+        assert results[0].page_content == "I saw the knife in the kitchen"
+        assert results[1].page_content == "The knife was gone by then"
+    
+    def test_turn_filter(self):
+        """Test that turn comparisons combine with the pair filter"""
+        results = self.store.similarity_search(
+            "knife", k=5, filter={"$and": [{"player_ids": "1-2"}, {"turn": {"$gte": 2}}]}
+        )
+        
+        assert sorted(doc.metadata["turn"] for doc in results) == [2, 3]
+    
+    def test_search_without_filter_spans_partitions(self):
+        """Test that an unfiltered search looks at every pair"""
+        results = self.store.similarity_search("alibi", k=1)
+        
+        assert results[0].metadata["player_ids"] == "1-3"
+    
+    def test_delete_keeps_remaining_rows(self):
+        """Test that deleting a document leaves the others searchable"""
+        ids = self.store.get(where={"player_ids": "1-2"})["ids"]
+        self.store.delete([ids[0]])
+        
+        assert self.store.count() == 3
+        assert self.store.count_pair("1-2") == 2
+        results = self.store.similarity_search("knife", k=5, filter={"player_ids": "1-2"})
+        assert "I saw the knife in the kitchen" not in [doc.page_content for doc in results]
+    
+    def test_update_metadata_moves_the_turn(self):
+        """Test that updated metadata is returned and used by turn filters"""
+        ids = self.store.get(where={"player_ids": "1-2"})["ids"]
+        self.store.update_metadata([ids[0]], [{"player_ids": "1-2", "turn": 5, "repeats": 1}])
+
+        results = self.store.similarity_search("knife", k=5, filter={"$and": [{"player_ids": "1-2"}, {"turn": 5}]})
+        assert [doc.page_content for doc in results] == ["I saw the knife in the kitchen"]
+        assert results[0].metadata["repeats"] == 1
+        assert self.store.count() == 4
+
+    def test_unsupported_filter_is_rejected(self):
+        """Test that unknown filter fields raise instead of being ignored"""
+        with pytest.raises(ValueError):
+            self.store.similarity_search("knife", filter={"room": "kitchen"})
+    
+    @pytest.mark.parametrize("codec", ["int8", "pq"])
+    def test_lossy_codecs_never_embed_stored_documents_again(self, codec):
+        """Test that re-ranking and retraining read stored vectors instead of calling the model"""
+        embeddings = CountingKeywordEmbeddings()
+        store = NumpyVectorStore(embeddings, codec=codec, pq_subspaces=2, initial_capacity=1)
+        for turn in range(6):
+            store.add_documents([conversation(f"The knife was in the garden on turn {turn}", "1-2", turn)])
+        embedded = embeddings.documents
+        
+        store.similarity_search("knife garden", k=3, filter={"player_ids": "1-2"})
+        store.add_documents([conversation("My alibi is the kitchen", "1-2", 6)])
+        
+        assert embeddings.documents == embedded + 1
+    
+    @pytest.mark.parametrize("codec", ["float16", "int8", "pq"])
+    def test_lossy_codecs_rerank_exactly(self, codec):
+        """Test that compressed stores re-ranking exactly return the same ranking as float32"""
+        store = NumpyVectorStore(KeywordEmbeddings(), codec=codec, pq_subspaces=2, exact_rerank=True)
+        store.add_documents([conversation(doc.page_content, doc.metadata["player_ids"], doc.metadata["turn"])
+                             for doc in self.store.similarity_search("knife garden kitchen alibi", k=10)])
+        
+        for query in ("knife kitchen", "garden", "alibi"):
+            expected = self.store.similarity_search_with_score(query, k=2, filter={"player_ids": "1-2"})
+            actual = store.similarity_search_with_score(query, k=2, filter={"player_ids": "1-2"})
+            assert [doc.page_content for doc, _ in actual] == [doc.page_content for doc, _ in expected]
+            assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+    
+    def test_exact_rerank_is_only_on_by_default_for_pq(self):
+        """Test that float16 and int8 search their codes without an exact copy on disk"""
+        for codec, disk_bytes in (("float16", 0), ("int8", 0), ("pq", 4 * 4)):
+            store = NumpyVectorStore(KeywordEmbeddings(), codec=codec, pq_subspaces=2)
+            store.add_documents([conversation("The knife was in the garden", "1-2", 0),
+                                 conversation("My alibi is the kitchen", "1-2", 1)])
+            
+            assert store.disk_bytes_per_vector == disk_bytes
+            assert store.similarity_search("knife garden", k=1)[0].page_content == "The knife was in the garden"
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from Services.OnnxEmbeddings import OnnxEmbeddings
+
+
+class FakeEncoding:
+    def __init__(self, length, padded_length):
+        self.ids = list(range(1, length + 1)) + [0] * (padded_length - length)
+        self.attention_mask = [1] * length + [0] * (padded_length - length)
+        self.type_ids = [0] * padded_length
+
+
+class FakeTokenizer:
+    """Tokenizer with one token per word, padding each batch to its longest text"""
+    
+    def encode_batch(self, texts):
+        longest = max(len(text.split()) for text in texts)
+        return [FakeEncoding(len(text.split()), longest) for text in texts]
+
+
+class FakeSession:
+    """Model whose token embedding is [token id, 1], with padding tokens set far away"""
+    
+    def __init__(self):
+        self.batches = []
+    
+    def run(self, outputs, inputs):
+        ids = inputs["input_ids"].astype(np.float32)
+        self.batches.append(len(ids))
+        embeddings = np.stack([ids, np.ones_like(ids)], axis=-1)
+        embeddings[inputs["attention_mask"] == 0] = 1000.0
+        return [embeddings]
+
+
+@pytest.mark.unit
+class TestOnnxEmbeddings:
+    """Unit tests for OnnxEmbeddings pooling and batching"""
+    
+    def setup_method(self):
+        """Set up an instance around a fake tokenizer and session"""
+        self.embeddings = OnnxEmbeddings.__new__(OnnxEmbeddings)
+        self.embeddings.tokenizer = FakeTokenizer()
+        self.embeddings.session = FakeSession()
+        self.embeddings.batch_size = 2
+        self.embeddings._input_names = {"input_ids", "attention_mask"}
+    
+    def test_mean_pooling_ignores_padding(self):
+        """Test that padded positions do not change a text's vector"""
+        alone = self.embeddings.embed_query("one two")
+        padded = self.embeddings.embed_documents(["one two", "one two three four"])[0]
+        
+        assert np.allclose(alone, padded)
+        expected = np.array([1.5, 1.0]) / np.linalg.norm([1.5, 1.0])
+        assert np.allclose(alone, expected)
+    
+    def test_vectors_are_unit_length(self):
+        """Test that vectors are L2-normalized like sentence-transformers output"""
+        for vector in self.embeddings.embed_documents(["a", "a b c", "a b c d e"]):
+            assert np.linalg.norm(vector) == pytest.approx(1.0)
+    
+    def test_batches_keep_input_order(self):
+        """Test that length-sorted batching returns vectors in input order"""
+        texts = ["a b c d", "a", "a b c", "a b"]
+        vectors = self.embeddings.embed_documents(texts)
+        
+        assert self.embeddings.session.batches == [2, 2]
+        assert vectors == [self.embeddings.embed_query(text) for text in texts]
@@ -0,0 +1,58 @@
+import pytest
+from Services.PrefixCache import PrefixCache
+
+
+@pytest.mark.unit
+class TestPrefixCache:
+    """Unit tests for PrefixCache"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.cache = PrefixCache(max_entries=2, min_reuse_tokens=3)
+    
+    def test_lookup_miss_when_empty(self):
+        """Test that an empty cache returns nothing"""
+        assert self.cache.lookup((1, "basic"), ("Library", "neutral", "low"), [1, 2, 3, 4]) is None
+        assert self.cache.misses == 1
+    
+    def test_lookup_returns_shared_prefix_length(self):
+        """Test that a hit reports how many leading tokens are shared"""
+        self.cache.store((1, "basic"), ("Library", "neutral", "low"), [1, 2, 3, 4, 5, 6], "state")
+        
+        result = self.cache.lookup((1, "basic"), ("Library", "neutral", "low"), [1, 2, 3, 4, 9, 9])
+        
+        assert result == ("state", 4)
+        assert self.cache.hits == 1
+    
+    def test_reuse_leaves_one_token_to_process(self):
+        """Test that an identical prompt still leaves a token for the model"""
+        self.cache.store((1, "basic"), ("Library", "neutral", "low"), [1, 2, 3, 4, 5], "state")
+        
+        _, reuse_length = self.cache.lookup((1, "basic"), ("Library", "neutral", "low"), [1, 2, 3, 4, 5])
+        
+        assert reuse_length == 4
+    
+    def test_short_shared_prefix_is_a_miss(self):
+        """Test that prefixes shorter than the minimum are not reused"""
+        self.cache.store((1, "basic"), ("Library", "neutral", "low"), [1, 2, 3, 4], "state")
+        
+        assert self.cache.lookup((1, "basic"), ("Library", "neutral", "low"), [1, 2, 7, 8]) is None
+    
+    def test_signature_change_invalidates_entry(self):
+        """Test that a changed mood drops the cached prefix"""
+        self.cache.store((1, "basic"), ("Library", "neutral", "low"), [1, 2, 3, 4, 5], "state")
+        
+        assert self.cache.lookup((1, "basic"), ("Library", "angry", "low"), [1, 2, 3, 4, 5]) is None
+        assert self.cache.invalidations == 1
+        assert len(self.cache) == 0
+    
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the cache keeps at most max_entries prefixes"""
+        signature = ("Library", "neutral", "low")
+        self.cache.store((1, "basic"), signature, [1, 2, 3, 4], "first")
+        self.cache.store((2, "basic"), signature, [1, 2, 3, 4], "second")
+        self.cache.lookup((1, "basic"), signature, [1, 2, 3, 4, 5])
+        self.cache.store((3, "basic"), signature, [1, 2, 3, 4], "third")
+        
+        assert self.cache.lookup((2, "basic"), signature, [1, 2, 3, 4, 5]) is None
+        assert self.cache.lookup((1, "basic"), signature, [1, 2, 3, 4, 5]) is not None
@@ -0,0 +1,128 @@
+import pytest
+from entities.Location import Location
+from entities.Player import Player
+from entities.Question import Question
+from entities.Room import Room
+from Services.ErrorHandler import ErrorHandler
+from Services.PromptService import PromptService
+
+
+def word_counter(text: str) -> int:
+    """Count whitespace-separated words as tokens"""
+    return len(text.split())
+
+
+class RecordingErrorHandler(ErrorHandler):
+    """Error handler that keeps the logged errors"""
+    
+    def __init__(self):
+        super().__init__()
+        self.errors = []
+    
+    def log_error(self, error, context=""):
+        self.errors.append((error, context))
+
+
+@pytest.mark.unit
+class TestPromptService:
+    """Unit tests for PromptService prompt assembly"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.location = Location(
+            "Blackwood Manor", "An old manor. It has many secrets. The halls are dark.", 10,
+            "A dinner party. The host was found dead.", rooms=[]
+        )
+        self.room = Room("Library", "Tall shelves of books. A fire crackles.", 5)
+        self.speaker = Player(id=1, name="Detective", suspicion=0)
+        self.listener = Player(id=2, name="James", suspicion=0, job="Butler")
+        self.nearby = [self.speaker, self.listener, Player(id=3, name="Alice", suspicion=0)]
+        self.question = Question(self.speaker, self.listener, "Did you see Alice tonight?")
+        self.context = (
+            "Previous conversations with this person:\n"
+            "1. Question: Where were you?\nResponse: In the library.\n"
+            "2. Question: Who is Alice?\nResponse: The host's niece.\n"
+        )
+    
+    def test_prompt_within_budget_is_not_trimmed(self):
+        """Test that a prompt under budget keeps every section"""
+        service = PromptService(token_counter=word_counter)
+        
+        messages, report = service.build_prompt(
+            self.question, self.location, self.room, self.context, "basic", self.nearby
+        )
+        
+        assert "The host's niece." in messages[0].content
+        assert report.total <= report.budget
+        assert not any(report.trimmed.values())
+        assert report.sections["fixed"] > 0
+    
+    def test_lowest_priority_sections_are_trimmed_first(self, monkeypatch):
+        """Test that descriptions go before memories when over budget"""
+        service = PromptService(token_counter=word_counter)
+        _, full = service.build_prompt(
+            self.question, self.location, self.room, self.context, "basic", self.nearby
+        )
+        budget = full.total - full.sections["location_description"]
+        monkeypatch.setattr(PromptService, "prompt_budget", staticmethod(lambda template_type: budget))
+        
+        messages, report = service.build_prompt(
+            self.question, self.location, self.room, self.context, "basic", self.nearby
+        )
+        
+        assert report.total <= budget
+        assert report.trimmed["location_description"] > 0
+        assert report.trimmed["context"] == 0
+        assert "It has many secrets." not in messages[0].content
+    
+    def test_least_relevant_memories_are_dropped(self, monkeypatch):
+        """Test that memories are trimmed from the least relevant end"""
+        service = PromptService(token_counter=word_counter)
+        monkeypatch.setattr(PromptService, "prompt_budget", staticmethod(lambda template_type: 1))
+        
+        messages, report = service.build_prompt(
+            self.question, self.location, self.room, self.context, "basic", self.nearby
+        )
+        
+        assert report.over_budget
+        assert report.trimmed["context"] == 2
+        assert "In the library." not in messages[0].content
+        assert "Tall shelves of books." in messages[0].content
+    
+    def test_people_mentioned_in_question_come_first(self):
+        """Test that nearby people named in the question are listed first"""
+        service = PromptService(token_counter=word_counter)
+        nearby = [Player(id=4, name="Bob", suspicion=0)] + self.nearby
+        
+        messages, _ = service.build_prompt(
+            self.question, self.location, self.room, self.context, "basic", nearby
+        )
+        
+        assert "Nearby People: Alice, Bob, Detective" in messages[0].content
+    
+    def test_token_estimate_without_tokenizer(self):
+        """Test that tokens are estimated when the tokenizer is unavailable"""
+        def unavailable(text):
+            raise ValueError("LLM not available")
+        
+        assert PromptService(token_counter=unavailable).count_tokens("x" * 40) == 10
+        assert PromptService().count_tokens("") == 0
+    
+    def test_token_counter_failure_is_logged_once_per_outage(self):
+        """Test that a failing tokenizer is logged when it starts failing, not on every count"""
+        available = [False]
+        def flaky(text):
+            if not available[0]:
+                raise ValueError("LLM not available")
+            return word_counter(text)
+        error_handler = RecordingErrorHandler()
+        service = PromptService(token_counter=flaky, error_handler=error_handler)
+        
+        service.count_tokens("x" * 40)
+        service.count_tokens("x" * 40)
+        available[0] = True
+        assert service.count_tokens("two words") == 2
+        available[0] = False
+        service.count_tokens("x" * 40)
+        
+        assert len(error_handler.errors) == 2
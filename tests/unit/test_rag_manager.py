@@ -0,0 +1,167 @@
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from entities.Location import Location
+from entities.Room import Room
+from managers.RagManager import RagManager
+from Services.FakeBackend import FakeBackend
+
+
+class PatientBackend(FakeBackend):
+    """Fake backend that decodes word by word, consulting the stop policy like a real one"""
+    
+    def generate(self, messages, cache_key=None, cache_signature=None, stop_policy=None, **generate_kwargs):
+        self.calls += 1
+        text = ""
+        for word in self._reply_for(messages, **generate_kwargs).split():
+            time.sleep(self.token_latency)
+            text = f"{text} {word}".strip()
+            if stop_policy is not None and stop_policy.should_stop(text):
+                break
+        return text
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll ``condition`` until it holds or ``timeout`` seconds pass"""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+
+@pytest.mark.unit
+class TestRagManager:
+    """Tests of RagManager streaming and its response deadline over the fake backend"""
+    
+    @pytest.fixture(autouse=True)
+    def rag_manager(self, fake_models, sample_question):
+        """Create a RAG manager over the fake backend"""
+        self.room = Room("Library", "Shelves of old books", 5)
+        self.location = Location("Manor", "An old manor", 10, "", [self.room])
+        self.question = sample_question
+        self.nearby_players = [sample_question.speaker, sample_question.listener]
+        self.rag_manager = RagManager()
+        assert self.rag_manager.llm_service.wait_until_ready(timeout=5)
+        self.rag_manager.response_deadline = 0.2
+    
+    def ask(self, on_token=None):
+        return self.rag_manager.generate_response(
+            self.question, self.location, self.room, self.nearby_players, on_token=on_token
+        )[0]
+    
+    def reply(self):
+        return FakeBackend().generate([HumanMessage(content=self.question.question)])
+    
+    def test_missed_deadline_serves_the_fallback(self):
+        """Test that a reply slower than the deadline is replaced by a rule-based one"""
+        self.rag_manager.llm_service.model = FakeBackend(latency=1.0)
+        
+        started = time.monotonic()
+        response = self.ask()
+        
+        assert time.monotonic() - started < 0.9
+        assert response != self.reply()
+        assert self.rag_manager.deadline_misses == 1
+    
+    def test_late_reply_is_cached_for_the_next_question(self):
+        """Test that the generation behind a missed deadline finishes and fills the response cache"""
+        backend = FakeBackend(latency=0.5)
+        self.rag_manager.llm_service.model = backend
+        self.ask()
+        
+        assert wait_for(lambda: len(self.rag_manager.response_cache) == 1)
+        assert self.ask() == self.reply()
+        assert backend.calls == 1
+    
+    def test_started_stream_is_never_replaced(self):
+        """Test that a reply already streaming when the deadline passes is finished, not swapped"""
+        self.rag_manager.llm_service.model = FakeBackend(token_latency=0.05)
+        partials = []
+        
+        started = time.monotonic()
+        response = self.ask(on_token=partials.append)
+        
+        assert time.monotonic() - started > self.rag_manager.response_deadline
+        assert response == self.reply()
+        assert partials[-1] == response
+        assert self.rag_manager.deadline_misses == 0
+    
+    def test_stream_that_has_not_started_falls_back_silently(self):
+        """Test that a stream with no token by the deadline falls back and never shows its tokens"""
+        backend = FakeBackend(latency=0.5)
+        self.rag_manager.llm_service.model = backend
+        partials = []
+        
+        response = self.ask(on_token=partials.append)
+        assert wait_for(lambda: len(self.rag_manager.response_cache) == 1)
+        
+        assert response != self.reply()
+        assert partials == []
+        assert self.rag_manager.deadline_misses == 1
+    
+    def test_cache_lookup_skips_a_restarting_worker(self):
+        """Test that no question is embedded through a worker that is not running"""
+        self.ask()
+        
+        class RestartingWorker:
+            def is_started(self):
+                return False
+        
+        self.rag_manager.inference_worker = RestartingWorker()
+        self.rag_manager.response_cache.lookup = lambda *args: pytest.fail("embedded through a stopped worker")
+        self.rag_manager.llm_service.model = None
+        
+        assert self.ask() != self.reply()
+    
+    def test_slow_cache_lookup_is_bounded_by_the_deadline(self):
+        """Test that a cache lookup stuck on embeddings does not hold the question past its deadline"""
+        self.rag_manager.response_cache.lookup = lambda *args: time.sleep(1.0)
+        
+        started = time.monotonic()
+        response = self.ask()
+        
+        assert time.monotonic() - started < 0.9
+        assert response != self.reply()
+    
+    def test_stream_partials_arrive_in_order(self):
+        """Test that every partial extends the previous one and the last one is the reply"""
+        self.rag_manager.response_deadline = None
+        self.rag_manager.llm_service.model = FakeBackend(responses=["I was in the garden all evening, alone."])
+        partials = []
+        
+        response = self.ask(on_token=partials.append)
+        
+        assert len(partials) > 1
+        assert all(later.startswith(earlier) and later != earlier for earlier, later in zip(partials, partials[1:]))
+        assert partials[-1] == response == "I was in the garden all evening, alone."
+    
+    def test_stream_never_forwards_text_past_a_stop_marker(self):
+        """Test that a leaked role turn is cut from the partials as well as the reply"""
+        self.rag_manager.response_deadline = None
+        self.rag_manager.llm_service.model = FakeBackend(
+            responses=["I was in the garden all evening. Human: Where is the knife?"]
+        )
+        partials = []
+        
+        response = self.ask(on_token=partials.append)
+        
+        assert response == "I was in the garden all evening."
+        assert partials[-1] == response
+        assert not any("Human" in partial or "knife" in partial for partial in partials)
+    
+    def test_running_draft_is_preempted_by_the_foreground(self):
+        """Test that a speculative draft stops decoding once a foreground question starts"""
+        self.rag_manager.llm_service.model = PatientBackend(token_latency=0.2)
+        speculation_service = self.rag_manager.speculation_service
+        self.rag_manager.speculate(self.question, self.location, self.room, self.nearby_players, "state")
+        assert wait_for(lambda: speculation_service.started == 1)
+        
+        started = time.monotonic()
+        with speculation_service.foreground():
+            draft = speculation_service.take(self.rag_manager._speculation_key(self.question), "state", timeout=5)
+        
+        assert time.monotonic() - started < 0.5
+        assert draft is None
+        assert len(self.rag_manager.response_cache) == 0
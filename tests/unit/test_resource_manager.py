@@ -0,0 +1,67 @@
+import pytest
+
+from config.ModelConfig import ModelConfig
+from managers.ResourceManager import ResourceManager
+from Services.ErrorHandler import ErrorHandler
+from Services.LLMService import LLMService
+from Services.RetrievalCache import RetrievalCache
+
+
+class RecordingRepository:
+    """Conversation repository stand-in recording the cleanup calls it gets"""
+    
+    def __init__(self, fail_snapshot=False):
+        self.retrieval_cache = RetrievalCache()
+        self.snapshot_path = "saves/test-session"
+        self.fail_snapshot = fail_snapshot
+        self.calls = []
+    
+    def save_snapshot(self, path, dtype="float16"):
+        self.calls.append(("save_snapshot", path))
+        if self.fail_snapshot:
+            raise OSError("disk full")
+        return 3
+    
+    def clear_database(self):
+        self.calls.append(("clear_database",))
+
+
+@pytest.mark.unit
+class TestResourceManager:
+    """Unit tests for ResourceManager cleanup"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.llm_service = LLMService(background=False, backend="fake")
+        self.manager = ResourceManager(error_handler=ErrorHandler())
+    
+    def test_snapshot_is_saved_before_the_database_is_cleared(self, monkeypatch):
+        """Test that save-on-exit writes the session's snapshot, then clears its memory"""
+        monkeypatch.setattr(ModelConfig, "MEMORY_SNAPSHOT_ON_EXIT", True)
+        repository = RecordingRepository()
+        self.manager.initialize(self.llm_service, None, repository)
+        
+        self.manager.cleanup()
+        
+        assert repository.calls == [("save_snapshot", "saves/test-session"), ("clear_database",)]
+    
+    def test_failed_snapshot_does_not_stop_cleanup(self, monkeypatch):
+        """Test that a snapshot error is logged and the remaining resources are still released"""
+        monkeypatch.setattr(ModelConfig, "MEMORY_SNAPSHOT_ON_EXIT", True)
+        repository = RecordingRepository(fail_snapshot=True)
+        self.manager.initialize(self.llm_service, None, repository)
+        
+        self.manager.cleanup()
+        
+        assert repository.calls[-1] == ("clear_database",)
+        assert not self.llm_service.is_ready()
+    
+    def test_snapshot_is_skipped_unless_enabled(self, monkeypatch):
+        """Test that cleanup only clears the database when save-on-exit is off"""
+        monkeypatch.setattr(ModelConfig, "MEMORY_SNAPSHOT_ON_EXIT", False)
+        repository = RecordingRepository()
+        self.manager.initialize(self.llm_service, None, repository)
+        
+        self.manager.cleanup()
+        
+        assert repository.calls == [("clear_database",)]
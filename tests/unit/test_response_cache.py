@@ -0,0 +1,103 @@
+import pytest
+from Services.ResponseCache import ResponseCache
+
+
+class KeywordEmbeddings:
+    """Tiny deterministic embedding: one dimension per known keyword"""
+    
+    KEYWORDS = ["where", "were", "you", "carrying", "items", "weapon"]
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def embed_query(self, text):
+        self.calls += 1
+        words = text.lower().replace("?", "").split()
+        return [float(words.count(keyword)) for keyword in self.KEYWORDS]
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    """Unit tests for ResponseCache"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.embeddings = KeywordEmbeddings()
+        self.key = self.make_key()
+    
+    @staticmethod
+    def make_key(character="1:Alice", mood="neutral", inventory=("Key",)):
+        return ResponseCache.make_key(
+            character, "Butler", "innocent", mood, "low", inventory, "basic", "Library", "Manor"
+        )
+    
+    def test_similar_question_hits(self):
+        """Test that a near-identical question returns the cached reply"""
+        cache = ResponseCache(self.embeddings)
+        cache.store(self.key, "Where were you?", "I was reading.")
+        
+        assert cache.lookup(self.key, "where were you") == "I was reading."
+        assert cache.hits == 1
+    
+    def test_different_question_misses(self):
+        """Test that an unrelated question is not answered from the cache"""
+        cache = ResponseCache(self.embeddings)
+        cache.store(self.key, "Where were you?", "I was reading.")
+        
+        assert cache.lookup(self.key, "What items are you carrying?") is None
+        assert cache.misses == 1
+    
+    def test_different_state_misses_without_embedding(self):
+        """Test that another character state never matches and skips embedding"""
+        cache = ResponseCache(self.embeddings)
+        cache.store(self.key, "Where were you?", "I was reading.")
+        calls_before = self.embeddings.calls
+        other_key = self.make_key(mood="angry")
+        
+        assert cache.lookup(other_key, "Where were you?") is None
+        assert self.embeddings.calls == calls_before
+    
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that max_entries bounds the cache"""
+        cache = ResponseCache(self.embeddings, max_entries=1)
+        cache.store(self.key, "Where were you?", "I was reading.")
+        cache.store(self.key, "What items are you carrying?", "Just a key.")
+        
+        assert len(cache) == 1
+        assert cache.lookup(self.key, "Where were you?") is None
+    
+    def test_expired_entries_are_dropped(self):
+        """Test that entries older than the TTL are not served"""
+        cache = ResponseCache(self.embeddings, ttl_seconds=-1)
+        cache.store(self.key, "Where were you?", "I was reading.")
+        
+        assert cache.lookup(self.key, "Where were you?") is None
+        assert len(cache) == 0
+    
+    def test_cache_survives_restart(self, tmp_path):
+        """Test that saved entries are loaded by a new cache"""
+        path = str(tmp_path / "cache" / "responses.json")
+        cache = ResponseCache(self.embeddings, path=path)
+        cache.store(self.key, "Where were you?", "I was reading.")
+        cache.save()
+        
+        reloaded = ResponseCache(self.embeddings, path=path)
+        
+        assert reloaded.lookup(self.key, "Where were you?") == "I was reading."
+    
+    def test_other_character_in_the_same_state_misses(self):
+        """Test that one character's reply is never served for another"""
+        cache = ResponseCache(self.embeddings)
+        cache.store(self.key, "What items are you carrying?", "Just a key.")
+        
+        assert cache.lookup(self.make_key(character="2:Bob"), "What items are you carrying?") is None
+        assert cache.lookup(self.make_key(inventory=("Key", "Knife")), "What items are you carrying?") is None
+    
+    def test_best_match_wins(self):
+        """Test that the most similar cached question is used"""
+        cache = ResponseCache(self.embeddings, similarity_threshold=0.5)
+        cache.store(self.key, "Where were you?", "I was reading.")
+        cache.store(self.key, "What items are you carrying?", "Just a key.")
+        
+        assert cache.lookup(self.key, "What items were you carrying?") == "Just a key."
+        assert cache.lookup(self.key, "Where were you?") == "I was reading."
@@ -0,0 +1,35 @@
+import pytest
+
+from Services.RetrievalCache import RetrievalCache
+
+
+@pytest.mark.unit
+class TestRetrievalCache:
+    """Unit tests for RetrievalCache"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.cache = RetrievalCache(max_entries=2)
+    
+    def test_near_identical_questions_share_an_entry(self):
+        """Test that case, punctuation and spacing do not change the key"""
+        self.cache.put(RetrievalCache.key("1-2", "Where were you?", 3, 1), "context")
+        
+        assert self.cache.get(RetrievalCache.key("1-2", "  where WERE you ", 3, 1)) == "context"
+        assert self.cache.hits == 1
+    
+    def test_new_pair_version_misses(self):
+        """Test that a write to the pair invalidates its entries"""
+        self.cache.put(RetrievalCache.key("1-2", "Where were you?", 3, 1), "context")
+        
+        assert self.cache.get(RetrievalCache.key("1-2", "Where were you?", 3, 2)) is None
+        assert self.cache.get(RetrievalCache.key("1-3", "Where were you?", 3, 1)) is None
+        assert self.cache.hit_rate == 0.0
+    
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the cache keeps at most max_entries contexts"""
+        for version in range(3):
+            self.cache.put(RetrievalCache.key("1-2", "q", 3, version), f"context {version}")
+        
+        assert len(self.cache) == 2
+        assert self.cache.get(RetrievalCache.key("1-2", "q", 3, 0)) is None
@@ -0,0 +1,69 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from Services.SessionJanitor import SessionJanitor
+
+
+@pytest.mark.unit
+class TestSessionJanitor:
+    """Unit tests for SessionJanitor"""
+    
+    @pytest.fixture(autouse=True)
+    def janitor(self, tmp_path):
+        """Create a janitor over a temporary lease directory"""
+        self.janitor = SessionJanitor(str(tmp_path / "sessions"), lease_ttl=60)
+        self.dropped = []
+    
+    def write_lease(self, session_id, host, pid):
+        os.makedirs(self.janitor.directory, exist_ok=True)
+        with open(os.path.join(self.janitor.directory, f"{session_id}.json"), "w", encoding="utf-8") as lease_file:
+            json.dump({"host": host, "pid": pid, "started": 0}, lease_file)
+    
+    def dead_pid(self):
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        return process.pid
+    
+    def test_registered_session_is_alive_until_released(self):
+        """Test that this process's lease keeps its session alive"""
+        self.janitor.register("game1")
+        assert self.janitor.is_alive("game1")
+        
+        self.janitor.release("game1")
+        assert not self.janitor.is_alive("game1")
+    
+    def test_crashed_session_is_dropped(self):
+        """Test that a session whose process died is collected and its lease removed"""
+        self.janitor.register("live")
+        self.write_lease("crashed", socket.gethostname(), self.dead_pid())
+        
+        dropped = self.janitor.collect_orphans(["live", "crashed"], self.dropped.append)
+        
+        assert dropped == ["crashed"]
+        assert self.dropped == ["crashed"]
+        assert self.janitor.leased_sessions() == ["live"]
+    
+    def test_namespace_without_lease_is_dropped(self):
+        """Test that stored sessions nobody holds a lease on are collected"""
+        assert self.janitor.collect_orphans(["unknown"], self.dropped.append) == ["unknown"]
+    
+    def test_recent_lease_from_another_host_is_kept(self):
+        """Test that leases from other hosts only expire by age"""
+        self.write_lease("remote", "another-host", 1)
+        
+        assert self.janitor.collect_orphans(["remote"], self.dropped.append) == []
+    
+    def test_failed_drop_keeps_the_lease(self):
+        """Test that a namespace that could not be dropped is retried later"""
+        self.write_lease("crashed", socket.gethostname(), self.dead_pid())
+        
+        def fail(session_id):
+            raise OSError("locked")
+        
+        assert self.janitor.collect_orphans([], fail) == []
+        assert self.janitor.leased_sessions() == ["crashed"]
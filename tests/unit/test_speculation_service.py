@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+from Services.SpeculationService import SpeculationService
+
+
+@pytest.mark.unit
+class TestSpeculationService:
+    """Unit tests for SpeculationService"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.service = SpeculationService()
+    
+    def _wait_for_draft(self, key):
+        """Wait until the worker has finished the draft for ``key``"""
+        assert self.service._drafts[key].done.wait(timeout=5)
+    
+    def test_take_returns_matching_draft(self):
+        """Test that a finished draft is handed out for the same state"""
+        self.service.speculate((1, "where were you"), ("turn", 1), lambda: "In the library.", group=1)
+        self._wait_for_draft((1, "where were you"))
+        
+        assert self.service.take((1, "where were you"), ("turn", 1)) == "In the library."
+        assert self.service.committed == 1
+    
+    def test_take_discards_stale_draft(self):
+        """Test that a draft made for a different game state is not used"""
+        self.service.speculate((1, "where were you"), ("turn", 1), lambda: "In the library.", group=1)
+        self._wait_for_draft((1, "where were you"))
+        
+        assert self.service.take((1, "where were you"), ("turn", 2)) is None
+        assert self.service.discarded == 1
+        assert self.service.take((1, "where were you"), ("turn", 1)) is None
+    
+    def test_take_without_draft(self):
+        """Test that an unknown question has no draft"""
+        assert self.service.take((1, "anything"), ("turn", 1)) is None
+    
+    def test_foreground_work_delays_drafts(self):
+        """Test that no draft starts while foreground generation runs"""
+        started = threading.Event()
+        
+        def producer():
+            started.set()
+            return "Draft"
+        
+        with self.service.foreground():
+            self.service.speculate((1, "question"), ("turn", 1), producer, group=1)
+            assert not started.wait(timeout=0.2)
+        
+        assert started.wait(timeout=5)
+    
+    def test_pending_draft_is_dropped_on_take(self):
+        """Test that a draft which has not started yet is not waited for"""
+        with self.service.foreground():
+            self.service.speculate((1, "question"), ("turn", 1), lambda: "Draft", group=1)
+            
+            assert self.service.take((1, "question"), ("turn", 1)) is None
+        
+        assert self.service.started == 0
+    
+    def test_selecting_another_player_discards_drafts(self):
+        """Test that drafts for a different listener are dropped"""
+        with self.service.foreground():
+            self.service.speculate((1, "question"), ("turn", 1), lambda: "First", group=1)
+            self.service.discard(keep_groups={2})
+            self.service.speculate((2, "question"), ("turn", 1), lambda: "Second", group=2)
+            
+            assert (1, "question") not in self.service._drafts
+            assert self.service.discarded == 1
+    
+    def test_several_candidates_keep_their_drafts(self):
+        """Test that drafting for one listener does not drop another's drafts"""
+        with self.service.foreground():
+            for group in (1, 2, 3):
+                self.service.speculate((group, "question"), ("turn", 1), lambda: "Draft", group=group)
+            
+            assert len(self.service._drafts) == 3
+            assert self.service.discarded == 0
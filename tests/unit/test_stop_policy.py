@@ -0,0 +1,57 @@
+import pytest
+from Services.StopPolicy import StopPolicy
+
+
+@pytest.mark.unit
+class TestStopPolicy:
+    """Unit tests for StopPolicy"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.policy = StopPolicy(max_sentences=2, ngram_size=3, max_ngram_occurrences=2)
+    
+    def test_short_reply_does_not_stop(self):
+        """Test that an unfinished reply keeps generating"""
+        assert not self.policy.should_stop("I was in the library")
+        assert self.policy.truncate("I was in the library") == "I was in the library"
+    
+    def test_stops_after_sentence_limit(self):
+        """Test that decoding stops once the second sentence is complete"""
+        text = "I was in the library. Nobody else was there! Then I went"
+        
+        assert self.policy.should_stop(text)
+        assert self.policy.truncate(text) == "I was in the library. Nobody else was there!"
+    
+    def test_sentence_needs_following_whitespace(self):
+        """Test that a terminator at the very end is not yet a sentence break"""
+        assert not self.policy.should_stop("I was there. Ask Dr. Smith.")
+    
+    def test_abbreviations_do_not_end_sentences(self):
+        """Test that titles such as Mr. are not counted as sentence ends"""
+        text = "I spoke with Mr. Green. He left early. Later"
+        
+        assert self.policy.truncate(text) == "I spoke with Mr. Green. He left early."
+    
+    def test_stops_at_role_marker(self):
+        """Test that a leaked chat turn ends the reply"""
+        text = "I have nothing to hide.\nHuman: What about the knife?"
+        
+        assert self.policy.truncate(text) == "I have nothing to hide."
+    
+    def test_leading_role_marker_is_skipped(self):
+        """Test that a marker before the dialogue is left for the cleaner"""
+        assert not self.policy.should_stop("Assistant: I was in the kitchen")
+    
+    def test_stops_on_repetition_loop(self):
+        """Test that a looping phrase is cut where it first repeated"""
+        text = "I don't know I don't know I don't know"
+        
+        assert self.policy.should_stop(text)
+        assert self.policy.truncate(text) == "I don't know"
+    
+    def test_limits_can_be_disabled(self):
+        """Test that the sentence and repetition limits are optional"""
+        policy = StopPolicy(max_sentences=None, ngram_size=0)
+        text = "One. Two. Three. Three. Three. Three."
+        
+        assert not policy.should_stop(text)
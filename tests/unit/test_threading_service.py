@@ -0,0 +1,39 @@
+import pytest
+
+from Services.ThreadingService import ThreadingService
+
+
+@pytest.mark.unit
+class TestThreadingService:
+    """Unit tests for ThreadingService"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.service = ThreadingService()
+    
+    def test_stream_queues_partials_before_the_result(self):
+        """Test that emitted partials arrive in order, followed by the final result"""
+        def task(emit, words):
+            text = ""
+            for word in words:
+                text = f"{text} {word}".strip()
+                emit(text)
+            return text
+        
+        result_queue = self.service.execute_stream(task, ["I", "was", "asleep."])
+        messages = [result_queue.get(timeout=5) for _ in range(4)]
+        
+        assert messages == [
+            ("partial", "I"), ("partial", "I was"), ("partial", "I was asleep."), ("success", "I was asleep."),
+        ]
+    
+    def test_stream_error_ends_the_queue(self):
+        """Test that a failing stream reports its partials and then the error"""
+        def task(emit):
+            emit("I was")
+            raise RuntimeError("model crashed")
+        
+        result_queue = self.service.execute_stream(task)
+        
+        assert result_queue.get(timeout=5) == ("partial", "I was")
+        assert result_queue.get(timeout=5) == ("error", "model crashed")
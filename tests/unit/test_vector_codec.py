@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from Services.VectorCodec import VectorCodec
+
+
+def unit_vectors(count, dimension=32, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.unit
+class TestVectorCodec:
+    """Unit tests for the vector storage codecs"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.vectors = unit_vectors(300)
+        self.query = unit_vectors(1, seed=1)[0]
+        self.exact = self.vectors @ self.query
+    
+    @pytest.mark.parametrize("name, tolerance", [("float32", 1e-6), ("float16", 2e-3), ("int8", 3e-2)])
+    def test_scalar_codecs_approximate_cosine(self, name, tolerance):
+        """Test that scalar codes score within the codec's precision"""
+        codec = VectorCodec.create(name, 32)
+        codes, scales = codec.encode(self.vectors)
+        
+        assert np.abs(codec.scores(codes, scales, self.query) - self.exact).max() < tolerance
+        assert np.abs(codec.decode(codes, scales) - self.vectors).max() < tolerance
+    
+    def test_codes_shrink_storage(self):
+        """Test the bytes stored per vector of each codec"""
+        sizes = {name: VectorCodec.create(name, 384).bytes_per_vector for name in ("float32", "float16", "int8", "pq")}
+        
+        assert sizes == {"float32": 1536, "float16": 768, "int8": 388, "pq": 48}
+    
+    def test_product_quantization_ranks_nearest_first(self):
+        """Test that PQ scores agree with exact scores on the best candidates"""
+        codec = VectorCodec.create("pq", 32, subspaces=8)
+        codec.fit(self.vectors)
+        codes, scales = codec.encode(self.vectors)
+        scores = codec.scores(codes, scales, self.query)
+        
+        assert codes.shape == (300, 8)
+        assert np.argmax(self.exact) in np.argsort(-scores)[:10]
+    
+    def test_unknown_codec_is_rejected(self):
+        """Test that an unsupported codec name raises"""
+        with pytest.raises(ValueError):
+            VectorCodec.create("bfloat16", 32)
@@ -0,0 +1,127 @@
+import threading
+
+import pytest
+
+from Services.WriteBehindQueue import WriteBehindQueue
+
+
+class StateRecordingCondition(threading.Condition):
+    """Condition that records what a queue reports as pending each time it is released"""
+    
+    def __init__(self, queue):
+        super().__init__()
+        self.queue = queue
+        self.states = []
+    
+    def __exit__(self, *args):
+        self.states.append(self.queue._in_flight + self.queue._waiting)
+        return super().__exit__(*args)
+
+
+@pytest.mark.unit
+class TestWriteBehindQueue:
+    """Unit tests for WriteBehindQueue"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.batches = []
+        self.written = threading.Event()
+    
+    def record(self, batch):
+        self.batches.append(list(batch))
+        self.written.set()
+    
+    def test_put_returns_before_writing(self):
+        """Test that queued items are visible until they are written"""
+        queue = WriteBehindQueue(self.record, batch_size=10, flush_interval=60)
+        queue.put("a")
+        queue.put("b")
+        
+        assert self.batches == []
+        assert queue.pending() == ["a", "b"]
+    
+    def test_full_batch_is_written_in_one_call(self):
+        """Test that reaching the batch size triggers a single write"""
+        queue = WriteBehindQueue(self.record, batch_size=3, flush_interval=60)
+        for item in ("a", "b", "c"):
+            queue.put(item)
+        
+        assert self.written.wait(5)
+        assert self.batches == [["a", "b", "c"]]
+        assert queue.pending() == []
+    
+    def test_interval_flushes_a_partial_batch(self):
+        """Test that a lone item is written once the interval elapses"""
+        queue = WriteBehindQueue(self.record, batch_size=10, flush_interval=0.05)
+        queue.put("a")
+        
+        assert self.written.wait(5)
+        assert self.batches == [["a"]]
+    
+    def test_failed_write_is_kept_for_retry(self):
+        """Test that a failing write leaves the items queued"""
+        def fail(batch):
+            raise OSError("disk full")
+        
+        queue = WriteBehindQueue(fail, batch_size=10, flush_interval=60)
+        queue.put("a")
+        
+        assert queue.flush() is False
+        assert queue.pending() == ["a"]
+    
+    def test_failed_write_is_never_pending_twice(self):
+        """Test that a failing batch is requeued only after it has left the in-flight list"""
+        def fail(batch):
+            raise OSError("disk full")
+        
+        queue = WriteBehindQueue(fail, batch_size=10, flush_interval=60)
+        queue._condition = StateRecordingCondition(queue)
+        queue.put("a")
+        queue.put("b")
+        queue.flush()
+        
+        assert queue._condition.states
+        assert all(len(items) == len(set(items)) for items in queue._condition.states)
+        assert queue.pending() == ["a", "b"]
+    
+    def test_items_are_dropped_after_max_attempts(self):
+        """Test that a permanently failing item is retried a bounded number of times"""
+        calls = []
+        def fail(batch):
+            calls.append(list(batch))
+            raise OSError("disk full")
+        
+        queue = WriteBehindQueue(fail, batch_size=10, flush_interval=60, max_attempts=3)
+        queue.put("a")
+        queue.flush()
+        queue.put("b")
+        queue.flush()
+        queue.flush()
+        
+        assert calls == [["a"], ["a", "b"], ["a", "b"]]
+        assert queue.pending() == ["b"]
+        assert queue.items_dropped == 1
+    
+    def test_backoff_doubles_and_is_capped(self):
+        """Test that consecutive failures pause the flushing thread for longer each time"""
+        def fail(batch):
+            raise OSError("disk full")
+        
+        queue = WriteBehindQueue(fail, batch_size=10, flush_interval=1, max_attempts=10, max_backoff=3)
+        queue.put("a")
+        backoffs = []
+        for _ in range(4):
+            queue.flush()
+            backoffs.append(queue._backoff())
+        
+        assert backoffs == [1, 2, 3, 3]
+    
+    def test_clear_drops_queued_items(self):
+        """Test that cleared items are never written"""
+        queue = WriteBehindQueue(self.record, batch_size=10, flush_interval=60)
+        queue.put("a")
+        queue.clear()
+        queue.flush()
+        
+        assert self.batches == []
+        assert queue.pending() == []
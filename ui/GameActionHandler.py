@@ -1,11 +1,13 @@
 """Handles game actions separated from UI concerns"""
 
 from typing import Callable, Optional
+from config.GameConfig import GameConfig
 from entities.Player import Player
 from entities.Question import Question
 from entities.Room import Room
 from managers.GameManager import GameManager
-from game_logic import ask_about_inventory, get_user_inventory
+from game_logic import INVENTORY_QUESTION, SUGGESTED_QUESTION, ask_about_inventory, get_user_inventory
+from Services.ThreadingService import run_sync
 
 
 class GameActionHandler:
@@ -15,19 +17,71 @@ class GameActionHandler:
         self.game_manager = game_manager
         self.user_player = user_player
     
-    def ask_question(self, player: Player, question_text: str) -> tuple[str, int, int]:
+    def ask_question(self, player: Player, question_text: str,
+                     on_token: Optional[Callable[[str], None]] = None) -> tuple[str, int, int]:
         """
         Ask a question to a player
         
         Args:
             player: The player to ask
             question_text: The question to ask
+            on_token: Optional callback receiving the partial reply while it streams
+            
+        Returns:
+            tuple: (response, suspicion_change_speaker, suspicion_change_listener)
+        """
+        return run_sync(self.aask_question(player, question_text, on_token=on_token))
+    
+    async def aask_question(self, player: Player, question_text: str,
+                            on_token: Optional[Callable[[str], None]] = None) -> tuple[str, int, int]:
+        """
+        Ask a question to a player from a running event loop
+        
+        Args:
+            player: The player to ask
+            question_text: The question to ask
+            on_token: Optional callback receiving the partial reply while it streams
             
         Returns:
             tuple: (response, suspicion_change_speaker, suspicion_change_listener)
         """
         conversation = Question(self.user_player, player, question_text)
-        return self.game_manager.strike_conversation(conversation)
+        return await self.game_manager.astrike_conversation(conversation, on_token=on_token)
+    
+    def interrogate_room(self, question_text: str) -> list[dict]:
+        """
+        Ask the same question to every player in the current room at once
+        
+        Args:
+            question_text: The question to ask
+            
+        Returns:
+            list[dict]: One entry per player with the player, their response
+            and the suspicion changes
+        """
+        return run_sync(self.ainterrogate_room(question_text))
+    
+    async def ainterrogate_room(self, question_text: str) -> list[dict]:
+        """
+        Ask the same question to every player in the current room from a running event loop
+        
+        Args:
+            question_text: The question to ask
+            
+        Returns:
+            list[dict]: One entry per player with the player, their response
+            and the suspicion changes
+        """
+        return [
+            {
+                'player': player,
+                'response': response,
+                'suspicion_change_speaker': suspicion_change_speaker,
+                'suspicion_change_listener': suspicion_change_listener
+            }
+            for player, response, suspicion_change_speaker, suspicion_change_listener
+            in await self.game_manager.ainterrogate_room(question_text)
+        ]
     
     def accuse_player(self, accused: Player) -> bool:
         """
@@ -53,6 +107,27 @@ class GameActionHandler:
         """
         return ask_about_inventory(self.game_manager, player)
     
+    def prefetch_answers(self, players: list[Player], include_inventory: bool = True,
+                         include_question: bool = True) -> None:
+        """
+        Start preparing answers to the questions the user is likely to ask next
+        
+        Args:
+            players: The players the user is likely to pick
+            include_inventory: Prepare the answer to the inventory query
+            include_question: Prepare answers to the questions the user asked most
+                recently, or to a generic question before any was asked
+        """
+        question_texts = []
+        if include_inventory:
+            question_texts.append(INVENTORY_QUESTION)
+        if include_question:
+            question_texts.extend(
+                self.game_manager.likely_questions(GameConfig.SPECULATION_MAX_QUESTIONS, exclude=(INVENTORY_QUESTION,))
+                or [SUGGESTED_QUESTION]
+            )
+        self.game_manager.prefetch_answers(players, question_texts)
+    
     def move_to_room(self, room: Room) -> None:
         """
         Move the user player to a different room
@@ -123,6 +198,15 @@ class GameActionHandler:
         """
         return self.game_manager.is_game_active()
     
+    def get_model_state(self) -> str:
+        """
+        Get the loading state of the language model
+        
+        Returns:
+            str: One of ``loading``, ``ready``, ``fallback`` or ``failed``
+        """
+        return self.game_manager.get_model_state()
+    
     def cleanup(self) -> None:
         """Clean up game resources"""
         self.game_manager.cleanup()
@@ -75,6 +75,14 @@ class GameUIController:
         """Return ``True`` if the game is still active."""
         return self._action_handler.is_game_active()
 
+    def get_model_state(self) -> str:
+        """Return the loading state of the language model.
+
+        One of ``"loading"``, ``"ready"``, ``"fallback"``, ``"failed"`` or,
+        after cleanup, ``"closed"``.
+        """
+        return self._action_handler.get_model_state()
+
     def move_to_room(self, room: Room) -> None:
         """Move the user player to the given room."""
         self._action_handler.move_to_room(room)
@@ -86,10 +94,57 @@ class GameUIController:
         """
         return self._action_handler.accuse_player(accused)
 
+    def prefetch_answers(
+        self, players: list[Player], include_inventory: bool = True, include_question: bool = True
+    ) -> None:
+        """Speculatively prepare answers the user is likely to ask ``players`` for.
+
+        Drafts for anyone else are dropped. Returns immediately; drafting happens on a low-priority background
+        thread and never costs a turn. Errors are logged and ignored.
+        """
+        try:
+            self._action_handler.prefetch_answers(players, include_inventory, include_question)
+        except Exception as error:  # pragma: no cover - speculation is best effort
+            self._error_handler.log_error(error, context="GameUIController.prefetch_answers")
+
     def cleanup(self) -> None:
         """Clean up underlying game resources."""
         self._action_handler.cleanup()
 
+    async def aask_question(
+        self,
+        player: Player,
+        question_text: str,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
+        """Ask ``player`` a question from a running event loop.
+
+        Returns the same ``result_dict`` as :meth:`start_conversation_async`,
+        so a host serving several games from one event loop can await many
+        conversations concurrently instead of spawning a thread for each.
+        """
+        response, sus_speaker, sus_listener = await self._action_handler.aask_question(
+            player, question_text, on_token=on_token
+        )
+        return {
+            "response": response,
+            "suspicion_change_speaker": sus_speaker,
+            "suspicion_change_listener": sus_listener,
+            "player": player,
+            "question_text": question_text,
+        }
+
+    async def ainterrogate_room(self, question_text: str) -> Dict[str, Any]:
+        """Interrogate the current room from a running event loop.
+
+        Returns the same ``result_dict`` as
+        :meth:`start_room_interrogation_async`.
+        """
+        return {
+            "question_text": question_text,
+            "answers": await self._action_handler.ainterrogate_room(question_text),
+        }
+
     def start_conversation_async(
         self, player: Player, question_text: str
     ) -> "Queue[Tuple[str, Any]]":
@@ -116,6 +171,53 @@ class GameUIController:
         queue: Queue[Tuple[str, Any]] = self._threading_service.execute_async(task)
         return queue
 
+    def start_conversation_stream(
+        self, player: Player, question_text: str
+    ) -> "Queue[Tuple[str, Any]]":
+        """Start a background conversation whose reply is streamed.
+
+        The queue first receives zero or more ``("partial", text)`` tuples,
+        where ``text`` is the cleaned reply generated so far, followed by
+        exactly one ``("success", result_dict)`` or ``("error", message)``.
+        ``result_dict`` has the same keys as for
+        :meth:`start_conversation_async`.
+        """
+
+        def task(emit: Callable[[str], None]) -> Dict[str, Any]:
+            response, sus_speaker, sus_listener = self._action_handler.ask_question(
+                player, question_text, on_token=emit
+            )
+            return {
+                "response": response,
+                "suspicion_change_speaker": sus_speaker,
+                "suspicion_change_listener": sus_listener,
+                "player": player,
+                "question_text": question_text,
+            }
+
+        queue: Queue[Tuple[str, Any]] = self._threading_service.execute_stream(task)
+        return queue
+
+    def start_room_interrogation_async(
+        self, question_text: str
+    ) -> "Queue[Tuple[str, Any]]":
+        """Start a background interrogation of everyone in the current room.
+
+        The result queue will contain ``("success", result_dict)`` or
+        ``("error", error_message)``. ``result_dict`` has keys
+        ``question_text`` and ``answers``, the list returned by
+        :meth:`GameActionHandler.interrogate_room`.
+        """
+
+        def task() -> Dict[str, Any]:
+            return {
+                "question_text": question_text,
+                "answers": self._action_handler.interrogate_room(question_text),
+            }
+
+        queue: Queue[Tuple[str, Any]] = self._threading_service.execute_async(task)
+        return queue
+
     def start_inventory_query_async(
         self, player: Player
     ) -> "Queue[Tuple[str, Any]]":